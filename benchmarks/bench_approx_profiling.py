@@ -0,0 +1,67 @@
+"""
+Benchmark: exact vs. approximate profiling time by table size
+
+Profiles the same synthetic tables with draw_dash.profiling.profile_table
+in exact mode and in approximate mode (HyperLogLog distinct counts plus
+reservoir-sampled quartiles), and reports the largest relative error of
+the approximate distinct counts.
+
+Usage:
+    uv run python benchmarks/bench_approx_profiling.py [--rows 1000000 10000000 50000000] [--columns 20]
+"""
+
+import argparse
+import time
+
+import duckdb
+
+from draw_dash.profiling import profile_table
+
+
+def create_table(connection, table_name: str, rows: int, columns: int):
+    """Create a table with alternating DOUBLE and high-cardinality VARCHAR columns"""
+    select_list = []
+    for i in range(columns):
+        if i % 2 == 0:
+            select_list.append(f"random() * {i + 1} AS c{i}")
+        else:
+            select_list.append(f"'v' || (hash(range + {i}) % {rows // (i + 1) + 1})::VARCHAR AS c{i}")
+    connection.execute(
+        f"CREATE OR REPLACE TABLE {table_name} AS SELECT {', '.join(select_list)} FROM range({rows})"
+    )
+
+
+def run(row_counts, columns: int):
+    connection = duckdb.connect(":memory:")
+    table_name = "bench"
+
+    print(f"columns={columns}")
+    print(f"{'rows':>11} {'exact s':>9} {'approx s':>9} {'speedup':>8} {'max distinct err':>17}")
+    for rows in row_counts:
+        create_table(connection, table_name, rows, columns)
+
+        start = time.perf_counter()
+        exact = profile_table(connection, table_name, approx_threshold=None)
+        exact_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        approx = profile_table(connection, table_name, approx_threshold=0)
+        approx_seconds = time.perf_counter() - start
+
+        errors = [
+            abs(approx["column_stats"][name]["distinct_count"] - stats["distinct_count"])
+            / max(stats["distinct_count"], 1)
+            for name, stats in exact["column_stats"].items()
+        ]
+        print(
+            f"{rows:>11} {exact_seconds:>9.3f} {approx_seconds:>9.3f} "
+            f"{exact_seconds / approx_seconds:>7.1f}x {max(errors):>17.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000, 50_000_000])
+    parser.add_argument("--columns", type=int, default=20)
+    args = parser.parse_args()
+    run(args.rows, args.columns)
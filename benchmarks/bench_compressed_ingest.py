@@ -0,0 +1,101 @@
+"""
+Benchmark: upload-to-queryable time for compressed vs. uncompressed datasets
+
+Writes the same rows as CSV and JSON, plain and gzip/zstd compressed, then
+ingests each the way /api/ingest does. Plain CSV/JSON is piped from the
+upload with ingest_stream. Compressed uploads are saved as is and read by
+DuckDB's decompressing reader with ingest_file. The clock stops once the
+table answers a COUNT(*).
+
+Usage:
+    uv run python benchmarks/bench_compressed_ingest.py [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+
+from draw_dash.duckdb_manager import DuckDBManager
+
+# (file name, COPY options)
+VARIANTS = [
+    ("data.csv", "(HEADER)"),
+    ("data.csv.gz", "(HEADER, COMPRESSION gzip)"),
+    ("data.csv.zst", "(HEADER, COMPRESSION zstd)"),
+    ("data.json", "(FORMAT json)"),
+    ("data.json.gz", "(FORMAT json, COMPRESSION gzip)"),
+    ("data.json.zst", "(FORMAT json, COMPRESSION zstd)"),
+]
+
+
+def write_variants(directory: Path, rows: int):
+    """Write the same rows in every variant and return their paths"""
+    connection = duckdb.connect(":memory:")
+    connection.execute(f"""
+        CREATE TABLE source AS
+        SELECT
+            range AS id,
+            random() * 1000 AS amount,
+            'region_' || (range % 50)::VARCHAR AS region,
+            DATE '2024-01-01' + (range % 365)::INTEGER AS day
+        FROM range({rows})
+    """)
+    paths = []
+    for name, options in VARIANTS:
+        path = directory / name
+        connection.execute(f"COPY source TO '{path}' {options}")
+        paths.append(path)
+    connection.close()
+    return paths
+
+
+def upload_to_queryable(manager: DuckDBManager, path: Path, upload_dir: Path) -> float:
+    """Ingest one upload along the backend's path and wait until it is queryable"""
+    start = time.perf_counter()
+    with path.open("rb") as upload:
+        if manager.can_stream(path.name):
+            manager.ingest_stream(upload, path.name, table_name="dataset", profile=False)
+        else:
+            saved = upload_dir / path.name
+            with saved.open("wb") as buffer:
+                shutil.copyfileobj(upload, buffer)
+            manager.ingest_file(str(saved), table_name="dataset", profile=False)
+    manager.connection.execute("SELECT COUNT(*) FROM dataset").fetchone()
+    return time.perf_counter() - start
+
+
+def run(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        upload_dir = directory / "uploads"
+        upload_dir.mkdir()
+        paths = write_variants(directory, rows)
+
+        print(f"rows={rows} repeat={repeat} (best of)")
+        print(f"{'file':<15} {'upload MB':>10} {'seconds':>9} {'vs plain':>9}")
+        plain = {}
+        for path in paths:
+            best = None
+            for _ in range(repeat):
+                # A fresh manager each time, so the table cache cannot answer
+                manager = DuckDBManager(memory_limit=None, spill_directory=None)
+                seconds = upload_to_queryable(manager, path, upload_dir)
+                manager.close()
+                best = seconds if best is None else min(best, seconds)
+
+            fmt = path.name.split(".")[1]
+            plain.setdefault(fmt, best)
+            size_mb = path.stat().st_size / (1024 * 1024)
+            print(f"{path.name:<15} {size_mb:>10.1f} {best:>9.3f} {best / plain[fmt]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -0,0 +1,75 @@
+"""
+Benchmark: schema lookup of SQL error diagnosis as the catalog grows
+
+Creates a growing number of session tables and times the schema part of
+diagnose_sql_error two ways: listing and describing every table on each
+call, as the tool used to, and a schema snapshot of the two tables one
+session owns, served from the schema cache. Suggestions for a misspelled
+column are timed the same two ways: a substring scan over every column
+of every table, and a lookup in the identifier index.
+
+Usage:
+    uv run python benchmarks/bench_diagnose.py [--tables 10 100 500] [--repeat 20]
+"""
+
+import argparse
+import time
+
+from draw_dash.duckdb_manager import DuckDBManager
+
+
+def describe_everything(manager: DuckDBManager):
+    tables = [row[0] for row in manager.connection.execute("SHOW TABLES").fetchall()]
+    return {
+        table: manager.connection.execute(f"DESCRIBE {table}").fetchall()
+        for table in tables
+    }
+
+
+def similar_everywhere(columns, missing: str):
+    return [
+        name for table in columns.values() for name, *_ in table
+        if missing.lower() in name.lower() or name.lower() in missing.lower()
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(table_counts, repeat: int):
+    print(f"{'tables':>8} {'describe all':>14} {'cached snapshot':>16} {'substring scan':>16} {'ranked lookup':>14}")
+    for count in table_counts:
+        manager = DuckDBManager(memory_limit=None, spill_directory=None)
+        for idx in range(count):
+            manager.connection.execute(
+                f"CREATE TABLE sales_{idx} AS "
+                f"SELECT range AS id, range * 1.5 AS amount, 'r' || range AS region FROM range(100)"
+            )
+        scope = ["sales_0", f"sales_{count - 1}"]
+
+        describe_all = timed(lambda: describe_everything(manager), repeat)
+        manager.schema_snapshot(scope)
+        snapshot = timed(lambda: manager.schema_snapshot(scope), repeat)
+
+        columns = describe_everything(manager)
+        scan = timed(lambda: similar_everywhere(columns, "amout"), repeat)
+        manager.resolve_identifier("amout", table_names=scope)
+        lookup = timed(lambda: manager.resolve_identifier("amout", table_names=scope), repeat)
+        manager.close()
+
+        print(
+            f"{count:>8} {describe_all * 1000:>12.2f}ms {snapshot * 1000:>14.3f}ms "
+            f"{scan * 1000:>14.3f}ms {lookup * 1000:>12.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.tables, args.repeat)
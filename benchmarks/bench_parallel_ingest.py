@@ -0,0 +1,75 @@
+"""
+Benchmark: N-file ingest time vs. worker count
+
+Generates N CSV files and ingests them with DuckDBManager.ingest_batch at
+different worker counts, each worker on its own DuckDB cursor.
+
+Usage:
+    uv run python benchmarks/bench_parallel_ingest.py [--files 16] [--rows 200000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+
+from draw_dash.duckdb_manager import DuckDBManager
+
+
+def write_csv_files(directory: Path, files: int, rows: int):
+    """Write `files` CSV files of `rows` rows each and return their paths"""
+    connection = duckdb.connect(":memory:")
+    paths = []
+    for i in range(files):
+        path = directory / f"dataset_{i}.csv"
+        connection.execute(f"""
+            COPY (
+                SELECT
+                    range AS id,
+                    random() * 1000 AS amount,
+                    'region_' || (range % 50)::VARCHAR AS region,
+                    DATE '2024-01-01' + (range % 365)::INTEGER AS day
+                FROM range({rows})
+            ) TO '{path}' (HEADER)
+        """)
+        paths.append(path)
+    connection.close()
+    return paths
+
+
+def run(files: int, rows: int, worker_counts):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_csv_files(Path(directory), files, rows)
+
+        print(f"files={files} rows/file={rows}")
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+        baseline = None
+        for workers in worker_counts:
+            manager = DuckDBManager()
+            items = [
+                {"table_name": f"dataset_{i}", "file_path": str(path)}
+                for i, path in enumerate(paths)
+            ]
+
+            start = time.perf_counter()
+            results = manager.ingest_batch(items, max_workers=workers)
+            seconds = time.perf_counter() - start
+            manager.close()
+
+            failed = [result for result in results if result["error"]]
+            if failed:
+                raise RuntimeError(f"{len(failed)} ingests failed: {failed[0]['error']}")
+
+            baseline = baseline or seconds
+            print(f"{workers:>8} {seconds:>9.3f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    run(args.files, args.rows, args.workers)
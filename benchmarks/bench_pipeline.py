@@ -0,0 +1,100 @@
+"""
+Benchmark: end-to-end latency of the agent pipeline, parallel vs. sequential
+
+Runs the pipeline of sequential_agent on data/marketing.csv and a sketch
+image up to the query generator, once as shipped (data_agent and
+json_extractor_agent side by side, then the join) and once with every
+stage in a row, and prints each stage's start offset and duration from
+the stage_timing_* session state. dash_agent rewrites the dashboard code,
+so it is left out; it runs after the join in both layouts.
+
+The stage cache is disabled so every stage calls its model; pass --cached
+to measure re-runs instead. Needs the model credentials of src/draw_dash/.env.
+
+Usage:
+    uv run python benchmarks/bench_pipeline.py --image sketch.png [--runs 3] [--cached]
+"""
+
+import argparse
+import asyncio
+import mimetypes
+import os
+import statistics
+from pathlib import Path
+
+
+async def run_once(agent, image: bytes, mime_type: str):
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    runner = InMemoryRunner(agent=agent, app_name="bench_pipeline")
+    session = await runner.session_service.create_session(app_name="bench_pipeline", user_id="bench")
+    message = types.Content(role="user", parts=[
+        types.Part(text="Build a dashboard of the attached sketch from the data."),
+        types.Part(inline_data=types.Blob(mime_type=mime_type, data=image)),
+    ])
+    async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        pass
+    session = await runner.session_service.get_session(
+        app_name="bench_pipeline", user_id="bench", session_id=session.id
+    )
+    return session.state
+
+
+def layouts():
+    from google.adk.agents import SequentialAgent
+    from draw_dash.agents.sequential_agent.agent import root_agent, TIMED
+
+    parallel, join, _dash = root_agent.sub_agents
+    return {
+        "parallel": SequentialAgent(name="parallel_pipeline", sub_agents=[parallel.clone(), join.clone()], **TIMED),
+        "sequential": SequentialAgent(
+            name="sequential_pipeline",
+            sub_agents=[stage.clone() for stage in parallel.sub_agents] + [join.clone()],
+            **TIMED,
+        ),
+    }
+
+
+def run(image_path: str, runs: int):
+    from draw_dash.agents.sequential_agent.timing import STAGE_TIMING_PREFIX
+    from draw_dash.db import initialise_db
+
+    initialise_db()
+    image = Path(image_path).read_bytes()
+    mime_type = mimetypes.guess_type(image_path)[0] or "image/png"
+
+    totals = {}
+    for layout, agent in layouts().items():
+        totals[layout] = []
+        for idx in range(runs):
+            state = asyncio.run(run_once(agent, image, mime_type))
+            timings = {
+                name[len(STAGE_TIMING_PREFIX):]: value
+                for name, value in state.items() if name.startswith(STAGE_TIMING_PREFIX)
+            }
+            totals[layout].append(timings[agent.name]["seconds"])
+
+            print(f"{layout} run {idx + 1}")
+            print(f"    {'stage':<24} {'started':>9} {'seconds':>9}")
+            for stage, timing in sorted(timings.items(), key=lambda item: item[1]["started"]):
+                print(f"    {stage:<24} {timing['started']:>8.2f}s {timing['seconds']:>8.2f}s")
+
+    print()
+    for layout, seconds in totals.items():
+        print(f"{layout:<12} median end-to-end {statistics.median(seconds):>8.2f}s over {len(seconds)} runs")
+    saved = statistics.median(totals["sequential"]) - statistics.median(totals["parallel"])
+    print(f"{'saved':<12} {saved:>26.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--image", required=True, help="Sketch of the dashboard")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--cached", action="store_true", help="Keep the stage cache enabled")
+    args = parser.parse_args()
+    if not args.cached:
+        # Read when draw_dash.stage_cache is first imported
+        os.environ["DRAWDASH_STAGE_CACHE_ENTRIES"] = "0"
+        os.environ.pop("DRAWDASH_STAGE_CACHE_DIR", None)
+    run(args.image, args.runs)
@@ -0,0 +1,94 @@
+"""
+Benchmark: table profiling scan count and wall time vs. column count
+
+Compares the legacy per-column profiler (one full scan per numeric/VARCHAR
+column) with the single-pass profiler in draw_dash.profiling.
+
+Usage:
+    uv run python benchmarks/bench_profiling.py [--rows 200000] [--columns 10 50 100 300]
+"""
+
+import argparse
+import time
+
+import duckdb
+
+from draw_dash.profiling import describe_table, profile_table
+
+
+class CountingConnection:
+    """Wraps a DuckDB connection and counts queries that scan the table"""
+
+    def __init__(self, connection, table_name: str):
+        self.connection = connection
+        self.table_name = table_name
+        self.scans = 0
+
+    def execute(self, query: str, *args, **kwargs):
+        normalized = " ".join(query.split()).upper()
+        if f"FROM {self.table_name.upper()}" in normalized and "LIMIT" not in normalized:
+            self.scans += 1
+        return self.connection.execute(query, *args, **kwargs)
+
+
+def legacy_profile(connection, table_name: str):
+    """Reproduction of the original per-column profiling loop"""
+    connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()
+    for col in describe_table(connection, table_name):
+        col_name, col_type = col["name"], col["type"].upper()
+        if any(t in col_type for t in ["INT", "FLOAT", "DOUBLE", "DECIMAL", "NUMERIC"]):
+            connection.execute(
+                f"SELECT MIN({col_name}), MAX({col_name}), AVG({col_name}), "
+                f"COUNT(DISTINCT {col_name}) FROM {table_name}"
+            ).fetchone()
+        elif "VARCHAR" in col_type:
+            connection.execute(f"SELECT COUNT(DISTINCT {col_name}) FROM {table_name}").fetchone()
+    connection.execute(f"SELECT * FROM {table_name} LIMIT 5").fetchdf()
+
+
+def create_wide_table(connection, table_name: str, rows: int, columns: int):
+    """Create a table with alternating DOUBLE and VARCHAR columns"""
+    select_list = []
+    for i in range(columns):
+        if i % 2 == 0:
+            select_list.append(f"random() * {i + 1} AS c{i}")
+        else:
+            select_list.append(f"'v' || (range % {10 * (i + 1)})::VARCHAR AS c{i}")
+    connection.execute(
+        f"CREATE OR REPLACE TABLE {table_name} AS SELECT {', '.join(select_list)} FROM range({rows})"
+    )
+
+
+def run(rows: int, column_counts):
+    connection = duckdb.connect(":memory:")
+    table_name = "bench"
+
+    print(f"rows={rows}")
+    print(f"{'columns':>8} {'legacy scans':>13} {'legacy s':>9} {'single scans':>13} {'single s':>9} {'speedup':>8}")
+    for columns in column_counts:
+        create_wide_table(connection, table_name, rows, columns)
+        # Warm up the buffer manager so neither profiler pays first-touch cost
+        connection.execute(f"SELECT * FROM {table_name}").fetchall()
+
+        legacy = CountingConnection(connection, table_name)
+        start = time.perf_counter()
+        legacy_profile(legacy, table_name)
+        legacy_seconds = time.perf_counter() - start
+
+        single = CountingConnection(connection, table_name)
+        start = time.perf_counter()
+        profile_table(single, table_name)
+        single_seconds = time.perf_counter() - start
+
+        print(
+            f"{columns:>8} {legacy.scans:>13} {legacy_seconds:>9.3f} "
+            f"{single.scans:>13} {single_seconds:>9.3f} {legacy_seconds / single_seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 50, 100, 300])
+    args = parser.parse_args()
+    run(args.rows, args.columns)
@@ -0,0 +1,59 @@
+"""
+Benchmark: concurrent query throughput vs. cursor pool size
+
+Runs the same aggregate query from many client threads through
+DuckDBManager.execute_query for each pool size and reports queries per
+second and the pool's wait-time metrics.
+
+Usage:
+    uv run python benchmarks/bench_query_pool.py [--rows 1000000] [--clients 16] [--queries 200] [--pool-sizes 1 2 4 8]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from draw_dash.duckdb_manager import DuckDBManager
+
+QUERY = """
+    SELECT region, COUNT(*) AS orders, AVG(amount) AS avg_amount
+    FROM sales
+    GROUP BY region
+    ORDER BY region
+"""
+
+
+def run(rows: int, clients: int, queries: int, pool_sizes):
+    print(f"rows={rows} clients={clients} queries={queries}")
+    print(f"{'pool':>5} {'seconds':>9} {'qps':>9} {'avg wait ms':>12} {'max wait ms':>12}")
+    for pool_size in pool_sizes:
+        manager = DuckDBManager(pool_size=pool_size)
+        manager.connection.execute(f"""
+            CREATE TABLE sales AS
+            SELECT random() * 1000 AS amount, 'region_' || (range % 50)::VARCHAR AS region
+            FROM range({rows})
+        """)
+        # Warm up so every run starts with the table in memory
+        manager.execute_query(QUERY)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            list(executor.map(lambda _: manager.execute_query(QUERY), range(queries)))
+        seconds = time.perf_counter() - start
+
+        stats = manager.query_pool.stats()
+        print(
+            f"{pool_size:>5} {seconds:>9.3f} {queries / seconds:>9.1f} "
+            f"{stats['avg_wait_ms']:>12.2f} {stats['max_wait_ms']:>12.2f}"
+        )
+        manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    run(args.rows, args.clients, args.queries, args.pool_sizes)
@@ -0,0 +1,70 @@
+"""
+Benchmark: restart recovery, re-ingesting vs. re-attaching a persistent database
+
+Ingests and profiles a generated CSV into a database file, then compares
+the two ways a restarted backend gets the session back: ingesting and
+profiling the file again, or opening the file and restoring the table
+cache and sessions from its catalog index.
+
+Usage:
+    uv run python benchmarks/bench_restart.py [--rows 1000000] [--sessions 20]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from draw_dash.duckdb_manager import DuckDBManager
+from draw_dash.memory_budget import MemoryBudget
+from draw_dash.session_manager import SessionManager
+
+
+def run(rows: int, sessions: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "data.csv")
+        db_path = os.path.join(tmp, "drawdash.duckdb")
+
+        manager = DuckDBManager(memory_limit=None, spill_directory=None)
+        manager.connection.execute(f"""
+            COPY (
+                SELECT range AS id, random() * 1000 AS amount,
+                       'region_' || (range % 50)::VARCHAR AS region
+                FROM range({rows})
+            ) TO '{csv_path}' (HEADER)
+        """)
+        manager.close()
+
+        # Fresh backend: every session re-uploads and is re-profiled
+        manager = DuckDBManager(memory_limit=None, spill_directory=None)
+        start = time.perf_counter()
+        manager.ingest_file(csv_path, "sales")
+        reingest = time.perf_counter() - start
+        manager.close()
+
+        # Persistent backend: ingest once, then restart
+        manager = DuckDBManager(db_path, memory_limit=None, spill_directory=None)
+        store = SessionManager(manager, MemoryBudget(None, None))
+        for idx in range(sessions):
+            metadata = manager.ingest_file(csv_path, f"sales_{idx}")
+            metadata["file_size"] = os.path.getsize(csv_path)
+            store[f"session_{idx}"] = {"tables": [metadata], "errors": [], "stats_status": "ready"}
+        manager.close()
+
+        start = time.perf_counter()
+        manager = DuckDBManager(db_path, memory_limit=None, spill_directory=None)
+        restored = SessionManager(manager, MemoryBudget(None, None)).restore()
+        reattach = time.perf_counter() - start
+        manager.close()
+
+    print(f"rows={rows} sessions={sessions}")
+    print(f"{'re-ingest and profile one session':<36} {reingest:>8.3f}s")
+    print(f"{f're-attach {len(restored)} session(s)':<36} {reattach:>8.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=20)
+    args = parser.parse_args()
+    run(args.rows, args.sessions)
@@ -0,0 +1,71 @@
+"""
+Benchmark: tool latency and output size of full results vs. bounded previews
+
+Times the query tools' old way of answering a query, reading the whole
+result and cutting it to 50 rows (read_data) or serializing every row
+(execute_query), against preview_query, which pushes the row limit into
+the plan and adds a per-column summary. Output size is what ends up in
+the agent's prompt.
+
+Usage:
+    uv run python benchmarks/bench_result_preview.py [--rows 10000 1000000 5000000]
+"""
+
+import argparse
+import json
+import time
+
+from draw_dash.catalog import LocalCatalog
+from draw_dash.duckdb_manager import DuckDBManager
+from draw_dash.result_preview import preview_query
+
+QUERY = "SELECT * FROM sales ORDER BY amount DESC"
+
+
+def timed(fn):
+    start = time.perf_counter()
+    output = fn()
+    return time.perf_counter() - start, len(output)
+
+
+def run(row_counts):
+    print(f"{'rows':>9} {'tool':>14} {'full result':>12} {'preview':>10} {'full bytes':>12} {'preview bytes':>14}")
+    for rows in row_counts:
+        manager = DuckDBManager(query_cache_bytes=0, memory_limit=None, spill_directory=None)
+        manager.connection.execute(f"""
+            CREATE TABLE sales AS
+            SELECT range AS id, random() * 1000 AS amount, 'region_' || (range % 50)::VARCHAR AS region
+            FROM range({rows})
+        """)
+        catalog = LocalCatalog(manager)
+
+        def preview_json():
+            preview = preview_query(catalog, QUERY)
+            return json.dumps({
+                "row_count": preview["row_count"],
+                "rows": preview["rows"].to_pylist(),
+                "summary": preview["summary"],
+            }, default=str)
+
+        # No query cache, so every run reaches DuckDB
+        cases = [
+            ("read_data", lambda: catalog.execute_arrow(QUERY).to_pandas().head(50).to_markdown(),
+             lambda: preview_query(catalog, QUERY)["rows"].to_pandas().to_markdown()),
+            ("execute_query", lambda: catalog.execute_arrow(QUERY).to_pandas().to_json(orient="records"),
+             preview_json),
+        ]
+        for tool, full, bounded in cases:
+            full_seconds, full_bytes = timed(full)
+            preview_seconds, preview_bytes = timed(bounded)
+            print(
+                f"{rows:>9} {tool:>14} {full_seconds * 1000:>10.1f}ms {preview_seconds * 1000:>8.1f}ms "
+                f"{full_bytes:>12} {preview_bytes:>14}"
+            )
+        manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 5_000_000])
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,69 @@
+"""
+Benchmark: LLM retry iterations saved by local SQL validation and repair
+
+Replays a recorded corpus of generated queries against marketing.csv.
+Every query that fails to bind costs the QueryRetryLoop at least one more
+iteration (a query_generator and a query_execution_agent model call);
+queries the validation stage repairs locally cost none. Seconds saved are
+the saved iterations times --llm-seconds, the measured latency of one
+retry iteration in your deployment, minus the local repair time.
+
+Usage:
+    uv run python benchmarks/bench_sql_repair.py [--corpus benchmarks/query_corpus.json] [--llm-seconds 15]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from draw_dash.db import PATH_DATA
+from draw_dash.duckdb_manager import DuckDBManager
+from draw_dash.sql_repair import repair_query
+
+
+def run(corpus_path: str, llm_seconds: float, verbose: bool):
+    corpus = json.loads(Path(corpus_path).read_text())
+
+    manager = DuckDBManager(memory_limit=None, spill_directory=None)
+    manager.ingest_file(str(PATH_DATA / "marketing.csv"), "marketing")
+    schema = manager.schema_snapshot(["marketing"])["tables"]
+
+    failing = repaired = 0
+    local_seconds = 0.0
+    for entry in corpus:
+        query = entry["query"]
+        if manager.validate_query(query) is None:
+            continue
+        failing += 1
+
+        start = time.perf_counter()
+        result = repair_query(query, manager.validate_query, schema)
+        local_seconds += time.perf_counter() - start
+
+        if result["valid"]:
+            repaired += 1
+        if verbose:
+            status = "repaired" if result["valid"] else "left to the model"
+            print(f"[{status}] {entry['error']}: {query}")
+            for fix in result["fixes"]:
+                print(f"    {fix}")
+            for suggestion in result["suggestions"]:
+                print(f'    not applied: {suggestion["kind"]} "{suggestion["original"]}" -> '
+                      f'"{suggestion["replacement"]}" (similarity {suggestion["similarity"]})')
+    manager.close()
+
+    print(f"queries={len(corpus)} failing={failing} repaired locally={repaired}")
+    print(f"{'LLM iterations saved':<32} {repaired:>8}")
+    print(f"{'model calls saved':<32} {repaired * 2:>8}")
+    print(f"{'local repair time':<32} {local_seconds:>8.3f}s")
+    print(f"{'seconds saved':<32} {repaired * llm_seconds - local_seconds:>8.1f}s  (at {llm_seconds:g}s per iteration)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=str(Path(__file__).parent / "query_corpus.json"))
+    parser.add_argument("--llm-seconds", type=float, default=15.0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    run(args.corpus, args.llm_seconds, args.verbose)
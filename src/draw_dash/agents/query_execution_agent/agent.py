@@ -1,6 +1,7 @@
 from google.adk.agents import Agent
 
-from draw_dash.tool import execute_query, diagnose_sql_error, format_diagnosis_for_agent
+from draw_dash.tool import diagnose_sql_error, format_diagnosis_for_agent
+from draw_dash.tool.execute_query import execute_query
 from google.adk.tools import ToolContext
 
 
@@ -27,7 +28,7 @@ EXECUTION LOGIC:
 1. Execute the SQL query using execute_query tool
 2. Check the result type:
 
-   IF RESULT IS A DATAFRAME (success):
+   IF RESULT IS JSON (success):
    - IMMEDIATELY call exit_loop tool
    - Output confirmation message
    - Job finished
@@ -38,9 +39,13 @@ EXECUTION LOGIC:
    - Continue to next iteration
 
 DECISION CRITERIA:
-- SUCCESS = Result is a JSON string (starts with '[' and contains data)
+- SUCCESS = Result is a JSON object with "rows" and "summary"
 - FAILURE = Result is an error string"
 
+On success the result holds the first rows, the total row_count and a per-column
+summary (min, max, null_count) of the full result; row_count and the summary
+describe every row, not only the ones shown.
+
 The successful SQL results will be returned as the final output to the next agent in the pipeline.
 """,
     tools=[execute_query, diagnose_sql_error, format_diagnosis_for_agent, exit_loop],
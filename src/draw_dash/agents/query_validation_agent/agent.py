@@ -0,0 +1,87 @@
+"""
+QueryValidation Agent
+
+Runs between query_generator and query_execution_agent without calling a
+model. It binds the generated SQL against the database without running
+it and fixes mechanical errors (misspelled names, missing GROUP BY keys)
+in place, so they do not cost another generator round trip.
+
+Every name it rewrites, and every close match it would not rewrite on
+its own, is listed in its message, which the generator sees on a retry,
+and under rewrites and suggestions in the query_validation state.
+"""
+
+import asyncio
+import time
+from typing import AsyncGenerator, Any, Dict, List
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from draw_dash.tool.read_data import SESSION_TABLES_KEY
+from draw_dash.tool.validate_query import check_query
+
+
+def _suggested(suggestions: List[Dict[str, Any]]) -> str:
+    """Close matches not applied, e.g. table "PAYMENT" -> "PAYMENTS"?"""
+    return "; ".join(
+        f'{suggestion["kind"]} "{suggestion["original"]}" -> "{suggestion["replacement"]}"?'
+        for suggestion in suggestions
+    )
+
+
+class QueryValidationAgent(BaseAgent):
+    """Validates and repairs the query in session state before it is executed"""
+
+    query_key: str = "all_query"  # State key the generator writes its SQL to
+    output_key: str = "generated_query"  # State key the execution agent reads
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        query = ctx.session.state.get(self.query_key)
+        if not query:
+            return
+
+        tables = ctx.session.state.get(SESSION_TABLES_KEY)
+        start = time.perf_counter()
+        result = await asyncio.to_thread(check_query, query, tables)
+        elapsed = time.perf_counter() - start
+
+        validations = dict(ctx.session.state.get("query_validation_stats") or {})
+        validations["checked"] = validations.get("checked", 0) + 1
+        validations["repaired"] = validations.get("repaired", 0) + int(bool(result["fixes"]) and result["valid"])
+        validations["seconds"] = validations.get("seconds", 0.0) + elapsed
+
+        state_delta = {
+            self.output_key: result["query"],
+            "query_validation": {**result, "seconds": elapsed},
+            "query_validation_stats": validations,
+        }
+        if result["fixes"]:
+            state_delta[self.query_key] = result["query"]
+
+        if result["valid"] and result["fixes"]:
+            message = "Query repaired locally: " + "; ".join(result["fixes"])
+        elif result["valid"]:
+            message = "Query binds against the schema."
+        else:
+            message = f"Query does not bind and could not be repaired locally: {result['error']}"
+            if result["fixes"]:
+                message += "\nFixed before that: " + "; ".join(result["fixes"])
+        if result["suggestions"]:
+            message += f"\nClosest names in scope, not applied: {_suggested(result['suggestions'])}"
+
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            content=types.Content(role="model", parts=[types.Part(text=message)]),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+
+# ADK web requires this to be named 'root_agent'
+root_agent = QueryValidationAgent(
+    name="query_validation_agent",
+    description="Binds the generated SQL without running it and repairs mechanical errors before execution",
+)
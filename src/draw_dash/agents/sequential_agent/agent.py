@@ -1,17 +1,53 @@
-from google.adk.agents import SequentialAgent
+from google.adk.agents import SequentialAgent, ParallelAgent
 
 from draw_dash.agents.data_agent.agent import root_agent as data_agent
 from draw_dash.agents.json_extractor_agent.agent import root_agent as json_extractor_agent
 from draw_dash.agents.query_generator_agent.agent import root_agent as query_generator_agent
 from draw_dash.agents.dash_agent.agent import root_agent as dash_agent
+from draw_dash.agents.sequential_agent.memoized_stage import MemoizedStage
+from draw_dash.agents.sequential_agent.timing import start_stage_timer, stop_stage_timer
 
+# Every stage records its start offset and duration under stage_timing_<name>
+TIMED = {"before_agent_callback": start_stage_timer, "after_agent_callback": stop_stage_timer}
+
+# Stages up to the dashboard are replayed from the stage cache when their
+# inputs are unchanged, so a re-run only pays for the stages after the first change
+data_stage = MemoizedStage(
+    name="data_stage",
+    sub_agents=[data_agent],
+    output_keys=["table_information"],
+    data_files=True,
+    **TIMED,
+)
+json_extractor_stage = MemoizedStage(
+    name="json_extractor_stage",
+    sub_agents=[json_extractor_agent],
+    output_keys=["dash_json"],
+    images=True,
+    **TIMED,
+)
+
+# Ingesting the data and reading the sketch are independent, so they run
+# side by side; the query generator joins them and does not run unless
+# both table_information and dash_json are in session state
 root_agent = SequentialAgent(
     name="sequential_agent",
     description="Orchestrates the complete workflow from sketch analysis to query execution",
     sub_agents=[
-        data_agent,
-        json_extractor_agent,
-        query_generator_agent,
-        dash_agent,
+        ParallelAgent(
+            name="data_and_sketch_stage",
+            description="Ingests the data and extracts the chart spec from the sketch concurrently",
+            sub_agents=[data_stage, json_extractor_stage],
+            **TIMED,
+        ),
+        MemoizedStage(
+            name="query_generator_stage",
+            sub_agents=[query_generator_agent],
+            output_keys=["all_query"],
+            input_keys=["table_information", "dash_json"],
+            **TIMED,
+        ),
+        dash_agent.clone(update=TIMED),
     ],
+    **TIMED,
 )
@@ -0,0 +1,157 @@
+"""
+MemoizedStage
+
+Wraps one stage of the sequential pipeline. The stage's inputs (data file
+hashes, image hashes, upstream outputs, models and instructions) address
+a cache entry holding what the stage wrote to session state; on a hit the
+entry is replayed instead of running the stage, so a re-run resumes at
+the first stage whose inputs changed.
+
+A stage whose upstream inputs are not all in session state, e.g. because
+a stage it joins failed, does not run and fails the invocation.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import AsyncGenerator, Dict, Any, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.sessions.state import State
+from google.genai import types
+
+from draw_dash.catalog import get_catalog
+from draw_dash.stage_cache import get_stage_cache, stage_key, hash_bytes, hash_text
+from draw_dash.table_cache import hash_file
+from draw_dash.tool.read_data import SESSION_TABLES_KEY, read_data_files
+
+# Session state key prefix recording whether a stage ran or was replayed,
+# e.g. stage_cache_data_agent; one key per stage, as stages may run in parallel
+STAGE_CACHE_PREFIX = "stage_cache_"
+
+
+class StageInputsMissing(RuntimeError):
+    """An upstream stage did not write a state key the stage reads"""
+
+
+def _agents(agent: BaseAgent) -> List[BaseAgent]:
+    """An agent and all its descendants"""
+    found = [agent]
+    for sub_agent in agent.sub_agents:
+        found.extend(_agents(sub_agent))
+    return found
+
+
+def _fingerprint(agent: BaseAgent) -> Dict[str, Any]:
+    """What of an agent's configuration its output depends on"""
+    fingerprint: Dict[str, Any] = {"name": agent.name, "type": type(agent).__name__}
+    if isinstance(agent, LlmAgent):
+        instruction = agent.instruction if isinstance(agent.instruction, str) else agent.instruction.__qualname__
+        fingerprint.update({
+            "model": agent.model if isinstance(agent.model, str) else agent.model.model,
+            "instruction": hash_text(instruction),
+            "tools": sorted(getattr(tool, "__name__", None) or getattr(tool, "name", repr(tool)) for tool in agent.tools),
+            "output_key": agent.output_key,
+        })
+    return fingerprint
+
+
+def _image_hashes(content: Optional[types.Content]) -> List[str]:
+    """Hashes of the images attached to the user's message"""
+    if content is None or not content.parts:
+        return []
+    return [
+        hash_bytes(part.inline_data.data)
+        for part in content.parts
+        if part.inline_data is not None and part.inline_data.data
+        and (part.inline_data.mime_type or "").startswith("image/")
+    ]
+
+
+class MemoizedStage(BaseAgent):
+    """Runs its one sub-agent unless its output for the same inputs is cached"""
+
+    output_keys: List[str]  # State keys the stage must write for its output to be cached
+    input_keys: List[str] = []  # Upstream state keys the stage reads
+    data_files: bool = False  # Whether the stage reads the data files
+    images: bool = False  # Whether the stage reads the images of the user's message
+
+    @property
+    def stage(self) -> BaseAgent:
+        return self.sub_agents[0]
+
+    def stage_key(self, ctx: InvocationContext) -> str:
+        """Content address of the stage's inputs in this invocation"""
+        inputs: Dict[str, Any] = {
+            "agents": [_fingerprint(agent) for agent in _agents(self.stage)],
+            "state": {key: ctx.session.state.get(key) for key in self.input_keys},
+        }
+        if self.data_files:
+            inputs["files"] = {Path(path).name: hash_file(Path(path)) for path in read_data_files() if Path(path).is_file()}
+        if self.images:
+            inputs["images"] = _image_hashes(ctx.user_content)
+        return stage_key(inputs)
+
+    @staticmethod
+    def _usable(entry: Dict[str, Any]) -> bool:
+        """Whether the tables a cached stage ingested are still in the catalog"""
+        tables = entry["state"].get(SESSION_TABLES_KEY)
+        if not tables:
+            return True
+        return set(tables) <= set(get_catalog().table_list())
+
+    def _record(self, outcome: str) -> Dict[str, Any]:
+        """State delta noting whether the stage ran or was replayed"""
+        return {f"{STAGE_CACHE_PREFIX}{self.stage.name}": outcome}
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        missing = [key for key in self.input_keys if ctx.session.state.get(key) is None]
+        if missing:
+            yield Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(
+                    text=f"{self.stage.name} did not run: no {', '.join(missing)} in session state."
+                )]),
+                actions=EventActions(state_delta=self._record("missing inputs")),
+            )
+            # Later stages would run on the same missing state
+            raise StageInputsMissing(f"{self.stage.name} needs {', '.join(missing)}")
+
+        cache = get_stage_cache()
+        key = await asyncio.to_thread(self.stage_key, ctx)
+        entry = cache.get(key)
+        if entry is not None and await asyncio.to_thread(self._usable, entry):
+            # Replay the stage's state and answer, so later stages see both
+            content = types.Content(role="model", parts=[types.Part(text=entry["text"])]) if entry["text"] else None
+            yield Event(
+                author=self.stage.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                content=content,
+                actions=EventActions(state_delta={**entry["state"], **self._record("cached")}),
+            )
+            return
+
+        state: Dict[str, Any] = {}
+        text = None
+        async for event in self.stage.run_async(ctx):
+            if event.actions and event.actions.state_delta:
+                state.update({
+                    name: value for name, value in event.actions.state_delta.items()
+                    if not name.startswith(State.TEMP_PREFIX) and not name.startswith(STAGE_CACHE_PREFIX)
+                })
+            if event.author == self.stage.name and event.is_final_response() and event.content and event.content.parts:
+                text = "".join(part.text for part in event.content.parts if part.text and not part.thought) or text
+            yield event
+
+        if all(name in state for name in self.output_keys):
+            await asyncio.to_thread(cache.put, key, {"stage": self.stage.name, "state": state, "text": text})
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=self._record("ran")),
+        )
@@ -0,0 +1,47 @@
+"""
+Stage timing for the sequential pipeline
+
+before/after agent callbacks that record when each stage started,
+relative to the start of the pipeline, and how long it took. Each stage
+writes its own state key, so stages running in parallel do not
+overwrite each other's timing.
+
+Start times are kept in temp: session state, which lives for one
+invocation and is never persisted, so a stage that raises before its
+after-callback runs leaves nothing behind.
+"""
+
+import time
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.sessions.state import State
+
+# Session state key prefix of a stage's timing, e.g. stage_timing_data_stage
+STAGE_TIMING_PREFIX = "stage_timing_"
+
+# Invocation-scoped keys holding perf_counter readings
+_PIPELINE_STARTED = f"{State.TEMP_PREFIX}{STAGE_TIMING_PREFIX}pipeline"
+_STAGE_STARTED = f"{State.TEMP_PREFIX}{STAGE_TIMING_PREFIX}started_"
+
+
+def start_stage_timer(callback_context: CallbackContext):
+    """before_agent_callback: note when a stage starts"""
+    now = time.perf_counter()
+    callback_context.state[f"{_STAGE_STARTED}{callback_context.agent_name}"] = now
+    # The first timed agent of an invocation is the pipeline itself
+    if callback_context.state.get(_PIPELINE_STARTED) is None:
+        callback_context.state[_PIPELINE_STARTED] = now
+
+
+def stop_stage_timer(callback_context: CallbackContext):
+    """after_agent_callback: record a stage's start offset and duration in session state"""
+    now = time.perf_counter()
+    name = callback_context.agent_name
+    started = callback_context.state.get(f"{_STAGE_STARTED}{name}")
+    if started is None:
+        return
+    pipeline_started = callback_context.state.get(_PIPELINE_STARTED, started)
+    callback_context.state[f"{STAGE_TIMING_PREFIX}{name}"] = {
+        "started": round(started - pipeline_started, 3),
+        "seconds": round(now - started, 3),
+    }
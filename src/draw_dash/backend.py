@@ -3,14 +3,30 @@ DrawDash Backend API
 FastAPI server for handling agent orchestration and data processing
 """
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Request, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
+import asyncio
+import io
+import logging
+import uuid
 import tempfile
 import shutil
 from pathlib import Path
-from draw_dash.duckdb_manager import db_manager
+import duckdb
+import pyarrow as pa
+from draw_dash.duckdb_manager import db_manager, split_compression
+from draw_dash.memory_budget import memory_budget, MemoryBudgetExceeded
+from draw_dash.profiling import is_profiled
+from draw_dash.query_profiles import query_profiles
+from draw_dash.query_watchdog import query_watchdog, QueryInterrupted, SessionQueryLimitExceeded
+from draw_dash.session_manager import SessionManager, SWEEP_INTERVAL
+from draw_dash.upload_manager import upload_manager, UPLOAD_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -40,6 +56,84 @@ class IngestResponse(BaseModel):
     screenshot_info: Dict[str, Any]
     message: str
     clarification: Optional[str] = None
+    errors: List[Dict[str, Any]] = []  # Per-file ingest failures
+    stats_status: str = "ready"  # "pending" while column stats are computed
+
+
+class SessionDeleteResponse(BaseModel):
+    """Result of deleting a session"""
+    session_id: str
+    reclaimed_bytes: int
+
+
+class AppendResponse(BaseModel):
+    """Response after appending rows to a table"""
+    session_id: str
+    table: Dict[str, Any]  # Table metadata after the append
+    appended_rows: int
+    message: str
+
+
+class SessionMetadataResponse(BaseModel):
+    """Table metadata of a session, with column stats once ready"""
+    session_id: str
+    tables: List[Dict[str, Any]]
+    stats_status: str  # "pending", "ready" or "failed"
+    errors: List[Dict[str, Any]] = []
+
+
+class QueryRequest(BaseModel):
+    """SQL query to run against the ingested tables"""
+    query: str
+    format: str = "arrow"  # "arrow" (IPC stream) or "json"
+    batch_size: int = 65536
+    session_id: Optional[str] = None  # Counted against the session's query cap
+    timeout: Optional[float] = None  # Seconds; defaults to DRAWDASH_QUERY_TIMEOUT
+    query_id: Optional[str] = None  # Lets the client cancel the query while it runs
+
+
+class ValidateRequest(BaseModel):
+    """SQL query to bind without running it"""
+    query: str
+
+
+class PrepareRequest(BaseModel):
+    """Named query template with $name parameters"""
+    name: str
+    query: str
+
+
+class ExecuteStatementRequest(BaseModel):
+    """Parameter values for a prepared statement"""
+    params: Dict[str, Any] = {}
+    format: str = "arrow"  # "arrow" (IPC stream) or "json"
+    batch_size: int = 65536
+    timeout: Optional[float] = None
+    query_id: Optional[str] = None
+
+
+class UploadInitRequest(BaseModel):
+    """Start of a chunked upload"""
+    filename: str
+    size: int
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+
+
+class UploadCompleteRequest(BaseModel):
+    """End of a chunked upload"""
+    sha256: Optional[str] = None  # Digest of the whole file, verified if given
+
+
+class UploadStatusResponse(BaseModel):
+    """Progress of a chunked upload"""
+    upload_id: str
+    filename: str
+    size: int
+    chunk_size: int
+    part_count: int
+    received: List[int]
+    missing: List[int]
+    complete: bool
 
 
 class AgentUnderstanding(BaseModel):
@@ -55,11 +149,38 @@ class AgentUnderstanding(BaseModel):
 # App State Storage
 # ============================================================================
 
+async def sweep_sessions():
+    """Periodically expire idle sessions and relieve memory pressure"""
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        try:
+            await run_in_threadpool(app.state.sessions.sweep)
+            await run_in_threadpool(upload_manager.sweep)
+        except Exception:
+            # Keep sweeping; the next pass retries what this one missed
+            logger.exception("Session sweep failed")
+
+
 # Initialize app state on startup
 @app.on_event("startup")
 async def startup_event():
     """Initialize application state"""
-    app.state.sessions = {}  # session_id -> session metadata
+    # session_id -> session metadata, with idle expiry
+    app.state.sessions = SessionManager(db_manager, memory_budget)
+    app.state.sweeper = asyncio.create_task(sweep_sessions())
+
+    # With a persistent database, sessions come back from its catalog index
+    # without re-reading their data; only unfinished stats are recomputed
+    for session_id in await run_in_threadpool(app.state.sessions.restore):
+        if app.state.sessions[session_id].get("stats_status") == "pending":
+            asyncio.create_task(run_in_threadpool(profile_session_tables, session_id))
+    restore_catalog_charges()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the session sweeper"""
+    app.state.sweeper.cancel()
 
 
 # ============================================================================
@@ -76,44 +197,107 @@ async def root():
     }
 
 
+def profile_session_tables(session_id: str):
+    """
+    Compute column stats and sample rows for a session's tables
+
+    Runs as a background task after /api/ingest has returned the schemas.
+    Each table's metadata is updated in place in app.state.sessions.
+
+    Args:
+        session_id: Session identifier
+    """
+    session = app.state.sessions.get(session_id)
+    if session is None:
+        return
+
+    tables = session["tables"]
+    results = db_manager.profile_tables([table["table_name"] for table in tables])
+
+    profile_errors = []
+    for table, result in zip(tables, results):
+        if result["error"] is not None:
+            profile_errors.append({
+                "filename": table.get("original_filename"),
+                "table_name": result["table_name"],
+                "error": result["error"]
+            })
+            continue
+        table.update(result["metadata"])
+
+    session["errors"].extend(profile_errors)
+    session["stats_status"] = "failed" if profile_errors else "ready"
+    app.state.sessions.save(session_id)
+
+
 @app.post("/api/ingest", response_model=IngestResponse)
 async def ingest_data(
-    datasets: List[UploadFile] = File(...),
+    background_tasks: BackgroundTasks,
+    datasets: List[UploadFile] = File(None),
     screenshot: UploadFile = File(...),
-    clarification: Optional[str] = Form(None)
+    clarification: Optional[str] = Form(None),
+    upload_ids: List[str] = Form(None)
 ):
     """
     Unified endpoint: Upload files and ingest data into DuckDB
 
     This endpoint:
-    1. Accepts multiple dataset files and a screenshot
+    1. Accepts multiple dataset files and a screenshot. Datasets over
+       10MB are sent through /api/uploads first and referenced by
+       upload_ids; their assembled file is ingested in place. Each id may
+       appear once, and an upload whose ingest fails is given back so it
+       can be retried without uploading it again.
     2. Validates file types and sizes
-    3. Saves files temporarily
-    4. Ingests each dataset into DuckDB as a separate table
-    5. Stores metadata in app.state
+    3. Saves the screenshot temporarily
+    4. Ingests each dataset into DuckDB as a separate table, streaming
+       CSV/JSON straight from the upload and saving Parquet to disk first.
+       Compressed CSV/JSON (.gz, .zst) is saved as is and decompressed by
+       DuckDB's reader, never to disk.
+       Datasets are ingested concurrently; a failing file is reported in
+       `errors` instead of aborting the others.
+    5. Stores metadata in app.state and returns as soon as every table's
+       schema is known. Column stats and sample rows are computed in a
+       background task; poll /api/session/{session_id}/metadata for them.
+
+    Before anything is read, the estimated in-memory size of the datasets
+    is reserved against the memory budget. Uploads over the session budget
+    are rejected with 413; uploads that only exceed the global budget wait
+    for other sessions to free memory and get 503 if none is freed.
 
     Args:
         datasets: List of CSV, JSON, or Parquet files (max 10MB each)
         screenshot: PNG, JPG, or JPEG image
         clarification: Optional text description
+        upload_ids: Completed chunked uploads to ingest alongside datasets
 
     Returns:
         IngestResponse with session ID, table metadata, and screenshot info
     """
-    import uuid
     import re
 
     # Validate file types
-    allowed_dataset_types = ["text/csv", "application/json", "application/octet-stream"]
+    allowed_dataset_types = [
+        "text/csv", "application/json", "application/octet-stream",
+        "application/gzip", "application/x-gzip", "application/zstd"
+    ]
     allowed_image_types = ["image/png", "image/jpeg"]
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
+    datasets = datasets or []
+    upload_ids = upload_ids or []
+    if not datasets and not upload_ids:
+        raise HTTPException(status_code=400, detail="No datasets or upload_ids given")
+    # An upload is claimed once, so a repeated id would fail halfway
+    duplicates = sorted({upload_id for upload_id in upload_ids if upload_ids.count(upload_id) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate upload_ids: {', '.join(duplicates)}")
+
     # Validate all dataset files
     for dataset in datasets:
         if dataset.content_type not in allowed_dataset_types:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid dataset type for {dataset.filename}. Allowed: CSV, JSON, Parquet"
+                detail=f"Invalid dataset type for {dataset.filename}. Allowed: CSV, JSON, Parquet (CSV/JSON may be .gz or .zst)"
             )
         if dataset.size > MAX_FILE_SIZE:
             raise HTTPException(
@@ -127,9 +311,40 @@ async def ingest_data(
             detail=f"Invalid image type. Allowed: PNG, JPG, JPEG"
         )
 
+    # One source per dataset, uploaded inline or in chunks
+    sources = [
+        {"filename": dataset.filename, "size": dataset.size, "upload": dataset}
+        for dataset in datasets
+    ]
+    for upload_id in upload_ids:
+        try:
+            upload = upload_manager.status(upload_id)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        if not upload["complete"]:
+            raise HTTPException(status_code=400, detail=f"Upload {upload_id} is not complete")
+        sources.append({"filename": upload["filename"], "size": upload["size"], "upload_id": upload_id})
+
+    # Chunked uploads are read from disk, so with spilling enabled only
+    # part of each table stays in memory; inline datasets are small
+    for source in sources:
+        spillable = "upload_id" in source and db_manager.spill_directory is not None
+        source["charge"] = memory_budget.estimate(source["size"] or 0, spillable=spillable)
+
     # Generate session ID
     session_id = str(uuid.uuid4())
 
+    # Reserve memory for the datasets, queueing while the server is full.
+    # Idle sessions are evicted first if that makes the upload fit.
+    reserved_bytes = sum(source["charge"] for source in sources)
+    await run_in_threadpool(app.state.sessions.make_room, reserved_bytes)
+    try:
+        await run_in_threadpool(memory_budget.admit, session_id, reserved_bytes)
+    except MemoryBudgetExceeded as e:
+        if e.session_limit:
+            raise HTTPException(status_code=413, detail=str(e))
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
     # Save files temporarily
     temp_dir = Path(tempfile.gettempdir()) / "drawdash" / session_id
     temp_dir.mkdir(parents=True, exist_ok=True)
@@ -146,39 +361,61 @@ async def ingest_data(
         "path": str(screenshot_path)
     }
 
-    # Process and ingest all datasets
-    tables_metadata = []
+    # Build one ingest job per dataset
+    ingest_items = []
+    table_names = set()
+    claimed_uploads = {}  # source index -> claim, given back if its ingest fails
 
     try:
-        for idx, dataset in enumerate(datasets):
-            # Save dataset file
-            dataset_path = temp_dir / dataset.filename
-            with dataset_path.open("wb") as buffer:
-                shutil.copyfileobj(dataset.file, buffer)
-
-            # Create unique table name
-            filename = Path(dataset.filename).stem
+        for idx, source in enumerate(sources):
+            # Create unique table name; sales.csv.gz becomes sales
+            filename = Path(split_compression(source["filename"])[0]).stem
             # Remove all non-alphanumeric characters except underscores
             safe_filename = re.sub(r'[^a-zA-Z0-9_]', '_', filename)
             # Ensure it starts with a letter or underscore
             if safe_filename and safe_filename[0].isdigit():
                 safe_filename = f"table_{safe_filename}"
             table_name = f"{safe_filename}_{session_id.replace('-', '_')}"
+            # Files sharing a stem (sales.csv, sales.json) must not collide
+            if table_name in table_names:
+                table_name = f"{table_name}_{idx}"
+            table_names.add(table_name)
 
-            # Ingest file into DuckDB and get metadata
-            metadata = db_manager.ingest_file(
-                file_path=str(dataset_path),
-                table_name=table_name
-            )
+            if "upload_id" in source:
+                # Chunked uploads are already on disk; move, don't copy
+                claimed = upload_manager.claim(source["upload_id"], temp_dir)
+                claimed_uploads[idx] = claimed
+                ingest_items.append({
+                    "table_name": table_name,
+                    "file_path": claimed["path"]
+                })
+            elif db_manager.can_stream(source["filename"]):
+                # Sequential formats are piped straight from the upload
+                ingest_items.append({
+                    "table_name": table_name,
+                    "stream": source["upload"].file,
+                    "filename": source["filename"]
+                })
+            else:
+                # Formats that need random access are saved to disk first;
+                # the index keeps files sharing a name apart
+                dataset_path = temp_dir / f"{idx}_{source['filename']}"
+                with dataset_path.open("wb") as buffer:
+                    shutil.copyfileobj(source["upload"].file, buffer)
 
-            # Add original filename to metadata
-            metadata["original_filename"] = dataset.filename
-            metadata["file_size"] = dataset.size
+                ingest_items.append({
+                    "table_name": table_name,
+                    "file_path": str(dataset_path)
+                })
 
-            tables_metadata.append(metadata)
+        # Ingest all datasets concurrently; profiling is deferred
+        results = await run_in_threadpool(db_manager.ingest_batch, ingest_items, profile=False)
 
     except Exception as e:
-        # Clean up temp files on error
+        # Give chunked uploads back, then clean up temp files on error
+        memory_budget.cancel(session_id, reserved_bytes)
+        for claimed in claimed_uploads.values():
+            upload_manager.unclaim(claimed)
         if temp_dir.exists():
             shutil.rmtree(temp_dir)
         raise HTTPException(
@@ -186,24 +423,876 @@ async def ingest_data(
             detail=f"Failed to ingest data: {str(e)}"
         )
 
+    tables_metadata = []
+    errors = []
+    for idx, (source, result) in enumerate(zip(sources, results)):
+        if result["error"] is not None:
+            # A chunked upload that failed can be retried without re-uploading
+            if idx in claimed_uploads:
+                upload_manager.unclaim(claimed_uploads[idx])
+            errors.append({
+                "filename": source["filename"],
+                "table_name": result["table_name"],
+                "error": result["error"]
+            })
+            continue
+
+        metadata = result["metadata"]
+        # Add original filename to metadata
+        metadata["original_filename"] = source["filename"]
+        metadata["file_size"] = source["size"]
+
+        tables_metadata.append(metadata)
+
+    # Charge the session for the tables it now holds; datasets another
+    # session already brought into the table cache are not charged again
+    charges = {
+        result["table_name"]: source["charge"]
+        for source, result in zip(sources, results)
+        if result["error"] is None
+    }
+    memory_budget.commit(
+        session_id,
+        reserved_bytes,
+        charges,
+        {table_name: db_manager.dataset_key(table_name) for table_name in charges}
+    )
+
+    if not tables_metadata:
+        # Clean up temp files when nothing could be ingested
+        if temp_dir.exists():
+            shutil.rmtree(temp_dir)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to ingest data: " + "; ".join(
+                f"{error['filename']}: {error['error']}" for error in errors
+            )
+        )
+
+    # Repeat uploads come back from the table cache already profiled
+    stats_status = "ready" if all(is_profiled(table) for table in tables_metadata) else "pending"
+
     # Store metadata in app.state
     app.state.sessions[session_id] = {
         "tables": tables_metadata,
         "screenshot_info": screenshot_info,
         "clarification": clarification,
         "temp_dir": str(temp_dir),
-        "status": "ingested"
+        "errors": errors,
+        "status": "ingested",
+        "stats_status": stats_status
     }
 
+    if stats_status == "pending":
+        background_tasks.add_task(profile_session_tables, session_id)
+
     return IngestResponse(
         session_id=session_id,
         tables=tables_metadata,
         screenshot_info=screenshot_info,
-        message=f"{len(datasets)} dataset(s) ingested into DuckDB",
-        clarification=clarification
+        message=f"{len(tables_metadata)} of {len(sources)} dataset(s) ingested into DuckDB",
+        clarification=clarification,
+        errors=errors,
+        stats_status=stats_status
     )
 
 
+@app.post("/api/uploads", response_model=UploadStatusResponse)
+async def init_upload(request: UploadInitRequest):
+    """
+    Start a chunked upload for a dataset too large for /api/ingest
+
+    The file is split into parts of chunk_size bytes (the last one may be
+    shorter), numbered from 0. Parts are sent with
+    PUT /api/uploads/{upload_id}/parts/{part_number} in any order and in
+    parallel, then the upload is finished with
+    POST /api/uploads/{upload_id}/complete and passed to /api/ingest in
+    upload_ids.
+
+    Args:
+        request: File name, total size and part size
+
+    Returns:
+        Upload status with the upload ID and number of parts
+    """
+    try:
+        return await run_in_threadpool(
+            upload_manager.create, request.filename, request.size, request.chunk_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.put("/api/uploads/{upload_id}/parts/{part_number}", response_model=UploadStatusResponse)
+async def upload_part(
+    upload_id: str,
+    part_number: int,
+    request: Request,
+    x_chunk_sha256: Optional[str] = Header(None)
+):
+    """
+    Store one part of a chunked upload
+
+    The request body is the raw bytes of the part. Re-sending a part
+    overwrites it, so a failed or interrupted part is simply retried.
+
+    Args:
+        upload_id: Upload identifier
+        part_number: Zero-based part index
+        request: Request whose body is the part
+        x_chunk_sha256: SHA-256 hex digest of the part, verified if given
+
+    Returns:
+        Upload status with the parts received so far
+    """
+    data = await request.body()
+    try:
+        return await run_in_threadpool(
+            upload_manager.write_part, upload_id, part_number, data, x_chunk_sha256
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/uploads/{upload_id}", response_model=UploadStatusResponse)
+async def get_upload_status(upload_id: str):
+    """
+    Progress of a chunked upload; resume by sending the missing parts
+
+    Args:
+        upload_id: Upload identifier
+
+    Returns:
+        Upload status with received and missing parts
+    """
+    try:
+        return upload_manager.status(upload_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/api/uploads/{upload_id}/complete", response_model=UploadStatusResponse)
+async def complete_upload(upload_id: str, request: UploadCompleteRequest):
+    """
+    Finish a chunked upload once all parts are in
+
+    Args:
+        upload_id: Upload identifier
+        request: Optional digest of the whole file
+
+    Returns:
+        Upload status with complete set
+    """
+    try:
+        return await run_in_threadpool(upload_manager.complete, upload_id, request.sha256)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.delete("/api/uploads/{upload_id}")
+async def abort_upload(upload_id: str):
+    """
+    Abort a chunked upload and delete its parts
+
+    Args:
+        upload_id: Upload identifier
+    """
+    if not await run_in_threadpool(upload_manager.discard, upload_id):
+        raise HTTPException(status_code=404, detail=f"Upload {upload_id} not found")
+    return {"upload_id": upload_id, "status": "aborted"}
+
+
+@app.post("/api/session/{session_id}/tables/{table_name}/append", response_model=AppendResponse)
+async def append_data(session_id: str, table_name: str, dataset: UploadFile = File(...)):
+    """
+    Append the rows of a file to one of a session's tables
+
+    Only the new file is ingested. Column stats are merged incrementally
+    (exact min/max/avg/null counts, sketched distinct counts) instead of
+    re-profiling the table, and only query results that read this table
+    are invalidated.
+
+    Args:
+        session_id: Session identifier
+        table_name: Table returned by /api/ingest
+        dataset: CSV, JSON, or Parquet file with the same columns
+
+    Returns:
+        AppendResponse with the updated table metadata
+    """
+    if session_id not in app.state.sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    session = app.state.sessions[session_id]
+    table = next((t for t in session["tables"] if t["table_name"] == table_name), None)
+    if table is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+
+    reserved_bytes = memory_budget.estimate(dataset.size or 0)
+    await run_in_threadpool(app.state.sessions.make_room, reserved_bytes)
+    try:
+        await run_in_threadpool(memory_budget.admit, session_id, reserved_bytes)
+    except MemoryBudgetExceeded as e:
+        if e.session_limit:
+            raise HTTPException(status_code=413, detail=str(e))
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+    previous_rows = table["row_count"]
+    try:
+        if db_manager.can_stream(dataset.filename):
+            metadata = await run_in_threadpool(
+                db_manager.append_stream, table_name, dataset.file, dataset.filename
+            )
+        else:
+            dataset_path = Path(session["temp_dir"]) / f"append_{dataset.filename}"
+            with dataset_path.open("wb") as buffer:
+                shutil.copyfileobj(dataset.file, buffer)
+            try:
+                metadata = await run_in_threadpool(db_manager.append_file, table_name, str(dataset_path))
+            finally:
+                dataset_path.unlink(missing_ok=True)
+    except Exception as e:
+        memory_budget.cancel(session_id, reserved_bytes)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The appended rows live in a new dataset: the base plus the delta
+    base_bytes = memory_budget.dataset_bytes(session_id, table_name)
+    memory_budget.commit(
+        session_id,
+        reserved_bytes,
+        {table_name: base_bytes + reserved_bytes},
+        {table_name: db_manager.dataset_key(table_name)}
+    )
+
+    table.update(metadata)
+    table["file_size"] = (table.get("file_size") or 0) + (dataset.size or 0)
+    appended_rows = table["row_count"] - previous_rows
+    app.state.sessions.save(session_id)
+
+    return AppendResponse(
+        session_id=session_id,
+        table=table,
+        appended_rows=appended_rows,
+        message=f"{appended_rows} row(s) appended to {table_name}"
+    )
+
+
+@app.get("/api/session/{session_id}/metadata", response_model=SessionMetadataResponse)
+async def get_session_metadata(session_id: str, wait: float = 0.0):
+    """
+    Table metadata of a session, including column stats once computed
+
+    Args:
+        session_id: Session identifier
+        wait: Long-poll for up to this many seconds (max 30) while stats
+            are still pending
+
+    Returns:
+        Tables, stats status and any per-table errors
+    """
+    if session_id not in app.state.sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    session = app.state.sessions[session_id]
+
+    deadline = asyncio.get_running_loop().time() + min(max(wait, 0.0), 30.0)
+    while session.get("stats_status") == "pending" and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.1)
+
+    return SessionMetadataResponse(
+        session_id=session_id,
+        tables=session["tables"],
+        stats_status=session.get("stats_status", "ready"),
+        errors=session.get("errors", [])
+    )
+
+
+def arrow_ipc_stream(reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    """
+    Encode record batches as an Arrow IPC stream, one chunk per batch
+
+    Args:
+        reader: Record batches to send
+
+    Yields:
+        IPC-encoded bytes: the schema, each batch, then the end-of-stream marker
+    """
+    buffer = io.BytesIO()
+    try:
+        with pa.ipc.new_stream(buffer, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    finally:
+        reader.close()
+
+
+@app.post("/api/query")
+async def run_query(request: QueryRequest):
+    """
+    Execute a SQL query and return its results
+
+    Results are streamed as an Arrow IPC stream
+    (application/vnd.apache.arrow.stream) straight from DuckDB's record
+    batches. JSON records are only produced when format="json".
+
+    The response carries the query's id in an X-Query-Id header; pass
+    query_id to know it up front. A running query is cancelled with
+    DELETE /api/queries/{query_id}. Queries past their deadline are
+    interrupted and answered with 408, cancelled ones with 409; the
+    detail is {"error": "timeout" | "cancelled", "message", "query_id"}.
+    A session already running its maximum of queries gets 429.
+
+    With query profiling enabled (DRAWDASH_QUERY_PROFILING=1) the
+    profile is available from /api/queries/{query_id}/profile. Results
+    served from the query cache are not profiled.
+
+    Args:
+        request: Query, output format and rows per Arrow batch
+
+    Returns:
+        Streaming Arrow IPC response, or a JSON list of records
+    """
+    return await execute_and_respond(
+        request.query,
+        format=request.format,
+        batch_size=request.batch_size,
+        query_id=request.query_id,
+        session_id=request.session_id,
+        timeout=request.timeout
+    )
+
+
+async def execute_and_respond(
+    query: str,
+    format: str = "arrow",
+    batch_size: int = 65536,
+    query_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    timeout: Optional[float] = None,
+    params: Optional[Dict[str, Any]] = None
+):
+    """
+    Run a query and encode its results, shared by /api/query and prepared statements
+
+    Returns:
+        Streaming Arrow IPC response, or a JSON list of records
+    """
+    if format not in ("arrow", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'arrow' or 'json'")
+
+    query_id = query_id or uuid.uuid4().hex
+    headers = {"X-Query-Id": query_id}
+
+    try:
+        if format == "json":
+            table = await run_in_threadpool(
+                db_manager.execute_arrow, query, query_id, session_id, timeout, params
+            )
+            return JSONResponse(table.to_pylist(), headers=headers)
+
+        reader = await run_in_threadpool(
+            db_manager.execute_record_batches, query, batch_size,
+            query_id, session_id, timeout, params
+        )
+    except QueryInterrupted as e:
+        raise HTTPException(status_code=408 if e.reason == "timeout" else 409, detail=e.to_dict(), headers=headers)
+    except SessionQueryLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={**headers, "Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e), headers=headers)
+
+    return StreamingResponse(
+        arrow_ipc_stream(reader),
+        media_type="application/vnd.apache.arrow.stream",
+        headers=headers
+    )
+
+
+@app.post("/api/query/validate")
+async def validate_query(request: ValidateRequest):
+    """
+    Bind and plan a query without running it
+
+    Catches unknown tables and columns, type errors and missing GROUP BY
+    keys at the cost of planning, never of executing. Anything but a
+    single SELECT is reported as invalid without being planned.
+
+    Returns:
+        Whether the query binds, DuckDB's error message if not, and its
+        parts: subtype, missing name, DuckDB's candidates and position
+    """
+    details = await run_in_threadpool(db_manager.bind_error, request.query)
+    return {
+        "valid": details is None,
+        "error": details["error"] if details is not None else None,
+        "details": details,
+    }
+
+
+@app.post("/api/session/{session_id}/statements")
+async def prepare_statement(session_id: str, request: PrepareRequest):
+    """
+    Register a named query template for a session
+
+    The template is a single SELECT with named parameters, e.g.
+    SELECT region, SUM(sales) FROM t WHERE year = $year GROUP BY region.
+    It is parsed and bound once here; each execution only sends parameter
+    values, which DuckDB binds as values rather than SQL text. Registering
+    a name again replaces its template.
+
+    Args:
+        session_id: Session identifier
+        request: Statement name and template
+
+    Returns:
+        Statement name, template key and parameter names
+    """
+    if session_id not in app.state.sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    try:
+        return await run_in_threadpool(db_manager.prepare_statement, session_id, request.name, request.query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/session/{session_id}/statements")
+async def list_statements(session_id: str):
+    """
+    Prepared statements of a session
+
+    Args:
+        session_id: Session identifier
+
+    Returns:
+        Name, template and parameters per statement
+    """
+    if session_id not in app.state.sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return {"session_id": session_id, "statements": db_manager.prepared.list(session_id)}
+
+
+@app.post("/api/session/{session_id}/statements/{name}/execute")
+async def execute_statement(session_id: str, name: str, request: ExecuteStatementRequest):
+    """
+    Execute a prepared statement with new parameter values
+
+    Meant for dashboard filters: a slider change sends only the values.
+    Results are cached per distinct set of values, so returning to an
+    earlier filter setting does not run the query again. Responses,
+    timeouts and cancellation work as in /api/query.
+
+    Args:
+        session_id: Session identifier
+        name: Statement name
+        request: Parameter values, output format and limits
+
+    Returns:
+        Streaming Arrow IPC response, or a JSON list of records
+    """
+    if session_id not in app.state.sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    try:
+        bound = db_manager.prepared.bind(session_id, name, request.params)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await execute_and_respond(
+        bound["template"],
+        format=request.format,
+        batch_size=request.batch_size,
+        query_id=request.query_id,
+        session_id=session_id,
+        timeout=request.timeout,
+        params=bound["params"]
+    )
+
+
+@app.delete("/api/session/{session_id}/statements/{name}")
+async def drop_statement(session_id: str, name: str):
+    """
+    Remove a prepared statement
+
+    Args:
+        session_id: Session identifier
+        name: Statement name
+    """
+    if not db_manager.prepared.drop(session_id, name):
+        raise HTTPException(status_code=404, detail="Statement not found")
+    return {"session_id": session_id, "name": name, "status": "dropped"}
+
+
+@app.get("/api/queries")
+async def list_query_profiles(limit: int = 50):
+    """
+    Recently profiled queries, most recent first
+
+    Args:
+        limit: Maximum number of queries
+
+    Returns:
+        Profiling status and per-query latency, rows and errors
+    """
+    return {
+        **query_profiles.stats(),
+        "queries": query_profiles.recent(limit),
+    }
+
+
+@app.get("/api/queries/running")
+async def list_running_queries():
+    """
+    Queries currently executing, longest running first
+
+    Returns:
+        Deadline and per-session limits, timeout/cancel counters and the
+        running queries with their elapsed seconds
+    """
+    return {
+        **query_watchdog.stats(),
+        "queries": query_watchdog.running(),
+    }
+
+
+@app.delete("/api/queries/{query_id}")
+async def cancel_query(query_id: str):
+    """
+    Cancel a running query
+
+    The query is interrupted and its /api/query call fails with 409.
+
+    Args:
+        query_id: Id from the X-Query-Id header, the request, or /api/queries/running
+    """
+    if not query_watchdog.cancel(query_id):
+        raise HTTPException(status_code=404, detail="Query not running")
+    return {"query_id": query_id, "status": "cancelled"}
+
+
+@app.get("/api/queries/{query_id}/profile")
+async def get_query_profile(query_id: str):
+    """
+    DuckDB's JSON profile of an executed query
+
+    Only the most recent DRAWDASH_QUERY_PROFILES queries are kept.
+
+    Args:
+        query_id: Id from the X-Query-Id header or /api/queries
+
+    Returns:
+        Query, latency, rows and the operator tree with timings and cardinalities
+    """
+    profile = query_profiles.get(query_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Query profile not found")
+    return profile
+
+
+# Tables ingested through /api/tables belong to no session; the agent
+# tools reach the catalog this way when DRAWDASH_CATALOG_URL is set
+CATALOG_SESSION = "catalog"
+
+
+def require_catalog_table(table_name: str):
+    """404 unless the table was ingested through /api/tables"""
+    if table_name not in db_manager.catalog_tables():
+        raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+
+
+def restore_catalog_charges():
+    """Charge the catalog tables a persistent database kept to the memory budget again"""
+    tables = db_manager.catalog_tables()
+    if tables:
+        memory_budget.commit(
+            CATALOG_SESSION,
+            0,
+            {table_name: memory_budget.estimate(table["file_size"]) for table_name, table in tables.items()},
+            {table_name: db_manager.dataset_key(table_name) for table_name in tables}
+        )
+
+
+@app.get("/api/tables")
+async def list_tables():
+    """
+    Tables of the shared catalog
+
+    Only tables ingested through /api/tables are listed; session views and
+    the content-addressed tables behind them stay hidden.
+
+    Returns:
+        Table names, as seen by queries
+    """
+    return {"tables": sorted(db_manager.catalog_tables())}
+
+
+@app.get("/api/tables/{table_name}/columns")
+async def get_table_columns(table_name: str):
+    """
+    Columns of a table, without profiling it
+
+    Args:
+        table_name: Table of the shared catalog
+
+    Returns:
+        Column names, types and nullability
+    """
+    require_catalog_table(table_name)
+    try:
+        columns = await run_in_threadpool(db_manager.describe_table, table_name)
+    except duckdb.CatalogException:
+        raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+    return {"table_name": table_name, "columns": columns}
+
+
+@app.get("/api/schema")
+async def get_schema(session_id: Optional[str] = None, tables: Optional[List[str]] = Query(None)):
+    """
+    Columns of the tables in scope, from the schema cache
+
+    Tables are described once and cached until DDL changes them, so the
+    response time does not grow with the number of tables in the catalog.
+
+    Args:
+        session_id: Limit the snapshot to the tables this session owns
+        tables: Limit the snapshot to these tables; all tables if neither is given
+
+    Returns:
+        Catalog version and the columns per table
+    """
+    if session_id is not None:
+        session = app.state.sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        tables = [table["table_name"] for table in session["tables"]] + (tables or [])
+    return await run_in_threadpool(db_manager.schema_snapshot, tables)
+
+
+@app.get("/api/schema/resolve")
+async def resolve_identifier(
+    name: str,
+    kind: str = "column",
+    session_id: Optional[str] = None,
+    tables: Optional[List[str]] = Query(None),
+    limit: int = 5
+):
+    """
+    Rank the tables or columns a misspelled name may have meant
+
+    Args:
+        name: The name that was not found
+        kind: "column" or "table"
+        session_id: Limit candidates to the tables this session owns
+        tables: Limit candidates to these tables; all tables if neither is given
+        limit: Maximum number of candidates
+
+    Returns:
+        Candidates with name, table and a similarity score between 0 and 1
+    """
+    if kind not in ("column", "table"):
+        raise HTTPException(status_code=400, detail="kind must be 'column' or 'table'")
+    if session_id is not None:
+        session = app.state.sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        tables = [table["table_name"] for table in session["tables"]] + (tables or [])
+    candidates = await run_in_threadpool(db_manager.resolve_identifier, name, kind, tables, limit)
+    return {"name": name, "kind": kind, "candidates": candidates}
+
+
+@app.get("/api/tables/{table_name}/metadata", response_model=Dict[str, Any])
+async def get_table_metadata(table_name: str):
+    """
+    Profiled metadata of a table; profiled on first request
+
+    Args:
+        table_name: Table of the shared catalog
+
+    Returns:
+        Row count, columns with stats and sample rows
+    """
+    require_catalog_table(table_name)
+    if table_name not in await run_in_threadpool(db_manager.get_table_list):
+        raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+    return await run_in_threadpool(db_manager.get_table_metadata, table_name)
+
+
+@app.post("/api/tables", response_model=Dict[str, Any])
+async def ingest_table(dataset: UploadFile = File(...), table_name: str = Form(...)):
+    """
+    Ingest one file into the shared catalog under a given name
+
+    Files whose bytes were already ingested, by a session or an earlier
+    call, are attached from the table cache without being read again.
+    The table is charged to the memory budget outside any session.
+
+    Args:
+        dataset: CSV, JSON or Parquet file; CSV and JSON may be .gz or .zst
+        table_name: Name to query the table by
+
+    Returns:
+        Table metadata
+    """
+    if table_name not in db_manager.catalog_tables() and table_name in await run_in_threadpool(db_manager.get_table_list):
+        # Never replace a session's view or a table of the table cache
+        raise HTTPException(status_code=409, detail=f"Table {table_name} already exists")
+    reserved_bytes = memory_budget.estimate(dataset.size or 0)
+    try:
+        await run_in_threadpool(memory_budget.admit, CATALOG_SESSION, reserved_bytes)
+    except MemoryBudgetExceeded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+    temp_dir = Path(tempfile.mkdtemp(prefix="drawdash_catalog_"))
+    try:
+        dataset_path = temp_dir / Path(dataset.filename or "dataset.csv").name
+        with dataset_path.open("wb") as buffer:
+            shutil.copyfileobj(dataset.file, buffer)
+        metadata = await run_in_threadpool(db_manager.ingest_catalog_table, str(dataset_path), table_name)
+    except ValueError as e:
+        # The name was taken by a session while the file was uploading
+        memory_budget.cancel(CATALOG_SESSION, reserved_bytes)
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        memory_budget.cancel(CATALOG_SESSION, reserved_bytes)
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    memory_budget.commit(
+        CATALOG_SESSION,
+        reserved_bytes,
+        {table_name: reserved_bytes},
+        {table_name: db_manager.dataset_key(table_name)}
+    )
+    return metadata
+
+
+@app.delete("/api/tables/{table_name}")
+async def drop_catalog_table(table_name: str):
+    """
+    Drop a table of the shared catalog
+
+    Only tables ingested through /api/tables can be dropped. They are
+    views on the table cache, so the shared table goes with its last view.
+
+    Args:
+        table_name: Table of the shared catalog
+    """
+    try:
+        await run_in_threadpool(db_manager.drop_catalog_table, table_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    memory_budget.release_table(CATALOG_SESSION, table_name)
+    return {"table_name": table_name, "status": "dropped"}
+
+
+@app.get("/api/db/pool")
+async def get_pool_stats():
+    """
+    Usage and wait-time metrics of the DuckDB query cursor pool
+
+    Returns:
+        Pool size, cursors in use, acquisitions, timeouts and wait times
+    """
+    return db_manager.query_pool.stats()
+
+
+@app.get("/api/db/query-cache")
+async def get_query_cache_stats():
+    """
+    Usage of the query result cache
+
+    Returns:
+        Cached entries and bytes, budget, hits, misses and evictions
+    """
+    return db_manager.query_cache.stats()
+
+
+@app.get("/api/db/schema-cache")
+async def get_schema_cache_stats():
+    """
+    Usage of the schema cache behind /api/schema and SQL error diagnosis
+
+    Returns:
+        Catalog version, tables cached, hits and misses
+    """
+    return db_manager.schema_cache.stats()
+
+
+@app.delete("/api/session/{session_id}", response_model=SessionDeleteResponse)
+async def delete_session(session_id: str):
+    """
+    Delete a session with its tables and temp files
+
+    Args:
+        session_id: Session identifier
+
+    Returns:
+        Session ID and the accounted memory bytes released
+    """
+    reclaimed = await run_in_threadpool(app.state.sessions.delete, session_id)
+    if reclaimed is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return SessionDeleteResponse(session_id=session_id, reclaimed_bytes=reclaimed)
+
+
+@app.get("/api/sessions/stats")
+async def get_session_stats():
+    """
+    Session lifecycle gauges
+
+    Returns:
+        Live sessions, resident and reclaimed bytes, and expiry counters
+    """
+    return app.state.sessions.stats()
+
+
+@app.get("/api/session/{session_id}/memory")
+async def get_session_memory(session_id: str):
+    """
+    Memory accounted to a session
+
+    Args:
+        session_id: Session identifier
+
+    Returns:
+        Charged and reserved bytes, the session budget and per-table bytes
+    """
+    if session_id not in app.state.sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return memory_budget.usage(session_id)
+
+
+@app.get("/api/memory")
+async def get_memory_stats():
+    """
+    Memory use across all sessions
+
+    Returns:
+        The budget's accounting per session and DuckDB's own view of its
+        buffer pool, including bytes spilled to disk
+    """
+    return {
+        "budget": memory_budget.stats(),
+        "duckdb": await run_in_threadpool(db_manager.memory_usage),
+    }
+
+
 @app.post("/api/analyze/{session_id}", response_model=AgentUnderstanding)
 async def analyze_screenshot(session_id: str):
     """
@@ -253,6 +1342,7 @@ async def analyze_screenshot(session_id: str):
 
     session["understanding"] = understanding.dict()
     session["status"] = "analyzed"
+    app.state.sessions.save(session_id)
 
     return understanding
 
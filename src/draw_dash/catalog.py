@@ -0,0 +1,238 @@
+"""
+Shared DuckDB catalog for DrawDash
+One catalog for the backend, the ADK tools and the agents, in process or
+through the backend's HTTP API
+"""
+
+import io
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+import pyarrow as pa
+import requests
+
+from draw_dash.query_watchdog import QueryTimeout, QueryCancelled
+
+# Backend the tools attach to, e.g. http://localhost:8080. Unset attaches
+# them to the in-process db_manager.
+CATALOG_URL = os.environ.get("DRAWDASH_CATALOG_URL") or None
+
+# Seconds an HTTP call to the backend may take; queries are bounded by the
+# backend's own deadline
+CATALOG_HTTP_TIMEOUT = 120
+
+
+class LocalCatalog:
+    """Catalog backed by the db_manager of this process"""
+
+    def __init__(self, db_manager):
+        """
+        Args:
+            db_manager: DuckDBManager holding the tables
+        """
+        self.db_manager = db_manager
+
+    def execute_arrow(self, query: str) -> pa.Table:
+        """
+        Run a query, see DuckDBManager.execute_arrow
+
+        Raises:
+            QueryTimeout, QueryCancelled: If the watchdog stopped the query
+            Exception: With DuckDB's error message if the query failed
+        """
+        return self.db_manager.execute_arrow(query)
+
+    def validate(self, query: str) -> Optional[str]:
+        """Bind a query without running it; the error message or None"""
+        return self.db_manager.validate_query(query)
+
+    def bind_error(self, query: str) -> Optional[Dict[str, Any]]:
+        """Structured bind error of a query, see DuckDBManager.bind_error"""
+        return self.db_manager.bind_error(query)
+
+    def resolve(
+        self,
+        name: str,
+        kind: str = "column",
+        table_names: Optional[List[str]] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Ranked candidates for a misspelled name, see DuckDBManager.resolve_identifier"""
+        return self.db_manager.resolve_identifier(name, kind, table_names, limit)
+
+    def table_list(self) -> List[str]:
+        """Names of the tables of the shared catalog, without session views"""
+        return sorted(self.db_manager.catalog_tables())
+
+    def describe(self, table_name: str) -> List[Dict[str, Any]]:
+        """Columns of a table as {"name", "type"}"""
+        return self.db_manager.describe_table(table_name)
+
+    def schema_snapshot(self, table_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Cached columns of tables in scope, see DuckDBManager.schema_snapshot"""
+        return self.db_manager.schema_snapshot(table_names)
+
+    def table_metadata(self, table_name: str) -> Dict[str, Any]:
+        """Profiled metadata of a table, see DuckDBManager.get_table_metadata"""
+        return self.db_manager.get_table_metadata(table_name)
+
+    def ingest_file(self, file_path: str, table_name: str) -> Dict[str, Any]:
+        """
+        Ingest a file under a table name
+
+        Files already ingested by anyone, e.g. a session upload of the same
+        bytes, are attached from the table cache without re-reading them.
+        The table joins the shared catalog.
+        """
+        return self.db_manager.ingest_catalog_table(file_path, table_name)
+
+    def drop_table(self, table_name: str):
+        """Drop a table of the shared catalog; KeyError if there is none by that name"""
+        self.db_manager.drop_catalog_table(table_name)
+
+
+class RemoteCatalog:
+    """Catalog of a backend in another process, reached over its HTTP API"""
+
+    def __init__(self, base_url: str, timeout: float = CATALOG_HTTP_TIMEOUT):
+        """
+        Args:
+            base_url: Backend URL, e.g. http://localhost:8080
+            timeout: Seconds an HTTP call may take
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def _raise_for_status(self, response: requests.Response):
+        """Turn an error response into the exception the local catalog raises"""
+        if response.ok:
+            return
+        try:
+            detail = response.json().get("detail")
+        except ValueError:
+            detail = response.text
+
+        if isinstance(detail, dict) and detail.get("error") == "timeout":
+            raise QueryTimeout(detail["message"], detail.get("query_id"))
+        if isinstance(detail, dict) and detail.get("error") == "cancelled":
+            raise QueryCancelled(detail["message"], detail.get("query_id"))
+        if response.status_code == 404:
+            raise KeyError(str(detail))
+        raise Exception(str(detail))
+
+    def execute_arrow(self, query: str) -> pa.Table:
+        """Run a query on the backend and read its Arrow IPC stream"""
+        response = self._session.post(
+            f"{self.base_url}/api/query",
+            json={"query": query, "format": "arrow"},
+            timeout=self.timeout
+        )
+        self._raise_for_status(response)
+        with pa.ipc.open_stream(io.BytesIO(response.content)) as reader:
+            return reader.read_all()
+
+    def validate(self, query: str) -> Optional[str]:
+        """Bind a query on the backend without running it; the error message or None"""
+        details = self.bind_error(query)
+        return details["error"] if details is not None else None
+
+    def bind_error(self, query: str) -> Optional[Dict[str, Any]]:
+        """Structured bind error of a query on the backend, or None if it binds"""
+        response = self._session.post(
+            f"{self.base_url}/api/query/validate",
+            json={"query": query},
+            timeout=self.timeout
+        )
+        self._raise_for_status(response)
+        return response.json()["details"]
+
+    def resolve(
+        self,
+        name: str,
+        kind: str = "column",
+        table_names: Optional[List[str]] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Ranked candidates for a misspelled name from the backend's identifier index"""
+        params = {"name": name, "kind": kind, "limit": limit}
+        if table_names is not None:
+            params["tables"] = table_names
+        response = self._session.get(f"{self.base_url}/api/schema/resolve", params=params, timeout=self.timeout)
+        self._raise_for_status(response)
+        return response.json()["candidates"]
+
+    def table_list(self) -> List[str]:
+        """Names of the tables of the shared catalog, without session views"""
+        response = self._session.get(f"{self.base_url}/api/tables", timeout=self.timeout)
+        self._raise_for_status(response)
+        return response.json()["tables"]
+
+    def describe(self, table_name: str) -> List[Dict[str, Any]]:
+        """Columns of a table as {"name", "type"}"""
+        response = self._session.get(f"{self.base_url}/api/tables/{table_name}/columns", timeout=self.timeout)
+        self._raise_for_status(response)
+        return response.json()["columns"]
+
+    def schema_snapshot(self, table_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Cached columns of tables in scope, from the backend's schema cache"""
+        response = self._session.get(
+            f"{self.base_url}/api/schema",
+            params={"tables": table_names} if table_names is not None else None,
+            timeout=self.timeout
+        )
+        self._raise_for_status(response)
+        return response.json()
+
+    def table_metadata(self, table_name: str) -> Dict[str, Any]:
+        """Profiled metadata of a table"""
+        response = self._session.get(f"{self.base_url}/api/tables/{table_name}/metadata", timeout=self.timeout)
+        self._raise_for_status(response)
+        return response.json()
+
+    def ingest_file(self, file_path: str, table_name: str) -> Dict[str, Any]:
+        """Upload a file to the backend and ingest it under a table name"""
+        file_path = Path(file_path)
+        with file_path.open("rb") as fp:
+            response = self._session.post(
+                f"{self.base_url}/api/tables",
+                data={"table_name": table_name},
+                files={"dataset": (file_path.name, fp, "application/octet-stream")},
+                timeout=self.timeout
+            )
+        self._raise_for_status(response)
+        return response.json()
+
+    def drop_table(self, table_name: str):
+        """Drop a table of the shared catalog on the backend; KeyError if there is none by that name"""
+        response = self._session.delete(f"{self.base_url}/api/tables/{table_name}", timeout=self.timeout)
+        self._raise_for_status(response)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    The catalog shared by the backend, the tools and the agents
+
+    With DRAWDASH_CATALOG_URL set, e.g. when the agents run in the ADK
+    server, the tools reach the backend's tables over HTTP. Otherwise they
+    use the db_manager of this process, so the backend and in-process
+    agents see the same tables.
+
+    Returns:
+        LocalCatalog or RemoteCatalog
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            if CATALOG_URL:
+                _catalog = RemoteCatalog(CATALOG_URL)
+            else:
+                from draw_dash.duckdb_manager import db_manager
+                _catalog = LocalCatalog(db_manager)
+        return _catalog
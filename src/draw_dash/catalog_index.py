@@ -0,0 +1,180 @@
+"""
+Persistent catalog index for DrawDash
+Stores dataset and session metadata next to the tables in a DuckDB file
+"""
+
+import json
+import threading
+from typing import Dict, Any, Optional
+
+import duckdb
+
+# Schema holding the index; kept out of main so SHOW TABLES lists datasets only
+INDEX_SCHEMA = "drawdash_catalog"
+
+
+def _dumps(value: Any) -> str:
+    """Serialize metadata; dates and decimals in sample rows become strings"""
+    return json.dumps(value, default=str)
+
+
+class CatalogIndex:
+    """
+    Metadata index of a persistent database
+
+    Each dataset row holds a TableCache entry (physical table, metadata,
+    sketches and the views pointing at it), each session row the session
+    record kept in app.state.sessions and each catalog table row a table
+    ingested into the shared catalog. All are written through on every
+    change, so a restarted backend re-attaches existing sessions and
+    catalog tables by reading these rows instead of re-scanning the tables.
+    """
+
+    def __init__(self, connection: duckdb.DuckDBPyConnection):
+        """
+        Initialize the index, creating its tables on first use
+
+        Args:
+            connection: Connection to the persistent database; the index
+                writes on its own cursor
+        """
+        self._cursor = connection.cursor()
+        self._lock = threading.Lock()
+        with self._lock:
+            self._cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {INDEX_SCHEMA}")
+            self._cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {INDEX_SCHEMA}.datasets (
+                    content_key VARCHAR PRIMARY KEY,
+                    entry VARCHAR NOT NULL
+                )
+            """)
+            self._cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {INDEX_SCHEMA}.sessions (
+                    session_id VARCHAR PRIMARY KEY,
+                    session VARCHAR NOT NULL
+                )
+            """)
+            self._cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {INDEX_SCHEMA}.catalog_tables (
+                    table_name VARCHAR PRIMARY KEY,
+                    record VARCHAR NOT NULL
+                )
+            """)
+
+    def save_dataset(self, content_key: str, entry: Dict[str, Any]):
+        """
+        Store a TableCache entry
+
+        Args:
+            content_key: Cache key of the dataset
+            entry: Entry with table_name, metadata, sketches and views
+        """
+        row = {**entry, "views": sorted(entry["views"])}
+        with self._lock:
+            self._cursor.execute(
+                f"INSERT OR REPLACE INTO {INDEX_SCHEMA}.datasets VALUES (?, ?)",
+                [content_key, _dumps(row)]
+            )
+
+    def remove_dataset(self, content_key: str):
+        """Forget a dataset whose physical table was dropped"""
+        with self._lock:
+            self._cursor.execute(f"DELETE FROM {INDEX_SCHEMA}.datasets WHERE content_key = ?", [content_key])
+
+    def load_datasets(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read all stored TableCache entries
+
+        Returns:
+            content_key -> entry, with views as a set
+        """
+        with self._lock:
+            rows = self._cursor.execute(f"SELECT content_key, entry FROM {INDEX_SCHEMA}.datasets").fetchall()
+
+        entries = {}
+        for content_key, entry in rows:
+            entry = json.loads(entry)
+            entry["views"] = set(entry["views"])
+            entries[content_key] = entry
+        return entries
+
+    def save_session(self, session_id: str, session: Dict[str, Any]):
+        """
+        Store a session record
+
+        Args:
+            session_id: Session identifier
+            session: Session record as kept by SessionManager
+        """
+        with self._lock:
+            self._cursor.execute(
+                f"INSERT OR REPLACE INTO {INDEX_SCHEMA}.sessions VALUES (?, ?)",
+                [session_id, _dumps(session)]
+            )
+
+    def remove_session(self, session_id: str):
+        """Forget a deleted or expired session"""
+        with self._lock:
+            self._cursor.execute(f"DELETE FROM {INDEX_SCHEMA}.sessions WHERE session_id = ?", [session_id])
+
+    def load_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read all stored session records
+
+        Returns:
+            session_id -> session record
+        """
+        with self._lock:
+            rows = self._cursor.execute(f"SELECT session_id, session FROM {INDEX_SCHEMA}.sessions").fetchall()
+        return {session_id: json.loads(session) for session_id, session in rows}
+
+    def save_catalog_table(self, table_name: str, record: Dict[str, Any]):
+        """
+        Store a table of the shared catalog
+
+        Args:
+            table_name: Name the table is queried by
+            record: Catalog table record, see DuckDBManager.catalog_tables
+        """
+        with self._lock:
+            self._cursor.execute(
+                f"INSERT OR REPLACE INTO {INDEX_SCHEMA}.catalog_tables VALUES (?, ?)",
+                [table_name, _dumps(record)]
+            )
+
+    def remove_catalog_table(self, table_name: str):
+        """Forget a dropped table of the shared catalog"""
+        with self._lock:
+            self._cursor.execute(f"DELETE FROM {INDEX_SCHEMA}.catalog_tables WHERE table_name = ?", [table_name])
+
+    def load_catalog_tables(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read all stored tables of the shared catalog
+
+        Returns:
+            table_name -> catalog table record
+        """
+        with self._lock:
+            rows = self._cursor.execute(f"SELECT table_name, record FROM {INDEX_SCHEMA}.catalog_tables").fetchall()
+        return {table_name: json.loads(record) for table_name, record in rows}
+
+    def close(self):
+        """Close the index cursor"""
+        with self._lock:
+            self._cursor.close()
+
+
+def open_index(connection: duckdb.DuckDBPyConnection, db_path: Optional[str]) -> Optional[CatalogIndex]:
+    """
+    Open the index of a persistent database
+
+    Args:
+        connection: Connection to the database
+        db_path: Database file, or None for an in-memory database
+
+    Returns:
+        The index, or None for in-memory databases, which have nothing to restore
+    """
+    if not db_path or db_path == ":memory:":
+        return None
+    return CatalogIndex(connection)
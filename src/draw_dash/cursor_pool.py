@@ -0,0 +1,160 @@
+"""
+DuckDB cursor pool for DrawDash
+Lets read queries from many sessions run in parallel on one database
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Iterator
+
+import duckdb
+
+
+class CursorPool:
+    """
+    Bounded pool of cursors on a shared DuckDB connection
+
+    Every cursor sees the same catalog as the parent connection but runs
+    its own transactions, so queries on different cursors execute
+    concurrently. Cursors are created lazily up to `size`; when all are in
+    use, acquire blocks until one is released or the timeout expires.
+    """
+
+    def __init__(self, connection: duckdb.DuckDBPyConnection, size: int, timeout: Optional[float] = None):
+        """
+        Initialize the pool
+
+        Args:
+            connection: Parent connection the cursors are opened on
+            size: Maximum number of cursors
+            timeout: Default seconds to wait in acquire. None waits forever.
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.connection = connection
+        self.size = size
+        self.timeout = timeout
+
+        self._idle: "queue.LifoQueue[duckdb.DuckDBPyConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+
+        # Wait-time metrics
+        self._acquisitions = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> duckdb.DuckDBPyConnection:
+        """
+        Take a cursor from the pool
+
+        Args:
+            timeout: Seconds to wait for a free cursor. Defaults to the pool timeout.
+
+        Returns:
+            A cursor that must be given back with release
+        """
+        if self._closed:
+            raise RuntimeError("Cursor pool is closed")
+
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=timeout) if timeout is not None else self._slots.acquire()
+        waited = time.perf_counter() - start
+
+        with self._lock:
+            if not acquired:
+                self._timeouts += 1
+                raise TimeoutError(f"No database cursor available after {timeout:.1f}s")
+
+            self._acquisitions += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            self._in_use += 1
+
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            self._created += 1
+
+        try:
+            return self.connection.cursor()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+                self._in_use -= 1
+            self._slots.release()
+            raise
+
+    def release(self, cursor: duckdb.DuckDBPyConnection):
+        """
+        Give a cursor back to the pool
+
+        Args:
+            cursor: Cursor obtained from acquire
+        """
+        with self._lock:
+            self._in_use -= 1
+            if self._closed:
+                self._created -= 1
+                cursor.close()
+            else:
+                self._idle.put(cursor)
+        self._slots.release()
+
+    @contextmanager
+    def cursor(self, timeout: Optional[float] = None) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Context-managed acquire/release
+
+        Args:
+            timeout: Seconds to wait for a free cursor. Defaults to the pool timeout.
+
+        Yields:
+            A cursor for the duration of the block
+        """
+        cursor = self.acquire(timeout)
+        try:
+            yield cursor
+        finally:
+            self.release(cursor)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of pool usage and wait-time metrics
+
+        Returns:
+            Dictionary with size, created/in-use cursors, acquisitions,
+            timeouts and average/max wait in milliseconds
+        """
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "acquisitions": self._acquisitions,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": (self._total_wait / self._acquisitions * 1000) if self._acquisitions else 0.0,
+                "max_wait_ms": self._max_wait * 1000,
+            }
+
+    def close(self):
+        """Close idle cursors; cursors in use are closed on release"""
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    cursor = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._created -= 1
+                cursor.close()
@@ -1,7 +1,6 @@
 import os
 
-import duckdb
-
+from draw_dash.catalog import get_catalog
 from draw_dash.constant import PATH_ROOT
 
 # Path constants.
@@ -9,4 +8,4 @@ PATH_DATA = PATH_ROOT / "data"
 
 
 def initialise_db():
-    duckdb.read_csv(PATH_DATA / "marketing.csv").create_view("marketing")
+    get_catalog().ingest_file(str(PATH_DATA / "marketing.csv"), "marketing")
@@ -5,182 +5,1229 @@ Handles database connections, data ingestion, and metadata extraction
 
 import duckdb
 import pandas as pd
+import pyarrow as pa
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, BinaryIO, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+from draw_dash.catalog_index import open_index
+from draw_dash.cursor_pool import CursorPool
+from draw_dash.memory_budget import MEMORY_LIMIT_BYTES, SPILL_DIRECTORY
+from draw_dash.identifier_index import IdentifierIndex
+from draw_dash.incremental_stats import (
+    column_sketches,
+    delta_aggregates,
+    merge_column_stats,
+    merge_sketches,
+    HLL_REGISTERS,
+)
+from draw_dash.prepared_statements import PreparedStatements
+from draw_dash.profiling import (
+    profile_table,
+    schema_metadata,
+    is_profiled,
+    describe_table,
+    quote_identifier,
+    APPROX_PROFILE_ROWS,
+)
+from draw_dash.query_cache import QueryResultCache, is_read_only
+from draw_dash.query_profiles import query_profiles
+from draw_dash.query_watchdog import query_watchdog, QueryInterrupted, SessionQueryLimitExceeded
+from draw_dash.schema_cache import SchemaCache
+from draw_dash.sql_repair import is_select
+from draw_dash.table_cache import TableCache, hash_file, new_content_hasher
+
+# DuckDB table functions used to read each supported file type
+FILE_READERS = {
+    ".csv": "read_csv_auto",
+    ".json": "read_json_auto",
+    ".parquet": "read_parquet",
+}
+
+# File types DuckDB reads sequentially, so they can be fed through a pipe.
+# Parquet needs random access to its footer and always goes through a file.
+STREAMABLE_SUFFIXES = {".csv", ".json"}
+
+# Compression suffixes DuckDB's CSV and JSON readers decompress themselves
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd"}
+
+# Tables still being loaded; renamed or dropped once the ingest finishes
+STAGING_PREFIX = "ds_staging_"
+
+# Bytes copied from an upload into DuckDB per write
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Default number of files ingested concurrently by ingest_batch
+INGEST_WORKERS = min(8, os.cpu_count() or 1)
+
+# Default number of pooled cursors for read queries, and how long a query
+# waits for one before failing
+QUERY_POOL_SIZE = max(4, os.cpu_count() or 1)
+QUERY_POOL_TIMEOUT = 30.0
+
+# Rows per Arrow record batch when streaming query results
+ARROW_BATCH_SIZE = 65536
+
+# Memory budget for cached query results
+QUERY_CACHE_BYTES = 256 * 1024 * 1024
+
+# Cores DuckDB may use for all queries together (0 = one per core)
+DUCKDB_THREADS = int(os.environ.get("DRAWDASH_DUCKDB_THREADS", "0"))
+
+# Database file for the shared db_manager. Unset keeps everything in memory;
+# with a file, tables and session metadata survive a restart.
+DB_PATH = os.environ.get("DRAWDASH_DB_PATH") or None
+
+
+def parse_error(message: str) -> Dict[str, Any]:
+    """
+    Split a DuckDB error raised with errors_as_json into its parts
+
+    Args:
+        message: str() of the exception, e.g. 'Binder Error: {"exception_type": ...}'
+
+    Returns:
+        Dictionary with the plain error message and, when DuckDB reported
+        them, the subtype, entry type, missing name, candidates and position
+    """
+    prefix, _, payload = message.partition(": ")
+    try:
+        details = json.loads(payload)
+    except ValueError:
+        return {"error": message}
+    if not isinstance(details, dict):
+        return {"error": message}
+
+    candidates = details.get("candidates")
+    return {
+        "error": f"{prefix}: {details.get('exception_message', payload)}",
+        "exception_type": details.get("exception_type"),
+        "subtype": details.get("error_subtype"),
+        "entry_type": details.get("type"),
+        "name": details.get("name"),
+        "candidates": [c.strip().strip('"') for c in candidates.split(",") if c.strip()] if candidates else [],
+        "position": int(details["position"]) if "position" in details else None,
+    }
+
+
+def split_compression(filename: str) -> Tuple[str, Optional[str]]:
+    """
+    Strip a compression suffix from a file name
+
+    Args:
+        filename: File name, e.g. sales.csv.gz
+
+    Returns:
+        Name without the compression suffix and the compression, e.g.
+        ("sales.csv", "gzip"); the compression is None for plain files
+    """
+    path = Path(filename)
+    compression = COMPRESSION_SUFFIXES.get(path.suffix.lower())
+    if compression is None:
+        return filename, None
+    return str(path.with_suffix("")), compression
+
+
+def file_reader(filename: str) -> str:
+    """
+    DuckDB table function call that reads a file, with ? for the path
+
+    Args:
+        filename: File name, used to determine the format and compression
+
+    Returns:
+        Call such as read_csv_auto(?) or read_csv_auto(?, compression = 'gzip')
+    """
+    name, compression = split_compression(filename)
+    suffix = Path(name).suffix.lower()
+    if suffix not in FILE_READERS:
+        raise ValueError(f"Unsupported file type: {suffix}")
+    if compression is None:
+        return f"{FILE_READERS[suffix]}(?)"
+    if suffix not in STREAMABLE_SUFFIXES:
+        raise ValueError(f"Unsupported compressed file type: {suffix} ({compression})")
+    return f"{FILE_READERS[suffix]}(?, compression = '{compression}')"
 
 
 class DuckDBManager:
     """Manager for DuckDB operations"""
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        pool_size: int = QUERY_POOL_SIZE,
+        pool_timeout: Optional[float] = QUERY_POOL_TIMEOUT,
+        query_cache_bytes: int = QUERY_CACHE_BYTES,
+        approx_profile_rows: Optional[int] = APPROX_PROFILE_ROWS,
+        memory_limit: Optional[int] = MEMORY_LIMIT_BYTES,
+        spill_directory: Optional[str] = SPILL_DIRECTORY,
+        threads: Optional[int] = DUCKDB_THREADS
+    ):
         """
         Initialize DuckDB manager
 
         Args:
             db_path: Path to DuckDB database file. If None, uses in-memory database.
+                With a file, ingested tables and their metadata persist and
+                are re-attached when the manager is created again.
+            pool_size: Maximum number of concurrent read queries
+            pool_timeout: Seconds a query waits for a free cursor before failing
+            query_cache_bytes: Memory budget for cached query results
+            approx_profile_rows: Tables with more rows get approximate column
+                stats. None always profiles exactly.
+            memory_limit: Bytes DuckDB may allocate before it spills to disk.
+                None keeps DuckDB's default of 80% of RAM.
+            spill_directory: Directory for spilled blocks. None disables spilling.
+            threads: Cores DuckDB may use across all queries. None or 0
+                keeps DuckDB's default of one per core.
         """
         self.db_path = db_path
+        self.approx_profile_rows = approx_profile_rows
         self.connection = duckdb.connect(db_path or ":memory:")
 
+        # Bound the buffer pool so one large upload spills instead of
+        # exhausting the process; in-memory tables spill too
+        if memory_limit is not None:
+            self.connection.execute(f"SET memory_limit = '{int(memory_limit)}B'")
+        if spill_directory is not None:
+            os.makedirs(spill_directory, exist_ok=True)
+            self.connection.execute("SET temp_directory = ?", [spill_directory])
+        self.memory_limit = memory_limit
+        self.spill_directory = spill_directory
+
+        # A runaway query cannot take more than this many cores
+        if threads:
+            self.connection.execute(f"SET threads = {int(threads)}")
+
+        # Read queries run on pooled cursors; ingest and DDL keep to their own
+        self.query_pool = CursorPool(self.connection, size=pool_size, timeout=pool_timeout)
+
+        # Results of repeated reads, invalidated when a table they read changes
+        self.query_cache = QueryResultCache(max_bytes=query_cache_bytes)
+
+        # Column lists for error diagnosis, invalidated on DDL
+        self.schema_cache = SchemaCache()
+
+        # Table and column names for ranked "did you mean" suggestions, built at ingest
+        self.identifiers = IdentifierIndex()
+
+        # JSON profiles of executed queries, when profiling is enabled
+        self.query_profiles = query_profiles
+
+        # Deadlines, cancellation and per-session caps of running queries
+        self.query_watchdog = query_watchdog
+
+        # Named query templates per session, executed with bound parameters
+        self.prepared = PreparedStatements()
+
+        # Identical uploads share one physical table, exposed per session as a view
+        self.table_cache = TableCache()
+        self._cache_lock = threading.Lock()
+
+        # Tables ingested into the shared catalog -> record with the ingested
+        # file's size; views onto the table cache like session tables
+        self._catalog_tables: Dict[str, Dict[str, Any]] = {}
+        self._catalog_lock = threading.Lock()
+
+        # Metadata index of a persistent database; None when in memory
+        self.catalog = open_index(self.connection, db_path)
+        if self.catalog is not None:
+            self._restore()
+
+    def _restore(self):
+        """
+        Reload the table cache from the catalog index
+
+        Tables left behind by ingests that never finished, staging tables
+        or physical tables the index does not know, are dropped. Tables of
+        the shared catalog come back with the datasets they point at.
+        """
+        entries = self.catalog.load_datasets()
+        with self._cache_lock:
+            self.table_cache.load(entries)
+            for table_name, record in self.catalog.load_catalog_tables().items():
+                if self.table_cache.is_view(table_name):
+                    self._catalog_tables[table_name] = record
+                else:
+                    self.catalog.remove_catalog_table(table_name)
+            known = set(self.table_cache.physical_tables())
+            leftovers = self.connection.execute("""
+                SELECT table_name FROM duckdb_tables()
+                WHERE schema_name = 'main' AND table_name LIKE 'ds\\_%' ESCAPE '\\'
+            """).fetchall()
+            for (table_name,) in leftovers:
+                if table_name not in known:
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+
+    def _table_changed(self, table_name: str):
+        """Invalidate cached results and the cached schema of a table"""
+        self.query_cache.bump_table_version(table_name)
+        self.schema_cache.invalidate(table_name)
+        self.identifiers.remove_table(table_name)
+
+    def _index_identifiers(self, table_name: str, metadata: Optional[Dict[str, Any]]):
+        """Add an ingested table's column names to the identifier index"""
+        if metadata is not None:
+            self.identifiers.add_table(table_name, [column["name"] for column in metadata["columns"]])
+
+    def _sync_index(self, *content_keys: Optional[str]):
+        """
+        Write table cache entries through to the catalog index
+
+        Entries that left the cache are removed. Caller holds _cache_lock.
+        """
+        if self.catalog is None:
+            return
+        for content_key in content_keys:
+            if content_key is None:
+                continue
+            if content_key in self.table_cache:
+                self.catalog.save_dataset(content_key, self.table_cache.entry(content_key))
+            else:
+                self.catalog.remove_dataset(content_key)
+
     def ingest_file(
         self,
         file_path: str,
-        table_name: str = "dataset"
+        table_name: str = "dataset",
+        connection: Optional[duckdb.DuckDBPyConnection] = None,
+        profile: bool = True
     ) -> Dict[str, Any]:
         """
         Ingest a file into DuckDB
 
         Args:
-            file_path: Path to the file (CSV, JSON, or Parquet)
+            file_path: Path to the file (CSV, JSON, or Parquet). CSV and
+                JSON may be gzip or zstd compressed (.gz, .zst) and are
+                decompressed by DuckDB while reading.
             table_name: Name for the table in DuckDB
+            connection: Cursor to run on. Defaults to the shared connection.
+            profile: Compute column stats now. If False only the schema is
+                returned; get_table_metadata completes it later.
 
         Returns:
             Metadata dictionary with schema, row count, etc.
         """
+        connection = connection or self.connection
         file_path = Path(file_path)
 
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
         # Determine file type and ingest
-        suffix = file_path.suffix.lower()
+        staging_table = self._staging_table_name()
 
         try:
-            if suffix == ".csv":
-                # Ingest CSV
-                self.connection.execute(
-                    f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_csv_auto('{file_path}')"
-                )
+            reader = file_reader(file_path.name)
+            content_key = TableCache.content_key(hash_file(file_path), reader)
 
-            elif suffix == ".json":
-                # Ingest JSON
-                self.connection.execute(
-                    f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_json_auto('{file_path}')"
-                )
+            # Repeat uploads resolve to the existing table without re-reading
+            metadata = self._attach_cached(connection, content_key, table_name)
+            if metadata is not None:
+                return metadata
 
-            elif suffix == ".parquet":
-                # Ingest Parquet
-                self.connection.execute(
-                    f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_parquet('{file_path}')"
-                )
+            connection.execute(
+                f"CREATE TABLE {staging_table} AS SELECT * FROM {reader}",
+                [str(file_path)]
+            )
+
+            # Extract metadata and publish the table to the cache
+            return self._publish(connection, content_key, staging_table, table_name, profile)
+
+        except Exception as e:
+            connection.execute(f"DROP TABLE IF EXISTS {staging_table}")
+            raise Exception(f"Failed to ingest file: {str(e)}")
+
+    @staticmethod
+    def can_stream(filename: str) -> bool:
+        """
+        Check whether a file can be ingested with ingest_stream
+
+        Args:
+            filename: Original file name, used to determine the file type
+
+        Returns:
+            True if the format is read sequentially and the platform has FIFOs.
+            Compressed files are not: DuckDB rewinds them after sniffing the
+            CSV dialect or JSON schema, which a pipe cannot do.
+        """
+        return hasattr(os, "mkfifo") and Path(filename).suffix.lower() in STREAMABLE_SUFFIXES
+
+    def ingest_stream(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        table_name: str = "dataset",
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        connection: Optional[duckdb.DuckDBPyConnection] = None,
+        profile: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Ingest a file-like object into DuckDB without writing it to disk
+
+        The stream is pumped through a named pipe by a writer thread while
+        DuckDB reads the other end, so only one chunk is held in Python at a
+        time. Formats that need random access (Parquet) must go through
+        ingest_file instead, see can_stream.
+
+        Args:
+            stream: Binary file-like object positioned at the start of the data
+            filename: Original file name, used to determine the file type
+            table_name: Name for the table in DuckDB
+            chunk_size: Number of bytes copied into the pipe per write
+            connection: Cursor to run on. Defaults to the shared connection.
+            profile: Compute column stats now. If False only the schema is
+                returned; get_table_metadata completes it later.
+
+        Returns:
+            Metadata dictionary with schema, row count, etc.
+        """
+        connection = connection or self.connection
+        suffix = Path(filename).suffix.lower()
+        if not self.can_stream(filename):
+            raise ValueError(f"File type cannot be streamed: {suffix}")
+
+        reader = file_reader(filename)
+        staging_table = self._staging_table_name()
+
+        try:
+            digest = self._load_stream(connection, stream, suffix, staging_table, chunk_size)
+
+            # The hash is only known once the stream is consumed, so a repeat
+            # upload still pays the read but not the profiling or the memory
+            content_key = TableCache.content_key(digest, reader)
+            metadata = self._attach_cached(connection, content_key, table_name)
+            if metadata is not None:
+                connection.execute(f"DROP TABLE {staging_table}")
+                return metadata
+
+            # Extract metadata and publish the table to the cache
+            return self._publish(connection, content_key, staging_table, table_name, profile)
+
+        except Exception as e:
+            connection.execute(f"DROP TABLE IF EXISTS {staging_table}")
+            raise Exception(f"Failed to ingest stream: {str(e)}")
+
+    def _load_stream(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        stream: BinaryIO,
+        suffix: str,
+        staging_table: str,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> str:
+        """
+        Read a stream into a new table through a named pipe
+
+        Returns:
+            Hex digest of the bytes read
+        """
+        reader = file_reader(f"data{suffix}")
+        hasher = new_content_hasher()
+
+        fifo_dir = tempfile.mkdtemp(prefix="drawdash_stream_")
+        fifo_path = os.path.join(fifo_dir, f"data{suffix}")
+        os.mkfifo(fifo_path)
+
+        writer_errors = []
+        cancelled = threading.Event()
+
+        def pump():
+            try:
+                with open(fifo_path, "wb") as pipe:
+                    while not cancelled.is_set():
+                        chunk = stream.read(chunk_size)
+                        if not chunk:
+                            break
+                        hasher.update(chunk)
+                        pipe.write(chunk)
+            except BrokenPipeError:
+                # DuckDB stopped reading, its own error is reported instead
+                pass
+            except Exception as e:
+                writer_errors.append(e)
+
+        writer = threading.Thread(target=pump, daemon=True)
+        writer.start()
+
+        try:
+            connection.execute(
+                f"CREATE TABLE {staging_table} AS SELECT * FROM {reader}",
+                [fifo_path]
+            )
+            writer.join()
+            if writer_errors:
+                raise writer_errors[0]
+            return hasher.hexdigest()
+
+        finally:
+            if writer.is_alive():
+                # DuckDB failed before draining the pipe; hold the read end
+                # open and discard data until the writer notices the cancel
+                cancelled.set()
+                fd = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+                try:
+                    while writer.is_alive():
+                        try:
+                            os.read(fd, chunk_size)
+                        except BlockingIOError:
+                            writer.join(0.01)
+                finally:
+                    os.close(fd)
+            writer.join()
+            shutil.rmtree(fifo_dir, ignore_errors=True)
+
+    @staticmethod
+    def _staging_table_name() -> str:
+        """Unique name for a table that is still being loaded"""
+        return f"{STAGING_PREFIX}{uuid.uuid4().hex}"
+
+    def _attach_locked(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        content_key: str,
+        view_name: str
+    ) -> Dict[str, Any]:
+        """Point a session view at a cached table. Caller holds _cache_lock."""
+        previous_key = self.table_cache.view_key(view_name)
+        if previous_key == content_key:
+            return self.table_cache.metadata(view_name)
+
+        if previous_key is not None:
+            # Re-ingest under an existing name releases the old dataset
+            physical_table = self.table_cache.release(view_name)
+            if physical_table:
+                connection.execute(f"DROP TABLE IF EXISTS {physical_table}")
+                self._table_changed(physical_table)
+
+        entry = self.table_cache.acquire(content_key, view_name)
+        connection.execute(
+            f"CREATE OR REPLACE VIEW {quote_identifier(view_name)} AS SELECT * FROM {entry['table_name']}"
+        )
+        self._table_changed(view_name)
+        self._sync_index(previous_key, content_key)
+        metadata = self.table_cache.metadata(view_name)
+        self._index_identifiers(view_name, metadata)
+        return metadata
+
+    def _attach_cached(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        content_key: str,
+        view_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Expose an already ingested dataset under a session view
 
+        Returns:
+            Cached metadata for the view, or None on a cache miss
+        """
+        with self._cache_lock:
+            if content_key not in self.table_cache:
+                return None
+            return self._attach_locked(connection, content_key, view_name)
+
+    def _profile(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        table_name: str
+    ) -> Tuple[Dict[str, Any], Dict[str, List[int]]]:
+        """
+        Profile a cached dataset and sketch its columns for later appends
+
+        Taking the sketches with the profile, while the table is being
+        read anyway, keeps the full scan of the base table off the append.
+
+        Returns:
+            Metadata and the distinct-count sketch of each profiled column
+        """
+        metadata = profile_table(connection, table_name, approx_threshold=self.approx_profile_rows)
+        return metadata, column_sketches(connection, table_name, metadata["columns"])
+
+    def _publish(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        content_key: str,
+        staging_table: str,
+        view_name: str,
+        profile: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Profile a freshly loaded table, register it and expose it as a view
+
+        Returns:
+            Metadata for the view; schema only when profile is False
+        """
+        sketches = None
+        if profile:
+            metadata, sketches = self._profile(connection, staging_table)
+        else:
+            metadata = schema_metadata(connection, staging_table)
+
+        with self._cache_lock:
+            if content_key in self.table_cache:
+                # A concurrent ingest of the same bytes won the race
+                connection.execute(f"DROP TABLE {staging_table}")
             else:
-                raise ValueError(f"Unsupported file type: {suffix}")
+                physical_table = TableCache.physical_table_name(content_key)
+                connection.execute(f"ALTER TABLE {staging_table} RENAME TO {physical_table}")
+                metadata["table_name"] = physical_table
+                self.table_cache.add(content_key, physical_table, metadata, sketches)
 
-            # Extract metadata
-            metadata = self.get_table_metadata(table_name)
-            return metadata
+            return self._attach_locked(connection, content_key, view_name)
+
+    def append_file(
+        self,
+        table_name: str,
+        file_path: str,
+        connection: Optional[duckdb.DuckDBPyConnection] = None
+    ) -> Dict[str, Any]:
+        """
+        Append the rows of a file to an ingested table
+
+        Only the new file is read. Column stats are merged with those of
+        the new rows instead of re-profiling the table, see _append.
+
+        Args:
+            table_name: Table created by ingest_file or ingest_stream
+            file_path: Path to the file (CSV, JSON, or Parquet)
+            connection: Cursor to run on. Defaults to the shared connection.
+
+        Returns:
+            Metadata dictionary of the table after the append
+        """
+        connection = connection or self.connection
+        file_path = Path(file_path)
+
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        staging_table = self._staging_table_name()
+
+        try:
+            reader = file_reader(file_path.name)
+            connection.execute(
+                f"CREATE TABLE {staging_table} AS SELECT * FROM {reader}",
+                [str(file_path)]
+            )
+            delta_key = TableCache.content_key(hash_file(file_path), reader)
+            return self._append(connection, table_name, staging_table, delta_key)
 
         except Exception as e:
-            raise Exception(f"Failed to ingest file: {str(e)}")
+            connection.execute(f"DROP TABLE IF EXISTS {staging_table}")
+            raise Exception(f"Failed to append file: {str(e)}")
 
-    def get_table_metadata(self, table_name: str = "dataset") -> Dict[str, Any]:
+    def append_stream(
+        self,
+        table_name: str,
+        stream: BinaryIO,
+        filename: str,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        connection: Optional[duckdb.DuckDBPyConnection] = None
+    ) -> Dict[str, Any]:
         """
-        Extract metadata from a table
+        Append the rows of a file-like object to an ingested table
+
+        Like append_file, but the data is piped in as in ingest_stream.
 
         Args:
-            table_name: Name of the table
+            table_name: Table created by ingest_file or ingest_stream
+            stream: Binary file-like object positioned at the start of the data
+            filename: Original file name, used to determine the file type
+            chunk_size: Number of bytes copied into the pipe per write
+            connection: Cursor to run on. Defaults to the shared connection.
 
         Returns:
-            Dictionary with metadata
+            Metadata dictionary of the table after the append
         """
+        connection = connection or self.connection
+        suffix = Path(filename).suffix.lower()
+        if not self.can_stream(filename):
+            raise ValueError(f"File type cannot be streamed: {suffix}")
+
+        staging_table = self._staging_table_name()
+
         try:
-            # Get row count
-            row_count = self.connection.execute(
-                f"SELECT COUNT(*) FROM {table_name}"
-            ).fetchone()[0]
-
-            # Get schema information
-            schema_info = self.connection.execute(
-                f"DESCRIBE {table_name}"
-            ).fetchall()
-
-            # Format schema
-            columns = []
-            for col in schema_info:
-                columns.append({
-                    "name": col[0],
-                    "type": col[1],
-                    "null": col[2] if len(col) > 2 else "YES"
-                })
-
-            # Get column statistics for numeric columns
-            column_stats = {}
-            for col in columns:
-                col_name = col["name"]
-                col_type = col["type"].upper()
-
-                # Only get stats for numeric columns
-                if any(t in col_type for t in ["INT", "FLOAT", "DOUBLE", "DECIMAL", "NUMERIC"]):
-                    try:
-                        stats = self.connection.execute(f"""
-                            SELECT
-                                MIN({col_name}) as min,
-                                MAX({col_name}) as max,
-                                AVG({col_name}) as avg,
-                                COUNT(DISTINCT {col_name}) as distinct_count
-                            FROM {table_name}
-                        """).fetchone()
-
-                        column_stats[col_name] = {
-                            "min": float(stats[0]) if stats[0] is not None else None,
-                            "max": float(stats[1]) if stats[1] is not None else None,
-                            "avg": float(stats[2]) if stats[2] is not None else None,
-                            "distinct_count": int(stats[3]) if stats[3] is not None else None
-                        }
-                    except:
-                        # Skip if stats extraction fails
-                        pass
-
-                # For string/categorical columns, get distinct count
-                elif "VARCHAR" in col_type or "TEXT" in col_type:
-                    try:
-                        distinct_count = self.connection.execute(f"""
-                            SELECT COUNT(DISTINCT {col_name}) FROM {table_name}
-                        """).fetchone()[0]
-
-                        column_stats[col_name] = {
-                            "distinct_count": int(distinct_count)
-                        }
-                    except:
-                        pass
-
-            # Get sample data (first 5 rows)
-            sample_data = self.connection.execute(
-                f"SELECT * FROM {table_name} LIMIT 5"
-            ).fetchdf().to_dict('records')
-
-            metadata = {
-                "table_name": table_name,
-                "row_count": row_count,
-                "column_count": len(columns),
-                "columns": columns,
-                "column_stats": column_stats,
-                "sample_data": sample_data
-            }
+            digest = self._load_stream(connection, stream, suffix, staging_table, chunk_size)
+            delta_key = TableCache.content_key(digest, file_reader(filename))
+            return self._append(connection, table_name, staging_table, delta_key)
 
+        except Exception as e:
+            connection.execute(f"DROP TABLE IF EXISTS {staging_table}")
+            raise Exception(f"Failed to append stream: {str(e)}")
+
+    def _append(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        view_name: str,
+        staging_table: str,
+        delta_key: str
+    ) -> Dict[str, Any]:
+        """
+        Insert a staged delta into the dataset behind a view
+
+        The result is cached under a key derived from the base dataset and
+        the delta, so the same append replayed by another session is
+        shared. A dataset only this view uses is appended to in place;
+        a shared one is copied first so other sessions keep their rows.
+
+        Stats are merged from the delta's aggregates and distinct-count
+        sketches. The base table's sketches are taken when it is profiled;
+        one without them, e.g. restored from an older catalog index, is
+        sketched on its first append.
+        Only the view and the physical tables involved are invalidated in
+        the query cache.
+
+        Returns:
+            Metadata for the view after the append
+        """
+        delta_columns = describe_table(connection, staging_table)
+        delta = delta_aggregates(connection, staging_table, delta_columns)
+        delta_sketches = column_sketches(connection, staging_table, delta_columns)
+
+        with self._cache_lock:
+            base_key = self.table_cache.view_key(view_name)
+            if base_key is None:
+                raise ValueError(f"Table {view_name} is not an ingested dataset")
+
+            content_key = TableCache.content_key(delta_key, f"append:{base_key}")
+            if content_key in self.table_cache:
+                connection.execute(f"DROP TABLE {staging_table}")
+                return self._attach_locked(connection, content_key, view_name)
+
+            entry = self.table_cache.entry(base_key)
+            base_table = entry["table_name"]
+            metadata = entry["metadata"]
+            sketches = entry["sketches"]
+            if is_profiled(metadata) and sketches is None:
+                sketches = column_sketches(connection, base_table, metadata["columns"])
+
+            physical_table = TableCache.physical_table_name(content_key)
+            in_place = entry["views"] == {view_name}
+            if in_place:
+                connection.execute(f"INSERT INTO {base_table} BY NAME SELECT * FROM {staging_table}")
+                connection.execute(f"ALTER TABLE {base_table} RENAME TO {physical_table}")
+            else:
+                connection.execute(f"CREATE TABLE {physical_table} AS SELECT * FROM {base_table}")
+                connection.execute(f"INSERT INTO {physical_table} BY NAME SELECT * FROM {staging_table}")
+            connection.execute(f"DROP TABLE {staging_table}")
+
+            if is_profiled(metadata):
+                empty = [0] * HLL_REGISTERS
+                sketches = {
+                    name: merge_sketches(registers, delta_sketches.get(name, empty))
+                    for name, registers in sketches.items()
+                }
+                metadata = merge_column_stats(metadata, delta, sketches)
+            else:
+                # Stats are still being computed and will cover the new rows
+                metadata = {**metadata, "row_count": metadata["row_count"] + delta["row_count"]}
+            metadata["table_name"] = physical_table
+
+            if not in_place:
+                self.table_cache.add(content_key, physical_table, metadata, sketches)
+                return self._attach_locked(connection, content_key, view_name)
+
+            self.table_cache.rekey(base_key, content_key, physical_table, metadata, sketches)
+            connection.execute(
+                f"CREATE OR REPLACE VIEW {quote_identifier(view_name)} AS SELECT * FROM {physical_table}"
+            )
+            self._table_changed(base_table)
+            self._table_changed(view_name)
+            self._sync_index(base_key, content_key)
+            metadata = self.table_cache.metadata(view_name)
+            self._index_identifiers(view_name, metadata)
             return metadata
 
+    def ingest_batch(
+        self,
+        items: List[Dict[str, Any]],
+        max_workers: int = INGEST_WORKERS,
+        profile: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Ingest several files concurrently, one DuckDB cursor per worker
+
+        Each item is either {"table_name", "file_path"} for ingest_file or
+        {"table_name", "stream", "filename"} for ingest_stream. A failing item
+        does not abort the others.
+
+        Args:
+            items: Files to ingest
+            max_workers: Upper bound on concurrent ingests
+            profile: Compute column stats during ingest, see ingest_file
+
+        Returns:
+            One result per item, in input order, with table_name, metadata
+            (None on failure) and error (None on success)
+        """
+        def ingest_one(item: Dict[str, Any]) -> Dict[str, Any]:
+            cursor = self.connection.cursor()
+            try:
+                if "stream" in item:
+                    metadata = self.ingest_stream(
+                        stream=item["stream"],
+                        filename=item["filename"],
+                        table_name=item["table_name"],
+                        connection=cursor,
+                        profile=profile
+                    )
+                else:
+                    metadata = self.ingest_file(
+                        file_path=item["file_path"],
+                        table_name=item["table_name"],
+                        connection=cursor,
+                        profile=profile
+                    )
+                return {"table_name": item["table_name"], "metadata": metadata, "error": None}
+            except Exception as e:
+                return {"table_name": item["table_name"], "metadata": None, "error": str(e)}
+            finally:
+                cursor.close()
+
+        if not items:
+            return []
+
+        workers = max(1, min(max_workers, len(items)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drawdash_ingest") as pool:
+            return list(pool.map(ingest_one, items))
+
+    def profile_tables(
+        self,
+        table_names: List[str],
+        max_workers: int = INGEST_WORKERS
+    ) -> List[Dict[str, Any]]:
+        """
+        Complete the column stats of several tables concurrently
+
+        Used after a schema-only ingest. Tables that are already profiled
+        are answered from the table cache.
+
+        Args:
+            table_names: Tables to profile
+            max_workers: Upper bound on concurrent profiling scans
+
+        Returns:
+            One result per table, in input order, with table_name, metadata
+            (None on failure) and error (None on success)
+        """
+        def profile_one(table_name: str) -> Dict[str, Any]:
+            cursor = self.connection.cursor()
+            try:
+                metadata = self.get_table_metadata(table_name, connection=cursor)
+                return {"table_name": table_name, "metadata": metadata, "error": None}
+            except Exception as e:
+                return {"table_name": table_name, "metadata": None, "error": str(e)}
+            finally:
+                cursor.close()
+
+        if not table_names:
+            return []
+
+        workers = max(1, min(max_workers, len(table_names)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drawdash_profile") as pool:
+            return list(pool.map(profile_one, table_names))
+
+    def get_table_metadata(
+        self,
+        table_name: str = "dataset",
+        connection: Optional[duckdb.DuckDBPyConnection] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract metadata from a table
+
+        Cached datasets whose stats were deferred at ingest are profiled on
+        first request and the result, with its sketches, is stored back in
+        the table cache.
+
+        Args:
+            table_name: Name of the table
+            connection: Cursor to run on. Defaults to the shared connection.
+
+        Returns:
+            Dictionary with metadata
+        """
+        cached = self.table_cache.metadata(table_name)
+        if cached is not None and is_profiled(cached):
+            return cached
+
+        try:
+            if cached is None:
+                metadata = profile_table(
+                    connection or self.connection,
+                    table_name,
+                    approx_threshold=self.approx_profile_rows
+                )
+            else:
+                metadata, sketches = self._profile(connection or self.connection, table_name)
         except Exception as e:
             raise Exception(f"Failed to extract metadata: {str(e)}")
 
-    def execute_query(self, query: str) -> pd.DataFrame:
+        if cached is not None:
+            with self._cache_lock:
+                self.table_cache.update_metadata(table_name, metadata, sketches)
+                self._sync_index(self.table_cache.view_key(table_name))
+        return metadata
+
+    def execute_query(
+        self,
+        query: str,
+        query_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> pd.DataFrame:
         """
         Execute a SQL query and return results as DataFrame
 
+        Runs on a pooled cursor, so concurrent calls execute in parallel,
+        and is served from the query result cache when possible.
+
         Args:
             query: SQL query string
+            query_id: Id to cancel the query and store its profile under,
+                see execute_arrow
+            session_id: Session running the query, for its concurrency cap
+            timeout: Seconds before the query is interrupted
+            params: Values for the query's $name parameters
 
         Returns:
             Pandas DataFrame with results
         """
+        return self.execute_arrow(query, query_id, session_id, timeout, params).to_pandas()
+
+    def execute_arrow(
+        self,
+        query: str,
+        query_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> pa.Table:
+        """
+        Execute a SQL query and return results as an Arrow table
+
+        DuckDB hands its columnar result over without converting it row by
+        row. Deterministic reads are cached, so a repeated query against
+        unchanged tables returns the stored table without touching DuckDB.
+        With profiling enabled, queries that reach DuckDB have their
+        profile stored in query_profiles.
+
+        Queries run under the query watchdog: they are interrupted at their
+        deadline or on query_watchdog.cancel(query_id).
+
+        Args:
+            query: SQL query string
+            query_id: Id to cancel the query and store its profile under;
+                generated if None
+            session_id: Session running the query, for its concurrency cap
+            timeout: Seconds before the query is interrupted; defaults to
+                the watchdog's timeout, 0 disables
+            params: Values for the query's $name parameters, bound by
+                DuckDB rather than spliced into the SQL. Results are cached
+                per distinct set of values.
+
+        Returns:
+            Arrow table with results
+
+        Raises:
+            QueryTimeout, QueryCancelled: If the watchdog stopped the query
+            SessionQueryLimitExceeded: If the session is at its query cap
+        """
+        key = self.query_cache.key(query, params)
+        if key is not None:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cached
+
+        query_id = query_id or uuid.uuid4().hex
+        try:
+            with self.query_pool.cursor() as cursor:
+                with self.query_watchdog.guard(cursor, query, query_id, session_id, timeout):
+                    capture = self.query_profiles.begin(cursor, query_id)
+                    try:
+                        result = cursor.execute(query, params).fetch_arrow_table()
+                    except Exception as e:
+                        self.query_profiles.end(capture, query, error=str(e))
+                        raise
+                    self.query_profiles.end(capture, query)
+        except (QueryInterrupted, SessionQueryLimitExceeded):
+            raise
+        except Exception as e:
+            raise Exception(f"Query execution failed: {str(e)}")
+
+        if key is not None:
+            self.query_cache.put(key, result)
+        elif not is_read_only(query):
+            # Arbitrary DDL/DML may have changed any table
+            self.query_cache.clear()
+            self.schema_cache.invalidate()
+            self.identifiers.clear()
+        return result
+
+    def execute_record_batches(
+        self,
+        query: str,
+        batch_size: int = ARROW_BATCH_SIZE,
+        query_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> pa.RecordBatchReader:
+        """
+        Execute a SQL query and stream results as Arrow record batches
+
+        The query runs immediately, so errors surface here rather than
+        while reading. The pooled cursor stays checked out until the reader
+        is exhausted or closed. Cached results are replayed from memory, and
+        a fully read result that fits the cache budget is stored. The query
+        profile, if enabled, is stored once the reader is exhausted or closed.
+
+        The deadline covers reading as well: a reader still open when it
+        passes raises QueryTimeout on the next batch.
+
+        Args:
+            query: SQL query string
+            batch_size: Maximum rows per record batch
+            query_id: Id to cancel the query and store its profile under;
+                generated if None
+            session_id: Session running the query, for its concurrency cap
+            timeout: Seconds before the query is interrupted, see execute_arrow
+            params: Values for the query's $name parameters, see execute_arrow
+
+        Returns:
+            Arrow RecordBatchReader over the results
+        """
+        key = self.query_cache.key(query, params)
+        if key is not None:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cached.to_reader(max_chunksize=batch_size)
+
+        query_id = query_id or uuid.uuid4().hex
+        cursor = self.query_pool.acquire()
+        try:
+            running = self.query_watchdog.start(cursor, query, query_id, session_id, timeout)
+        except Exception:
+            self.query_pool.release(cursor)
+            raise
+        capture = None
         try:
-            result = self.connection.execute(query).fetchdf()
-            return result
+            capture = self.query_profiles.begin(cursor, query_id)
+            reader = cursor.execute(query, params).fetch_record_batch(batch_size)
         except Exception as e:
+            self.query_profiles.end(capture, query, error=str(e))
+            self.query_pool.release(cursor)
+            # Raises QueryTimeout or QueryCancelled if the watchdog stopped it
+            self.query_watchdog.finish(running, e)
             raise Exception(f"Query execution failed: {str(e)}")
 
+        if key is None and not is_read_only(query):
+            # Arbitrary DDL/DML may have changed any table
+            self.query_cache.clear()
+            self.schema_cache.invalidate()
+            self.identifiers.clear()
+
+        def batches():
+            # Keep the batches for the cache unless the result outgrows it
+            kept = [] if key is not None else None
+            kept_bytes = 0
+            error = None
+            try:
+                for batch in reader:
+                    if kept is not None:
+                        kept_bytes += batch.nbytes
+                        if kept_bytes <= self.query_cache.max_bytes:
+                            kept.append(batch)
+                        else:
+                            kept = None
+                    yield batch
+                if kept is not None:
+                    self.query_cache.put(key, pa.Table.from_batches(kept, schema=reader.schema))
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                self.query_profiles.end(capture, query, error=str(error) if error else None)
+                self.query_pool.release(cursor)
+                self.query_watchdog.finish(running, error)
+
+        return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+    def validate_query(self, query: str) -> Optional[str]:
+        """
+        Bind and plan a query without running it
+
+        Args:
+            query: SQL query string
+
+        Returns:
+            DuckDB's error message, or None if the query binds
+        """
+        error = self.bind_error(query)
+        return error["error"] if error is not None else None
+
+    def bind_error(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Bind a query without running it and describe why it fails
+
+        The query is planned with DuckDB's errors_as_json setting, which
+        reports binder and catalog errors with the missing name and
+        DuckDB's own candidates instead of only as text. Only a single
+        SELECT is planned: EXPLAIN runs every statement after its first,
+        so anything else is rejected unplanned.
+
+        Args:
+            query: SQL query string
+
+        Returns:
+            None if the query binds, else the error message and its parts:
+            exception type, subtype (e.g. COLUMN_NOT_FOUND), entry type
+            (e.g. Table), missing name, candidates and position
+        """
+        with self.query_pool.cursor() as cursor:
+            cursor.execute("SET errors_as_json = true")
+            try:
+                try:
+                    statements = cursor.extract_statements(query)
+                except duckdb.Error as e:
+                    return parse_error(str(e))
+                if len(statements) != 1 or not is_select(statements[0].query):
+                    return {"error": "Only a single SELECT statement can be validated"}
+
+                statement = statements[0].query
+                try:
+                    cursor.execute(f"EXPLAIN {statement}")
+                except duckdb.Error as e:
+                    error = parse_error(str(e))
+                    if error.get("position") is not None:
+                        # Offset into the query, not into the EXPLAIN wrapper
+                        offset = max(query.find(statement), 0) - len("EXPLAIN ")
+                        error["position"] = max(error["position"] + offset, 0)
+                    return error
+            finally:
+                cursor.execute("RESET errors_as_json")
+        return None
+
+    def resolve_identifier(
+        self,
+        name: str,
+        kind: str = "column",
+        table_names: Optional[List[str]] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank the tables or columns a misspelled name may have meant
+
+        Tables not ingested through the manager, e.g. created by a query,
+        are indexed on first use.
+
+        Args:
+            name: The name that was not found
+            kind: "column" or "table"
+            table_names: Tables in scope, e.g. those a session owns; every
+                visible table if None
+            limit: Maximum number of candidates
+
+        Returns:
+            Candidates with name, table and a similarity score, best first
+        """
+        if table_names is None:
+            table_names = self.schema_cache.tables(self._visible_tables)
+        missing = [table_name for table_name in table_names if table_name not in self.identifiers]
+        if missing:
+            for table_name, columns in self.schema_snapshot(missing)["tables"].items():
+                self.identifiers.add_table(table_name, [column["name"] for column in columns])
+        return self.identifiers.candidates(name, kind, table_names, limit)
+
+    def prepare_statement(self, session_id: str, name: str, template: str) -> Dict[str, Any]:
+        """
+        Register a named query template for a session
+
+        The template is parsed and bound once here; execute it with
+        prepared.bind and execute_arrow or execute_record_batches.
+
+        Args:
+            session_id: Session owning the statement
+            name: Statement name, unique within the session
+            template: A single SELECT statement with $name parameters
+
+        Returns:
+            Statement description with its parameter names
+        """
+        with self.query_pool.cursor() as cursor:
+            return self.prepared.register(cursor, session_id, name, template)
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """
+        Memory DuckDB currently holds, and how much of it is spilled
+
+        Returns:
+            Dictionary with used_bytes (buffer pool), spilled_bytes (temp
+            files), table_bytes (in-memory table data) and limit_bytes
+        """
+        with self.query_pool.cursor() as cursor:
+            used, spilled, tables = cursor.execute("""
+                SELECT
+                    COALESCE(SUM(memory_usage_bytes), 0),
+                    COALESCE(SUM(temporary_storage_bytes), 0),
+                    COALESCE(SUM(memory_usage_bytes) FILTER (WHERE tag = 'IN_MEMORY_TABLE'), 0)
+                FROM duckdb_memory()
+            """).fetchone()
+        return {
+            "used_bytes": int(used),
+            "spilled_bytes": int(spilled),
+            "table_bytes": int(tables),
+            "limit_bytes": self.memory_limit,
+        }
+
+    def describe_table(self, table_name: str) -> List[Dict[str, Any]]:
+        """
+        Get the columns of a table without profiling it
+
+        Args:
+            table_name: Name of the table or session view
+
+        Returns:
+            List of column dicts with name, type and nullability
+        """
+        with self.query_pool.cursor() as cursor:
+            return describe_table(cursor, table_name)
+
+    def schema_snapshot(self, table_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Columns of a set of tables, served from the schema cache
+
+        Only tables changed since the last snapshot are described again,
+        so the cost depends on the tables in scope, not on the catalog size.
+
+        Args:
+            table_names: Tables in scope, e.g. those a session owns. None
+                means every table and session view, without the physical
+                tables of the table cache.
+
+        Returns:
+            Dictionary with the catalog version and the columns per table
+        """
+        if table_names is None:
+            table_names = self.schema_cache.tables(self._visible_tables)
+        return self.schema_cache.snapshot(table_names, self.describe_table)
+
+    def _visible_tables(self) -> List[str]:
+        """Tables and session views users query by name"""
+        with self._cache_lock:
+            hidden = set(self.table_cache.physical_tables())
+        return [
+            table_name for table_name in self.get_table_list()
+            if table_name not in hidden and not table_name.startswith(STAGING_PREFIX)
+        ]
+
     def get_table_list(self) -> list:
         """
         Get list of all tables in the database
@@ -188,7 +1235,8 @@ class DuckDBManager:
         Returns:
             List of table names
         """
-        tables = self.connection.execute("SHOW TABLES").fetchall()
+        with self.query_pool.cursor() as cursor:
+            tables = cursor.execute("SHOW TABLES").fetchall()
         return [table[0] for table in tables]
 
     def drop_table(self, table_name: str):
@@ -199,12 +1247,109 @@ class DuckDBManager:
             table_name: Name of the table to drop
         """
         try:
-            self.connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+            self._table_changed(table_name)
+            with self.query_pool.cursor() as cursor:
+                with self._cache_lock:
+                    if self.table_cache.is_view(table_name):
+                        # Drop the session view; the shared table goes with its last view
+                        cursor.execute(f"DROP VIEW IF EXISTS {quote_identifier(table_name)}")
+                        content_key = self.table_cache.view_key(table_name)
+                        physical_table = self.table_cache.release(table_name)
+                        self._sync_index(content_key)
+                        if physical_table:
+                            cursor.execute(f"DROP TABLE IF EXISTS {physical_table}")
+                            self._table_changed(physical_table)
+                        return
+
+                cursor.execute(f"DROP TABLE IF EXISTS {quote_identifier(table_name)}")
         except Exception as e:
             raise Exception(f"Failed to drop table: {str(e)}")
 
+    def dataset_key(self, view_name: str) -> Optional[str]:
+        """
+        Content key of the dataset behind a view
+
+        Views on the same key share one physical table, so the memory
+        budget charges the key once.
+
+        Returns:
+            Content key, or None if the name is not a view of the table cache
+        """
+        with self._cache_lock:
+            return self.table_cache.view_key(view_name)
+
+    def catalog_tables(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Tables of the shared catalog
+
+        Only tables ingested with ingest_catalog_table are listed; session
+        views and the physical tables behind them are not.
+
+        Returns:
+            table_name -> record with file_size, the size of the ingested file
+        """
+        with self._catalog_lock:
+            tables = dict(self._catalog_tables)
+        with self._cache_lock:
+            return {name: record for name, record in tables.items() if self.table_cache.is_view(name)}
+
+    def ingest_catalog_table(
+        self,
+        file_path: str,
+        table_name: str,
+        connection: Optional[duckdb.DuckDBPyConnection] = None
+    ) -> Dict[str, Any]:
+        """
+        Ingest a file into the shared catalog under a given name
+
+        Re-ingesting a catalog table replaces it. Ownership is written
+        through to the catalog index, so it survives a restart.
+
+        Args:
+            file_path: Path to the file, see ingest_file
+            table_name: Name to query the table by
+            connection: Cursor to run on. Defaults to the shared connection.
+
+        Returns:
+            Table metadata
+
+        Raises:
+            ValueError: If a session view or another table has the name
+        """
+        if table_name not in self.catalog_tables() and table_name in self.get_table_list():
+            raise ValueError(f"Table {table_name} already exists")
+        metadata = self.ingest_file(file_path, table_name, connection)
+
+        record = {"file_size": os.path.getsize(file_path)}
+        with self._catalog_lock:
+            self._catalog_tables[table_name] = record
+            if self.catalog is not None:
+                self.catalog.save_catalog_table(table_name, record)
+        return metadata
+
+    def drop_catalog_table(self, table_name: str):
+        """
+        Drop a table of the shared catalog
+
+        Args:
+            table_name: Table ingested with ingest_catalog_table
+
+        Raises:
+            KeyError: If the table is not in the shared catalog
+        """
+        if table_name not in self.catalog_tables():
+            raise KeyError(table_name)
+        self.drop_table(table_name)
+        with self._catalog_lock:
+            self._catalog_tables.pop(table_name, None)
+            if self.catalog is not None:
+                self.catalog.remove_catalog_table(table_name)
+
     def close(self):
         """Close the database connection"""
+        self.query_pool.close()
+        if self.catalog is not None:
+            self.catalog.close()
         if self.connection:
             self.connection.close()
 
@@ -217,6 +1362,5 @@ class DuckDBManager:
         self.close()
 
 
-# Global database manager instance
-# Using in-memory database for now, can be changed to persistent file
-db_manager = DuckDBManager()
+# Global database manager instance, persistent when DRAWDASH_DB_PATH is set
+db_manager = DuckDBManager(DB_PATH)
@@ -1,6 +1,10 @@
 """API Client for communicating with DrawDash backend"""
 
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+import pyarrow as pa
 from typing import Optional, Dict, Any
 import streamlit as st
 
@@ -8,6 +12,14 @@ import streamlit as st
 API_BASE_URL = "http://localhost:8080"
 ADK_API_BASE_URL = "http://localhost:8000"
 
+# Datasets above this size go through the chunked upload endpoints
+INLINE_UPLOAD_LIMIT = 10 * 1024 * 1024
+
+# Bytes per part, parts sent concurrently, and passes over missing parts
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_WORKERS = 4
+UPLOAD_RETRIES = 3
+
 
 class APIClient:
     """Client for DrawDash backend API"""
@@ -38,9 +50,18 @@ class APIClient:
         # Reset file pointers to beginning
         screenshot_file.seek(0)
 
+        # Large datasets are uploaded in chunks first and referenced by ID
+        upload_ids = [
+            self.upload_chunked(dataset_file)
+            for dataset_file in dataset_files
+            if dataset_file.size > INLINE_UPLOAD_LIMIT
+        ]
+
         # Prepare multipart form data with multiple dataset files
         files = []
         for dataset_file in dataset_files:
+            if dataset_file.size > INLINE_UPLOAD_LIMIT:
+                continue
             dataset_file.seek(0)
             files.append(('datasets', (dataset_file.name, dataset_file, dataset_file.type)))
 
@@ -50,14 +71,224 @@ class APIClient:
         data = {}
         if clarification:
             data['clarification'] = clarification
+        if upload_ids:
+            data['upload_ids'] = upload_ids
 
         try:
-            response = requests.post(url, files=files, data=data, timeout=60)
+            # Ingesting multi-GB uploads takes longer than a form post
+            response = requests.post(url, files=files, data=data, timeout=600 if upload_ids else 60)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to ingest data: {str(e)}")
 
+    def upload_chunked(
+        self,
+        file,
+        upload_id: Optional[str] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        workers: int = UPLOAD_WORKERS,
+        retries: int = UPLOAD_RETRIES
+    ) -> str:
+        """
+        Upload a large file as parallel, checksummed parts
+
+        Only one part per worker is read into memory at a time. Failed
+        parts are retried by asking the backend which parts are still
+        missing, so passing the upload_id of an interrupted upload resumes
+        it instead of starting over.
+
+        Args:
+            file: File-like object with name and size, e.g. an UploadedFile
+            upload_id: Upload to resume. A new upload is started if None.
+            chunk_size: Bytes per part for a new upload
+            workers: Parts sent concurrently
+            retries: Extra passes over parts that failed
+
+        Returns:
+            ID of the completed upload, for ingest_data
+        """
+        url = f"{self.base_url}/api/uploads"
+        read_lock = threading.Lock()
+
+        try:
+            if upload_id is None:
+                response = requests.post(
+                    url,
+                    json={"filename": file.name, "size": file.size, "chunk_size": chunk_size},
+                    timeout=30
+                )
+            else:
+                response = requests.get(f"{url}/{upload_id}", timeout=30)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to start upload: {str(e)}")
+
+        status = response.json()
+        upload_id = status["upload_id"]
+        part_size = status["chunk_size"]
+
+        def send_part(part_number: int):
+            with read_lock:
+                file.seek(part_number * part_size)
+                data = file.read(part_size)
+            try:
+                requests.put(
+                    f"{url}/{upload_id}/parts/{part_number}",
+                    data=data,
+                    headers={"X-Chunk-SHA256": hashlib.sha256(data).hexdigest()},
+                    timeout=120
+                ).raise_for_status()
+            except requests.exceptions.RequestException:
+                # Left in "missing" and sent again on the next pass
+                pass
+
+        for _ in range(retries + 1):
+            if not status["missing"]:
+                break
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(send_part, status["missing"]))
+            try:
+                response = requests.get(f"{url}/{upload_id}", timeout=30)
+                response.raise_for_status()
+                status = response.json()
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"Failed to check upload {upload_id}: {str(e)}")
+
+        if status["missing"]:
+            raise Exception(
+                f"Failed to upload {file.name}: {len(status['missing'])} part(s) missing, "
+                f"resume with upload_id={upload_id}"
+            )
+
+        try:
+            response = requests.post(f"{url}/{upload_id}/complete", json={}, timeout=120)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to complete upload: {str(e)}")
+        return upload_id
+
+    def get_session_metadata(self, session_id: str, wait: float = 0.0) -> Dict[str, Any]:
+        """
+        Get a session's table metadata, including column stats once computed
+
+        Args:
+            session_id: Session identifier
+            wait: Seconds the backend may hold the request while stats are pending
+
+        Returns:
+            Response dict with tables, stats_status and errors
+        """
+        url = f"{self.base_url}/api/session/{session_id}/metadata"
+
+        try:
+            response = requests.get(url, params={"wait": wait}, timeout=wait + 30)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to get session metadata: {str(e)}")
+
+    def run_query(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        query_id: Optional[str] = None
+    ) -> pa.Table:
+        """
+        Run a SQL query on the backend and read the Arrow IPC result stream
+
+        Args:
+            query: SQL query string
+            session_id: Session the query counts against
+            query_id: Id under which cancel_query can stop the query
+
+        Returns:
+            Arrow table with results; call .to_pandas() for plotting
+        """
+        url = f"{self.base_url}/api/query"
+
+        try:
+            response = requests.post(
+                url,
+                json={"query": query, "format": "arrow", "session_id": session_id, "query_id": query_id},
+                stream=True,
+                timeout=60
+            )
+            response.raise_for_status()
+            with pa.ipc.open_stream(response.raw) as reader:
+                return reader.read_all()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to run query: {str(e)}")
+
+    def prepare_statement(self, session_id: str, name: str, query: str) -> Dict[str, Any]:
+        """
+        Register a named query template with $name parameters
+
+        Args:
+            session_id: Session identifier
+            name: Statement name
+            query: A single SELECT statement, e.g. ... WHERE year = $year
+
+        Returns:
+            Statement name and its parameter names
+        """
+        url = f"{self.base_url}/api/session/{session_id}/statements"
+
+        try:
+            response = requests.post(url, json={"name": name, "query": query}, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to prepare statement: {str(e)}")
+
+    def execute_statement(self, session_id: str, name: str, params: Dict[str, Any]) -> pa.Table:
+        """
+        Execute a prepared statement with new parameter values
+
+        Args:
+            session_id: Session identifier
+            name: Statement name passed to prepare_statement
+            params: Value per parameter name
+
+        Returns:
+            Arrow table with results
+        """
+        url = f"{self.base_url}/api/session/{session_id}/statements/{name}/execute"
+
+        try:
+            response = requests.post(
+                url,
+                json={"params": params, "format": "arrow"},
+                stream=True,
+                timeout=60
+            )
+            response.raise_for_status()
+            with pa.ipc.open_stream(response.raw) as reader:
+                return reader.read_all()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to execute statement: {str(e)}")
+
+    def cancel_query(self, query_id: str) -> bool:
+        """
+        Cancel a query started with run_query
+
+        Args:
+            query_id: Id passed to run_query
+
+        Returns:
+            True if the query was still running
+        """
+        url = f"{self.base_url}/api/queries/{query_id}"
+
+        try:
+            response = requests.delete(url, timeout=10)
+            if response.status_code == 404:
+                return False
+            response.raise_for_status()
+            return True
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to cancel query: {str(e)}")
+
     def analyze_screenshot(self, session_id: str) -> Dict[str, Any]:
         """
         Analyze screenshot using Vision Agent
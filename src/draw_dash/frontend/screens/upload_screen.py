@@ -27,7 +27,7 @@ def render():
     with col2:
         # Dataset Upload (Required)
         st.markdown("### 1. Dataset Upload <span class='required-star'>*</span>", unsafe_allow_html=True)
-        st.markdown("Upload your data files (CSV, JSON, or Parquet) - Max 10MB per file")
+        st.markdown("Upload your data files (CSV, JSON, or Parquet; CSV/JSON may be .gz or .zst). Files over 10MB are sent in chunks")
 
         # Initialize accumulated files list if not exists
         if "accumulated_dataset_files" not in st.session_state:
@@ -36,22 +36,16 @@ def render():
         # Try native multiple file upload first
         dataset_files_uploaded = st.file_uploader(
             "Choose dataset files",
-            type=["csv", "json", "parquet"],
+            type=["csv", "json", "parquet", "gz", "zst"],
             key="dataset_uploader",
-            help="Select multiple files (Ctrl+Click or Cmd+Click). Max 10MB per file",
+            help="Select multiple files (Ctrl+Click or Cmd+Click). Large files are uploaded in resumable chunks",
             label_visibility="collapsed",
             accept_multiple_files=True
         )
 
-        # Validate file sizes (10MB = 10 * 1024 * 1024 bytes)
-        MAX_FILE_SIZE = 10 * 1024 * 1024
+        # Files over the inline limit go through the chunked upload API
         if dataset_files_uploaded:
-            valid_files = []
-            for file in dataset_files_uploaded:
-                if file.size > MAX_FILE_SIZE:
-                    st.error(f"❌ {file.name} exceeds 10MB limit ({file.size / (1024 * 1024):.2f} MB)")
-                else:
-                    valid_files.append(file)
+            valid_files = list(dataset_files_uploaded)
 
             if valid_files:
                 st.session_state.dataset_files = valid_files
@@ -188,6 +182,7 @@ def render_progress_bar():
                 st.session_state.metadata = response["tables"]  # List of table metadata
                 st.session_state.table_names = [table["table_name"] for table in response["tables"]]
                 st.session_state.screenshot_info = response["screenshot_info"]
+                st.session_state.stats_status = response.get("stats_status", "ready")
             except Exception as e:
                 st.session_state.upload_status = "error"
                 st.session_state.upload_error = str(e)
@@ -202,6 +197,12 @@ def render_progress_bar():
         # Make API call at progress 70
         if progress == 70:
             try:
+                # Column stats are computed after ingest returns; pick them up
+                if st.session_state.get("stats_status") == "pending":
+                    metadata = api_client.get_session_metadata(st.session_state.session_id, wait=10)
+                    st.session_state.metadata = metadata["tables"]
+                    st.session_state.stats_status = metadata["stats_status"]
+
                 response = api_client.analyze_screenshot(st.session_state.session_id)
                 st.session_state.agent_understanding = response
             except Exception as e:
@@ -41,6 +41,9 @@ def init_session_state():
     if "metadata" not in st.session_state:
         st.session_state.metadata = None
 
+    if "stats_status" not in st.session_state:
+        st.session_state.stats_status = None
+
     # Chat screen state
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
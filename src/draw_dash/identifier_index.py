@@ -0,0 +1,173 @@
+"""
+Identifier index for DrawDash
+Ranks table and column names by similarity to a misspelled name
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, Any, Optional, List, Set, Tuple
+
+# Entries sharing the most trigrams with a name that are scored by edit distance
+SHORTLIST_SIZE = 20
+
+# Candidates scoring lower than this are not suggested
+MIN_SIMILARITY = 0.3
+
+# (kind, table, name) with kind "table" or "column"; table is lower case
+_Entry = Tuple[str, str, str]
+
+
+def normalize_identifier(name: str) -> str:
+    """Spelling-insensitive form of an identifier: CreditLimit, credit limit and CREDIT_LIMIT match"""
+    return re.sub(r"[^0-9a-z]", "", name.lower())
+
+
+def trigrams(name: str) -> Set[str]:
+    """Trigrams of a normalized identifier, padded so short names and word edges count"""
+    padded = f"$${normalize_identifier(name)}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def similarity(name: str, candidate: str) -> float:
+    """
+    Similarity of two identifiers between 0 and 1
+
+    The mean of the trigram Dice coefficient, which tolerates reordered
+    words, and the normalized edit distance, which tolerates typos.
+    """
+    a, b = normalize_identifier(name), normalize_identifier(candidate)
+    if a == b:
+        return 1.0
+    grams_a, grams_b = trigrams(name), trigrams(candidate)
+    dice = 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+    edit = 1 - edit_distance(a, b) / max(len(a), len(b), 1)
+    return (dice + edit) / 2
+
+
+class IdentifierIndex:
+    """
+    Trigram index over the table and column names of the catalog
+
+    Tables are added when they are ingested and removed when they change
+    or are dropped. A lookup only scores the names sharing the most
+    trigrams with the misspelled one, so its cost depends on the
+    identifiers in scope that look alike, not on the size of the catalog.
+    """
+
+    def __init__(self, shortlist_size: int = SHORTLIST_SIZE):
+        """
+        Initialize an empty index
+
+        Args:
+            shortlist_size: Entries scored by edit distance per lookup
+        """
+        self.shortlist_size = shortlist_size
+
+        self._postings: Dict[str, Set[_Entry]] = {}
+        self._tables: Dict[str, List[_Entry]] = {}  # table -> its entries
+        self._lock = threading.Lock()
+
+    def __contains__(self, table_name: str) -> bool:
+        with self._lock:
+            return table_name.lower() in self._tables
+
+    def add_table(self, table_name: str, columns: List[str]):
+        """
+        Index a table and its columns, replacing what was indexed for it
+
+        Args:
+            table_name: Table or session view name
+            columns: Its column names
+        """
+        table = table_name.lower()
+        entries = [("table", table, table_name)] + [("column", table, column) for column in columns]
+        with self._lock:
+            self._remove_locked(table)
+            self._tables[table] = entries
+            for entry in entries:
+                for gram in trigrams(entry[2]):
+                    self._postings.setdefault(gram, set()).add(entry)
+
+    def remove_table(self, table_name: str):
+        """Forget a dropped or changed table"""
+        with self._lock:
+            self._remove_locked(table_name.lower())
+
+    def _remove_locked(self, table: str):
+        """Remove a table's entries. Caller holds the lock."""
+        for entry in self._tables.pop(table, []):
+            for gram in trigrams(entry[2]):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(entry)
+                    if not posting:
+                        del self._postings[gram]
+
+    def clear(self):
+        """Forget every table, e.g. after arbitrary DDL"""
+        with self._lock:
+            self._postings.clear()
+            self._tables.clear()
+
+    def candidates(
+        self,
+        name: str,
+        kind: str = "column",
+        table_names: Optional[List[str]] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Identifiers most similar to a name, best first
+
+        Args:
+            name: The name that was not found
+            kind: "column" or "table"
+            table_names: Tables in scope; every indexed table if None
+            limit: Maximum number of candidates
+
+        Returns:
+            Candidates with their name, the table they belong to and a
+            similarity score between MIN_SIMILARITY and 1
+        """
+        scope = {table.lower() for table in table_names} if table_names is not None else None
+        overlap: Counter = Counter()
+        with self._lock:
+            for gram in trigrams(name):
+                for entry in self._postings.get(gram, ()):
+                    if entry[0] == kind and (scope is None or entry[1] in scope):
+                        overlap[entry] += 1
+        shortlist = [entry for entry, _ in overlap.most_common(self.shortlist_size)]
+
+        scored = ({"name": entry[2], "table": entry[1], "score": round(similarity(name, entry[2]), 3)} for entry in shortlist)
+        ranked = sorted(
+            (candidate for candidate in scored if candidate["score"] >= MIN_SIMILARITY),
+            key=lambda candidate: (-candidate["score"], candidate["name"])
+        )
+        return ranked[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        """Tables, identifiers and distinct trigrams indexed"""
+        with self._lock:
+            return {
+                "tables": len(self._tables),
+                "identifiers": sum(len(entries) for entries in self._tables.values()),
+                "trigrams": len(self._postings),
+            }
@@ -0,0 +1,211 @@
+"""
+Incremental statistics for DrawDash
+Mergeable column stats and HyperLogLog sketches for appended data
+"""
+
+import math
+from typing import Dict, Any, List
+
+from draw_dash.profiling import (
+    quote_identifier,
+    is_numeric_type,
+    is_text_type,
+    APPROX_CONFIDENCE,
+    _APPROX_Z,
+)
+
+# HyperLogLog registers per column sketch (2^10)
+HLL_PRECISION = 10
+HLL_REGISTERS = 1 << HLL_PRECISION
+
+# Relative standard error of a distinct count estimated from the sketch
+SKETCH_RELATIVE_STD_ERROR = 1.04 / math.sqrt(HLL_REGISTERS)
+
+# Bits of the 64-bit hash left after the register index
+_RANK_BITS = 64 - HLL_PRECISION
+
+
+def _profiled_columns(columns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Columns that get stats, see profiling._column_aggregates"""
+    return [col for col in columns if is_numeric_type(col["type"]) or is_text_type(col["type"])]
+
+
+def column_sketches(connection, table_name: str, columns: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """
+    Build a HyperLogLog sketch of every profiled column in one scan
+
+    Each non-null value is hashed with DuckDB's hash(); the low bits pick a
+    register and the register keeps the highest rank (leading zeros + 1) of
+    the remaining bits seen. Sketches of two tables merge by taking the
+    register-wise maximum.
+
+    Args:
+        connection: DuckDB connection or cursor
+        table_name: Name of the table
+        columns: Column list as returned by describe_table
+
+    Returns:
+        Mapping of column name to its list of HLL_REGISTERS register values
+    """
+    profiled = _profiled_columns(columns)
+    if not profiled:
+        return {}
+
+    hashes = ", ".join(
+        f"CASE WHEN {quote_identifier(col['name'])} IS NULL THEN NULL "
+        f"ELSE hash({quote_identifier(col['name'])}) END"
+        for col in profiled
+    )
+    rows = connection.execute(f"""
+        SELECT
+            col_id,
+            (h & {HLL_REGISTERS - 1})::INTEGER AS register,
+            MAX(CASE WHEN h >> {HLL_PRECISION} = 0 THEN {_RANK_BITS + 1}
+                ELSE {_RANK_BITS} - FLOOR(LOG2((h >> {HLL_PRECISION})::DOUBLE))::INTEGER END) AS rank
+        FROM (
+            SELECT unnest(range({len(profiled)})) AS col_id, unnest([{hashes}]) AS h
+            FROM {quote_identifier(table_name)}
+        )
+        WHERE h IS NOT NULL
+        GROUP BY ALL
+    """).fetchall()
+
+    sketches = {col["name"]: [0] * HLL_REGISTERS for col in profiled}
+    for col_id, register, rank in rows:
+        sketches[profiled[col_id]["name"]][register] = int(rank)
+    return sketches
+
+
+def merge_sketches(left: List[int], right: List[int]) -> List[int]:
+    """Union of two HyperLogLog sketches"""
+    return [max(a, b) for a, b in zip(left, right)]
+
+
+def hll_estimate(registers: List[int]) -> float:
+    """
+    Distinct count estimated from a HyperLogLog sketch
+
+    Uses linear counting while registers are still empty, which is more
+    accurate than the raw estimate for small cardinalities. A 64-bit hash
+    needs no large-range correction.
+    """
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / sum(2.0 ** -r for r in registers)
+    zeros = registers.count(0)
+    if raw <= 2.5 * m and zeros:
+        return m * math.log(m / zeros)
+    return raw
+
+
+def delta_aggregates(connection, table_name: str, columns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Mergeable aggregates of a table in one scan
+
+    Args:
+        connection: DuckDB connection or cursor
+        table_name: Name of the table, usually the staged delta
+        columns: Column list as returned by describe_table
+
+    Returns:
+        Dict with row_count and per-column min/max/sum/count (numeric) or
+        count (text)
+    """
+    select_list = ["COUNT(*)"]
+    layout = []
+    for col in _profiled_columns(columns):
+        ident = quote_identifier(col["name"])
+        if is_numeric_type(col["type"]):
+            aggregates = [f"MIN({ident})", f"MAX({ident})", f"SUM({ident})", f"COUNT({ident})"]
+        else:
+            aggregates = [f"COUNT({ident})"]
+        layout.append((col, len(select_list), len(aggregates)))
+        select_list.extend(aggregates)
+
+    row = connection.execute(f"SELECT {', '.join(select_list)} FROM {quote_identifier(table_name)}").fetchone()
+
+    column_aggregates = {}
+    for col, offset, width in layout:
+        values = row[offset:offset + width]
+        if width == 4:
+            min_value, max_value, sum_value, count = values
+            column_aggregates[col["name"]] = {
+                "min": float(min_value) if min_value is not None else None,
+                "max": float(max_value) if max_value is not None else None,
+                "sum": float(sum_value) if sum_value is not None else 0.0,
+                "count": int(count),
+            }
+        else:
+            column_aggregates[col["name"]] = {"count": int(values[0])}
+
+    return {"row_count": row[0], "columns": column_aggregates}
+
+
+def _merge_extreme(a, b, pick):
+    """min/max that ignores a missing side"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return pick(a, b)
+
+
+def merge_column_stats(
+    metadata: Dict[str, Any],
+    delta: Dict[str, Any],
+    sketches: Dict[str, List[int]]
+) -> Dict[str, Any]:
+    """
+    Fold the aggregates of appended rows into a table's profiled metadata
+
+    min/max/null counts and averages merge exactly. Distinct counts come
+    from the merged sketches and are marked approximate. Sample quantiles
+    cannot be merged and are dropped until the table is profiled again.
+
+    Args:
+        metadata: Profiled metadata of the table before the append
+        delta: Result of delta_aggregates on the appended rows
+        sketches: Merged sketches of the table after the append
+
+    Returns:
+        New metadata dict; the input is not modified
+    """
+    old_rows = metadata["row_count"]
+    row_count = old_rows + delta["row_count"]
+    distinct_error = round(_APPROX_Z * SKETCH_RELATIVE_STD_ERROR, 4)
+
+    column_stats = {}
+    for name, old in metadata.get("column_stats", {}).items():
+        added = delta["columns"].get(name)
+        if added is None:
+            continue
+
+        old_non_null = old_rows - old["null_count"]
+        non_null = old_non_null + added["count"]
+        stats = {}
+
+        if "min" in added:
+            old_sum = (old["avg"] or 0.0) * old_non_null
+            stats["min"] = _merge_extreme(old["min"], added["min"], min)
+            stats["max"] = _merge_extreme(old["max"], added["max"], max)
+            stats["avg"] = (old_sum + added["sum"]) / non_null if non_null else None
+
+        distinct = hll_estimate(sketches[name]) if name in sketches else None
+        stats["distinct_count"] = min(int(round(distinct)), non_null) if distinct is not None else None
+        stats["null_count"] = row_count - non_null
+        stats["approximate"] = ["distinct_count"]
+        stats["error_bounds"] = {"distinct_count": distinct_error}
+        column_stats[name] = stats
+
+    previous = metadata.get("profile", {})
+    return {
+        **metadata,
+        "row_count": row_count,
+        "column_stats": column_stats,
+        "profile": {
+            "mode": "incremental",
+            "base_mode": previous.get("base_mode", previous.get("mode")),
+            "appends": previous.get("appends", 0) + 1,
+            "confidence": APPROX_CONFIDENCE,
+        },
+    }
@@ -0,0 +1,339 @@
+"""
+Memory budgets for DrawDash
+Accounts DuckDB memory per session and admits uploads that fit the budget
+"""
+
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Optional
+
+_MB = 1024 * 1024
+
+
+def env_megabytes(name: str, default_mb: int) -> Optional[int]:
+    """
+    Read a size in megabytes from the environment
+
+    Args:
+        name: Environment variable name
+        default_mb: Value used when the variable is unset
+
+    Returns:
+        Size in bytes, or None when the value is 0 (no limit)
+    """
+    megabytes = int(os.environ.get(name, default_mb))
+    return megabytes * _MB if megabytes > 0 else None
+
+
+# DuckDB buffer pool limit, and the total budget shared by all sessions.
+# DuckDB spills to SPILL_DIRECTORY rather than grow past it.
+MEMORY_LIMIT_BYTES = env_megabytes("DRAWDASH_MEMORY_LIMIT_MB", 2048)
+
+# Budget of a single session
+SESSION_MEMORY_BYTES = env_megabytes("DRAWDASH_SESSION_MEMORY_MB", 512)
+
+# Where DuckDB writes spilled blocks of large ingests, joins and aggregations
+SPILL_DIRECTORY = os.environ.get(
+    "DRAWDASH_SPILL_DIR",
+    os.path.join(tempfile.gettempdir(), "drawdash", "spill")
+)
+
+# In-memory size of a table relative to the uploaded bytes
+INGEST_EXPANSION = float(os.environ.get("DRAWDASH_INGEST_EXPANSION", "2.0"))
+
+# Resident bytes charged for a dataset ingested from a file on disk while
+# DuckDB can spill: blocks past the buffer pool live in SPILL_DIRECTORY, so
+# a multi-GB chunked upload holds about this much memory, not its full size
+SPILLED_INGEST_BYTES = env_megabytes("DRAWDASH_SPILLED_INGEST_MB", 128)
+
+# Seconds an upload waits for other sessions to free memory before it is rejected
+ADMISSION_TIMEOUT = float(os.environ.get("DRAWDASH_ADMISSION_TIMEOUT", "10"))
+
+
+class MemoryBudgetExceeded(Exception):
+    """Raised when an upload does not fit the session or global budget"""
+
+    def __init__(self, message: str, session_limit: bool):
+        """
+        Args:
+            message: Error message
+            session_limit: True if the session budget was hit, False if the
+                global budget was still full after waiting
+        """
+        super().__init__(message)
+        self.session_limit = session_limit
+
+
+class MemoryBudget:
+    """
+    Per-session accounting of the memory held by ingested tables
+
+    Uploads are admitted with an estimate of their in-memory size before
+    DuckDB reads them. Datasets read from disk while DuckDB can spill are
+    charged at most their resident share, so uploads far larger than the
+    session budget are admitted. The estimate is held as a reservation while the
+    ingest runs, then charged per table. Tables are bound to the dataset
+    holding their rows, e.g. the table cache's content key, and a dataset
+    is charged once however many sessions reference it: to the session
+    that brought it in, or the next one holding it once that session lets
+    go. A table that hits a dataset already held is charged nothing, and
+    the dataset's bytes are freed when its last table is released.
+
+    An upload larger than the session budget is rejected outright. One that
+    only exceeds the global budget waits for other sessions to release
+    memory, and is rejected if none is freed within the timeout.
+    """
+
+    def __init__(
+        self,
+        global_limit: Optional[int] = MEMORY_LIMIT_BYTES,
+        session_limit: Optional[int] = SESSION_MEMORY_BYTES,
+        expansion: float = INGEST_EXPANSION,
+        spilled_ingest: Optional[int] = SPILLED_INGEST_BYTES
+    ):
+        """
+        Initialize the budget
+
+        Args:
+            global_limit: Bytes all sessions may hold together. None disables.
+            session_limit: Bytes one session may hold. None disables.
+            expansion: Estimated in-memory bytes per uploaded byte
+            spilled_ingest: Bytes charged at most for a spillable ingest.
+                None charges spillable ingests like any other.
+        """
+        self.global_limit = global_limit
+        self.session_limit = session_limit
+        self.expansion = expansion
+        self.spilled_ingest = spilled_ingest
+
+        self._datasets: Dict[str, Dict[str, Any]] = {}  # dataset key -> bytes, holders
+        self._bound: Dict[str, Dict[str, str]] = {}  # session -> table -> dataset key
+        self._reserved: Dict[str, int] = {}  # session -> bytes of running ingests
+        self._condition = threading.Condition()
+
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = 0
+
+    def estimate(self, upload_bytes: int, spillable: bool = False) -> int:
+        """
+        In-memory bytes expected for an upload of the given size
+
+        Args:
+            upload_bytes: Size of the uploaded file
+            spillable: Whether DuckDB reads it from disk with spilling
+                enabled, so only part of the table stays resident
+        """
+        estimate = int(upload_bytes * self.expansion)
+        if spillable and self.spilled_ingest is not None:
+            return min(estimate, self.spilled_ingest)
+        return estimate
+
+    def _table_bytes(self, session_id: str, table_name: str) -> int:
+        """Bytes a session is charged for one table. Caller holds the lock."""
+        dataset = self._datasets[self._bound[session_id][table_name]]
+        return dataset["bytes"] if dataset["holders"][0] == (session_id, table_name) else 0
+
+    def _charged(self, session_id: str) -> Dict[str, int]:
+        """Bytes charged per table of a session. Caller holds the lock."""
+        return {
+            table_name: self._table_bytes(session_id, table_name)
+            for table_name in self._bound.get(session_id, {})
+        }
+
+    def _session_bytes(self, session_id: str) -> int:
+        """Charged plus reserved bytes of a session. Caller holds the lock."""
+        return sum(self._charged(session_id).values()) + self._reserved.get(session_id, 0)
+
+    def _total_bytes(self) -> int:
+        """Bytes of all datasets plus reservations. Caller holds the lock."""
+        charged = sum(dataset["bytes"] for dataset in self._datasets.values())
+        return charged + sum(self._reserved.values())
+
+    def admit(self, session_id: str, nbytes: int, timeout: float = ADMISSION_TIMEOUT):
+        """
+        Reserve memory for an ingest, waiting for room if needed
+
+        Args:
+            session_id: Session the upload belongs to
+            nbytes: Estimated in-memory bytes, see estimate
+            timeout: Seconds to wait for the global budget
+
+        Raises:
+            MemoryBudgetExceeded: If the upload does not fit
+        """
+        with self._condition:
+            if self.session_limit is not None and self._session_bytes(session_id) + nbytes > self.session_limit:
+                self._rejected += 1
+                raise MemoryBudgetExceeded(
+                    f"Upload needs ~{nbytes / _MB:.1f} MB but the session budget is "
+                    f"{self.session_limit / _MB:.0f} MB "
+                    f"({self._session_bytes(session_id) / _MB:.1f} MB in use)",
+                    session_limit=True
+                )
+
+            deadline = time.monotonic() + timeout
+            queued = False
+            while self.global_limit is not None and self._total_bytes() + nbytes > self.global_limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._rejected += 1
+                    raise MemoryBudgetExceeded(
+                        f"Server memory budget of {self.global_limit / _MB:.0f} MB is full, "
+                        f"retry later",
+                        session_limit=False
+                    )
+                if not queued:
+                    queued = True
+                    self._queued += 1
+                self._condition.wait(remaining)
+
+            self._reserved[session_id] = self._reserved.get(session_id, 0) + nbytes
+            self._admitted += 1
+
+    def commit(
+        self,
+        session_id: str,
+        reserved: int,
+        tables: Dict[str, int],
+        datasets: Optional[Dict[str, str]] = None
+    ):
+        """
+        Turn a reservation into per-table charges once the ingest finished
+
+        A table bound to a dataset that is already held is charged nothing.
+        A table committed again, e.g. after an append, is rebound and its
+        previous dataset released.
+
+        Args:
+            session_id: Session passed to admit
+            reserved: Bytes passed to admit
+            tables: Bytes to charge per ingested table; failed files are left out
+            datasets: Dataset key per table, e.g. its table cache content
+                key. Tables without one are charged on their own.
+        """
+        datasets = datasets or {}
+        with self._condition:
+            self._unreserve(session_id, reserved)
+            for table_name, nbytes in tables.items():
+                self._unbind(session_id, table_name)
+                key = datasets.get(table_name) or f"session:{session_id}:{table_name}"
+                dataset = self._datasets.setdefault(key, {"bytes": nbytes, "holders": []})
+                dataset["holders"].append((session_id, table_name))
+                self._bound.setdefault(session_id, {})[table_name] = key
+            self._condition.notify_all()
+
+    def cancel(self, session_id: str, reserved: int):
+        """Give back a reservation whose ingest failed"""
+        with self._condition:
+            self._unreserve(session_id, reserved)
+            self._condition.notify_all()
+
+    def _unreserve(self, session_id: str, reserved: int):
+        """Subtract from a reservation. Caller holds the lock."""
+        remaining = self._reserved.get(session_id, 0) - reserved
+        if remaining > 0:
+            self._reserved[session_id] = remaining
+        else:
+            self._reserved.pop(session_id, None)
+
+    def _unbind(self, session_id: str, table_name: str) -> int:
+        """
+        Drop a table's hold on its dataset. Caller holds the lock.
+
+        Returns:
+            Bytes freed, nonzero only if this was the dataset's last table
+        """
+        tables = self._bound.get(session_id, {})
+        key = tables.pop(table_name, None)
+        if not tables:
+            self._bound.pop(session_id, None)
+        if key is None:
+            return 0
+
+        dataset = self._datasets[key]
+        dataset["holders"].remove((session_id, table_name))
+        if dataset["holders"]:
+            return 0
+        del self._datasets[key]
+        return dataset["bytes"]
+
+    def dataset_bytes(self, session_id: str, table_name: str) -> int:
+        """Bytes of the dataset a table is bound to, whoever is charged for it"""
+        with self._condition:
+            key = self._bound.get(session_id, {}).get(table_name)
+            return self._datasets[key]["bytes"] if key is not None else 0
+
+    def release_table(self, session_id: str, table_name: str) -> int:
+        """
+        Stop charging a session for a dropped table
+
+        Returns:
+            Bytes freed; a dataset other sessions still hold frees none
+        """
+        with self._condition:
+            released = self._unbind(session_id, table_name)
+            self._condition.notify_all()
+            return released
+
+    def release_session(self, session_id: str) -> int:
+        """
+        Stop charging a session for all of its tables
+
+        Returns:
+            Bytes freed; datasets other sessions still hold free none
+        """
+        with self._condition:
+            released = sum(
+                self._unbind(session_id, table_name)
+                for table_name in list(self._bound.get(session_id, {}))
+            )
+            self._condition.notify_all()
+            return released
+
+    def usage(self, session_id: str) -> Dict[str, Any]:
+        """
+        Memory accounted to one session
+
+        Returns:
+            Dictionary with bytes, reserved_bytes, limit_bytes and per-table bytes
+        """
+        with self._condition:
+            tables = self._charged(session_id)
+            return {
+                "session_id": session_id,
+                "bytes": sum(tables.values()),
+                "reserved_bytes": self._reserved.get(session_id, 0),
+                "limit_bytes": self.session_limit,
+                "tables": tables,
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the budget across sessions
+
+        Returns:
+            Dictionary with accounted and reserved bytes, limits, admission
+            counters, the number of datasets held and per-session bytes
+        """
+        with self._condition:
+            return {
+                "bytes": self._total_bytes(),
+                "reserved_bytes": sum(self._reserved.values()),
+                "limit_bytes": self.global_limit,
+                "session_limit_bytes": self.session_limit,
+                "admitted": self._admitted,
+                "queued": self._queued,
+                "rejected": self._rejected,
+                "datasets": len(self._datasets),
+                "sessions": {
+                    session_id: sum(self._charged(session_id).values())
+                    for session_id in self._bound
+                },
+            }
+
+
+# Global memory budget shared by all sessions
+memory_budget = MemoryBudget()
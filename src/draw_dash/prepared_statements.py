@@ -0,0 +1,236 @@
+"""
+Prepared statements for DrawDash
+Named, parameterized query templates registered per session
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, Any, Optional, List, Set
+
+import duckdb
+
+# Templates one session may register
+MAX_STATEMENTS_PER_SESSION = 256
+
+
+def _parameter_names(node: Any, found: Set[str]):
+    """Collect the identifiers of PARAMETER nodes in a serialized statement"""
+    if isinstance(node, dict):
+        if node.get("class") == "PARAMETER":
+            found.add(node.get("identifier"))
+        for value in node.values():
+            _parameter_names(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _parameter_names(value, found)
+
+
+def template_parameters(connection: duckdb.DuckDBPyConnection, template: str) -> List[str]:
+    """
+    Parse a template and list its named parameters
+
+    Args:
+        connection: DuckDB connection or cursor used to parse the template
+        template: A single SELECT statement with $name parameters
+
+    Returns:
+        Sorted parameter names
+
+    Raises:
+        ValueError: If the template is not a single SELECT or uses
+            positional (? or $1) parameters
+    """
+    serialized = json.loads(
+        connection.execute("SELECT json_serialize_sql(?)", [template]).fetchone()[0]
+    )
+    if serialized.get("error"):
+        raise ValueError(f"Template must be a single SELECT statement: {serialized.get('error_message')}")
+    if len(serialized["statements"]) != 1:
+        raise ValueError("Template must be a single SELECT statement")
+
+    found: Set[str] = set()
+    _parameter_names(serialized["statements"], found)
+    positional = sorted(name for name in found if name.isdigit())
+    if positional:
+        raise ValueError("Template parameters must be named, e.g. $region, not ? or $1")
+    return sorted(found)
+
+
+def template_key(template: str) -> str:
+    """Key of a template, shared by every name it is registered under"""
+    return hashlib.sha256(" ".join(template.split()).encode()).hexdigest()[:16]
+
+
+class PreparedStatements:
+    """
+    Per-session registry of named query templates
+
+    A template is parsed and bound once when it is registered: syntax,
+    tables and columns are checked and its $name parameters recorded.
+    Executions then only supply parameter values, which DuckDB binds as
+    typed values, never as SQL text. Templates are stored once per
+    distinct text; names registered for the same text share the entry.
+
+    Registering, executing and dropping statements of different sessions
+    is thread-safe.
+    """
+
+    def __init__(self, max_per_session: int = MAX_STATEMENTS_PER_SESSION):
+        """
+        Initialize the registry
+
+        Args:
+            max_per_session: Templates one session may register
+        """
+        self.max_per_session = max_per_session
+
+        self._templates: Dict[str, Dict[str, Any]] = {}  # template key -> template, parameters
+        self._names: Dict[str, Dict[str, str]] = {}  # session -> name -> template key
+        self._lock = threading.Lock()
+
+        self._executions = 0
+
+    def register(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        session_id: str,
+        name: str,
+        template: str
+    ) -> Dict[str, Any]:
+        """
+        Validate a template and register it under a name
+
+        Registering a name again replaces its template.
+
+        Args:
+            connection: Cursor used to parse and bind the template
+            session_id: Session owning the statement
+            name: Statement name, unique within the session
+            template: A single SELECT statement with $name parameters
+
+        Returns:
+            Statement description with name, template key and parameters
+
+        Raises:
+            ValueError: If the template is invalid or the session is full
+        """
+        key = template_key(template)
+        with self._lock:
+            known = self._templates.get(key)
+
+        if known is None:
+            parameters = template_parameters(connection, template)
+            # PREPARE binds without executing: unknown tables and columns fail here
+            statement = f"drawdash_check_{key}"
+            try:
+                connection.execute(f"PREPARE {statement} AS {template}")
+            except duckdb.Error as e:
+                raise ValueError(f"Invalid template: {str(e)}")
+            connection.execute(f"DEALLOCATE {statement}")
+            known = {"template": template, "parameters": parameters}
+
+        with self._lock:
+            names = self._names.setdefault(session_id, {})
+            if name not in names and len(names) >= self.max_per_session:
+                raise ValueError(f"Session {session_id} already has {self.max_per_session} statements")
+            self._templates.setdefault(key, known)
+            names[name] = key
+            return self._describe(name, key)
+
+    def _describe(self, name: str, key: str) -> Dict[str, Any]:
+        """Public description of a statement. Caller holds the lock."""
+        entry = self._templates[key]
+        return {
+            "name": name,
+            "template_key": key,
+            "template": entry["template"],
+            "parameters": list(entry["parameters"]),
+        }
+
+    def bind(self, session_id: str, name: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Look up a statement and check the parameter values against it
+
+        Args:
+            session_id: Session owning the statement
+            name: Statement name
+            params: Value per parameter name
+
+        Returns:
+            Dictionary with the template and the params to execute it with
+
+        Raises:
+            KeyError: If the statement is not registered
+            ValueError: If parameters are missing or unknown
+        """
+        params = params or {}
+        with self._lock:
+            key = self._names.get(session_id, {}).get(name)
+            if key is None:
+                raise KeyError(f"Statement {name} not found")
+            entry = self._templates[key]
+            self._executions += 1
+
+        missing = sorted(set(entry["parameters"]) - set(params))
+        unknown = sorted(set(params) - set(entry["parameters"]))
+        if missing or unknown:
+            raise ValueError(
+                f"Statement {name} takes parameters {entry['parameters']}"
+                + (f"; missing {missing}" if missing else "")
+                + (f"; unknown {unknown}" if unknown else "")
+            )
+        return {"template": entry["template"], "params": params}
+
+    def list(self, session_id: str) -> List[Dict[str, Any]]:
+        """Statements registered by a session"""
+        with self._lock:
+            return [
+                self._describe(name, key)
+                for name, key in self._names.get(session_id, {}).items()
+            ]
+
+    def drop(self, session_id: str, name: str) -> bool:
+        """
+        Unregister one statement
+
+        Returns:
+            True if the statement existed
+        """
+        with self._lock:
+            names = self._names.get(session_id, {})
+            if names.pop(name, None) is None:
+                return False
+            if not names:
+                self._names.pop(session_id, None)
+            self._collect()
+            return True
+
+    def drop_session(self, session_id: str) -> int:
+        """
+        Unregister every statement of a session
+
+        Returns:
+            Number of statements dropped
+        """
+        with self._lock:
+            dropped = len(self._names.pop(session_id, {}))
+            self._collect()
+            return dropped
+
+    def _collect(self):
+        """Forget templates no name points at. Caller holds the lock."""
+        used = {key for names in self._names.values() for key in names.values()}
+        for key in list(self._templates):
+            if key not in used:
+                del self._templates[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Sessions, names and distinct templates registered, and executions"""
+        with self._lock:
+            return {
+                "sessions": len(self._names),
+                "statements": sum(len(names) for names in self._names.values()),
+                "templates": len(self._templates),
+                "executions": self._executions,
+            }
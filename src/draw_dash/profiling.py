@@ -0,0 +1,384 @@
+"""
+Table profiling for DrawDash
+Computes schema, row count and per-column statistics for a DuckDB table
+"""
+
+import math
+from typing import Dict, Any, List, Optional
+
+NUMERIC_TYPES = ["INT", "FLOAT", "DOUBLE", "DECIMAL", "NUMERIC"]
+TEXT_TYPES = ["VARCHAR", "TEXT"]
+
+# Tables with more rows than this are profiled approximately
+APPROX_PROFILE_ROWS = 5_000_000
+
+# Rows kept in the reservoir sample used for approximate quantiles
+APPROX_SAMPLE_ROWS = 100_000
+
+# Confidence level of the error bounds reported for approximate stats
+APPROX_CONFIDENCE = 0.95
+_APPROX_Z = 1.96
+
+# approx_count_distinct keeps 2^6 HyperLogLog registers: std error 1.04 / sqrt(64)
+HLL_RELATIVE_STD_ERROR = 1.04 / math.sqrt(64)
+
+QUANTILES = [0.25, 0.5, 0.75]
+
+
+def quote_identifier(name: str) -> str:
+    """
+    Quote a DuckDB identifier so column names with spaces or mixed case survive
+
+    Args:
+        name: Raw identifier
+
+    Returns:
+        Double-quoted identifier
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def is_numeric_type(col_type: str) -> bool:
+    """Check whether a DuckDB type name is numeric"""
+    col_type = col_type.upper()
+    return "INTERVAL" not in col_type and any(t in col_type for t in NUMERIC_TYPES)
+
+
+def is_text_type(col_type: str) -> bool:
+    """Check whether a DuckDB type name is a string type"""
+    col_type = col_type.upper()
+    return any(t in col_type for t in TEXT_TYPES)
+
+
+def describe_table(connection, table_name: str) -> List[Dict[str, Any]]:
+    """
+    Get the column list of a table
+
+    Args:
+        connection: DuckDB connection or cursor
+        table_name: Name of the table
+
+    Returns:
+        List of column dicts with name, type and nullability
+    """
+    schema_info = connection.execute(f"DESCRIBE {quote_identifier(table_name)}").fetchall()
+    return [
+        {"name": col[0], "type": col[1], "null": col[2] if len(col) > 2 else "YES"}
+        for col in schema_info
+    ]
+
+
+def _column_aggregates(col: Dict[str, Any], approximate: bool = False) -> List[str]:
+    """Build the aggregate expressions profiled for one column"""
+    ident = quote_identifier(col["name"])
+    # Exact distinct counts need a hash table per column; HyperLogLog does not
+    distinct = f"approx_count_distinct({ident})" if approximate else f"COUNT(DISTINCT {ident})"
+    if is_numeric_type(col["type"]):
+        return [
+            f"MIN({ident})",
+            f"MAX({ident})",
+            f"AVG({ident})",
+            distinct,
+            f"COUNT({ident})",
+        ]
+    if is_text_type(col["type"]):
+        return [
+            distinct,
+            f"COUNT({ident})",
+        ]
+    return []
+
+
+def _column_stats_from_row(
+    col: Dict[str, Any],
+    values: List[Any],
+    row_count: int
+) -> Dict[str, Any]:
+    """Turn the aggregate values of one column into its stats dict"""
+    if is_numeric_type(col["type"]):
+        min_value, max_value, avg_value, distinct_count, non_null = values
+        return {
+            "min": float(min_value) if min_value is not None else None,
+            "max": float(max_value) if max_value is not None else None,
+            "avg": float(avg_value) if avg_value is not None else None,
+            # HyperLogLog estimates can overshoot the number of values
+            "distinct_count": min(int(distinct_count), int(non_null)) if distinct_count is not None else None,
+            "null_count": row_count - int(non_null),
+        }
+
+    distinct_count, non_null = values
+    return {
+        "distinct_count": min(int(distinct_count), int(non_null)),
+        "null_count": row_count - int(non_null),
+    }
+
+
+def _profile_columns_separately(
+    connection,
+    table_name: str,
+    columns: List[Dict[str, Any]],
+    row_count: int,
+    approximate: bool = False
+) -> Dict[str, Any]:
+    """
+    Fallback profiler that scans the table once per column
+
+    Only used when the single-pass query fails, so that one bad column
+    does not lose the stats of every other column.
+    """
+    column_stats = {}
+    for col in columns:
+        aggregates = _column_aggregates(col, approximate)
+        if not aggregates:
+            continue
+        try:
+            values = connection.execute(
+                f"SELECT {', '.join(aggregates)} FROM {quote_identifier(table_name)}"
+            ).fetchone()
+            column_stats[col["name"]] = _column_stats_from_row(col, list(values), row_count)
+        except Exception:
+            # Skip if stats extraction fails
+            pass
+    return column_stats
+
+
+def profile_columns(
+    connection,
+    table_name: str,
+    columns: List[Dict[str, Any]],
+    approximate: bool = False
+) -> Dict[str, Any]:
+    """
+    Compute the row count and every column's statistics in a single scan
+
+    All aggregates (MIN/MAX/AVG/COUNT DISTINCT/null count) for all profiled
+    columns are folded into one SELECT, so DuckDB reads the table once
+    regardless of the number of columns.
+
+    Args:
+        connection: DuckDB connection or cursor
+        table_name: Name of the table
+        columns: Column list as returned by describe_table
+        approximate: Use HyperLogLog distinct counts instead of exact ones
+
+    Returns:
+        Dict with row_count and column_stats
+    """
+    select_list = ["COUNT(*)"]
+    profiled = []
+    for col in columns:
+        aggregates = _column_aggregates(col, approximate)
+        if aggregates:
+            profiled.append((col, len(select_list), len(aggregates)))
+            select_list.extend(aggregates)
+
+    try:
+        row = connection.execute(
+            f"SELECT {', '.join(select_list)} FROM {quote_identifier(table_name)}"
+        ).fetchone()
+    except Exception:
+        row_count = connection.execute(f"SELECT COUNT(*) FROM {quote_identifier(table_name)}").fetchone()[0]
+        return {
+            "row_count": row_count,
+            "column_stats": _profile_columns_separately(
+                connection, table_name, columns, row_count, approximate
+            ),
+        }
+
+    row_count = row[0]
+    column_stats = {}
+    for col, offset, width in profiled:
+        values = list(row[offset:offset + width])
+        column_stats[col["name"]] = _column_stats_from_row(col, values, row_count)
+
+    return {"row_count": row_count, "column_stats": column_stats}
+
+
+def estimate_row_count(connection, table_name: str) -> int:
+    """
+    Row count of a table, from the catalog when possible
+
+    Args:
+        connection: DuckDB connection or cursor
+        table_name: Name of the table or view
+
+    Returns:
+        Catalog row estimate for base tables, else an exact COUNT(*)
+    """
+    row = connection.execute(
+        "SELECT estimated_size FROM duckdb_tables() WHERE table_name = ?",
+        [table_name]
+    ).fetchone()
+    if row is not None and row[0] is not None:
+        return int(row[0])
+    return connection.execute(f"SELECT COUNT(*) FROM {quote_identifier(table_name)}").fetchone()[0]
+
+
+def quantile_rank_error(sample_size: int) -> float:
+    """
+    Rank error bound of quantiles estimated from a uniform sample
+
+    Dvoretzky-Kiefer-Wolfowitz: with probability APPROX_CONFIDENCE every
+    sample quantile is within this many quantile ranks of the true one.
+    """
+    if sample_size <= 0:
+        return 1.0
+    return math.sqrt(math.log(2 / (1 - APPROX_CONFIDENCE)) / (2 * sample_size))
+
+
+def sample_quantiles(
+    connection,
+    table_name: str,
+    columns: List[Dict[str, Any]],
+    sample_rows_count: int = APPROX_SAMPLE_ROWS
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Approximate quartiles of every numeric column from one reservoir sample
+
+    Args:
+        connection: DuckDB connection or cursor
+        table_name: Name of the table
+        columns: Column list as returned by describe_table
+        sample_rows_count: Reservoir size
+
+    Returns:
+        Mapping of column name to {"p25", "p50", "p75"}
+    """
+    numeric = [col for col in columns if is_numeric_type(col["type"])]
+    if not numeric:
+        return {}
+
+    select_list = [
+        f"quantile_cont({quote_identifier(col['name'])}, {QUANTILES})"
+        for col in numeric
+    ]
+    row = connection.execute(
+        f"SELECT {', '.join(select_list)} FROM {quote_identifier(table_name)} "
+        f"USING SAMPLE reservoir({int(sample_rows_count)} ROWS)"
+    ).fetchone()
+
+    quantiles = {}
+    for col, values in zip(numeric, row):
+        values = values or [None] * len(QUANTILES)
+        quantiles[col["name"]] = {
+            f"p{int(q * 100)}": float(v) if v is not None else None
+            for q, v in zip(QUANTILES, values)
+        }
+    return quantiles
+
+
+def sample_rows(connection, table_name: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Get the first rows of a table as records
+
+    Args:
+        connection: DuckDB connection or cursor
+        table_name: Name of the table
+        limit: Number of rows to return
+
+    Returns:
+        List of row dicts
+    """
+    return connection.execute(
+        f"SELECT * FROM {quote_identifier(table_name)} LIMIT {int(limit)}"
+    ).fetchdf().to_dict('records')
+
+
+def schema_metadata(connection, table_name: str) -> Dict[str, Any]:
+    """
+    Build the metadata dict from the catalog alone, without scanning
+
+    Column stats and sample rows are left empty and profile.mode is
+    "pending" until profile_table fills them in.
+
+    Args:
+        connection: DuckDB connection or cursor
+        table_name: Name of the table
+
+    Returns:
+        Dictionary with the same keys as profile_table
+    """
+    columns = describe_table(connection, table_name)
+    return {
+        "table_name": table_name,
+        "row_count": estimate_row_count(connection, table_name),
+        "column_count": len(columns),
+        "columns": columns,
+        "column_stats": {},
+        "sample_data": [],
+        "profile": {"mode": "pending"},
+    }
+
+
+def is_profiled(metadata: Dict[str, Any]) -> bool:
+    """Check whether a metadata dict has its column stats filled in"""
+    return metadata.get("profile", {}).get("mode") != "pending"
+
+
+def profile_table(
+    connection,
+    table_name: str,
+    sample_size: int = 5,
+    approx_threshold: Optional[int] = APPROX_PROFILE_ROWS,
+    approx_sample_rows: int = APPROX_SAMPLE_ROWS
+) -> Dict[str, Any]:
+    """
+    Build the full metadata dict for a table
+
+    Tables above approx_threshold rows get HyperLogLog distinct counts and
+    quartiles from a reservoir sample instead of exact distinct counts.
+    MIN/MAX/AVG and null counts are streaming aggregates and stay exact.
+    Approximate stats are listed per column under "approximate", with
+    their error bounds under "error_bounds".
+
+    Args:
+        connection: DuckDB connection or cursor
+        table_name: Name of the table
+        sample_size: Number of sample rows to include
+        approx_threshold: Row count above which profiling is approximate.
+            None always profiles exactly.
+        approx_sample_rows: Reservoir size for approximate quantiles
+
+    Returns:
+        Dictionary with table_name, row_count, column_count, columns,
+        column_stats, sample_data and profile (mode and confidence)
+    """
+    columns = describe_table(connection, table_name)
+    approximate = (
+        approx_threshold is not None
+        and estimate_row_count(connection, table_name) > approx_threshold
+    )
+    profile = profile_columns(connection, table_name, columns, approximate)
+    column_stats = profile["column_stats"]
+    profile_info = {"mode": "exact"}
+
+    if approximate:
+        sample_size_used = min(approx_sample_rows, profile["row_count"])
+        rank_error = quantile_rank_error(sample_size_used)
+        quantiles = sample_quantiles(connection, table_name, columns, approx_sample_rows)
+
+        for name, stats in column_stats.items():
+            stats["approximate"] = ["distinct_count"]
+            # Relative error of the distinct count
+            stats["error_bounds"] = {"distinct_count": round(_APPROX_Z * HLL_RELATIVE_STD_ERROR, 4)}
+            if name in quantiles:
+                stats["quantiles"] = quantiles[name]
+                stats["approximate"].append("quantiles")
+                # Error in quantile rank, e.g. 0.004 means p50 is within p49.6..p50.4
+                stats["error_bounds"]["quantiles"] = round(rank_error, 4)
+
+        profile_info = {
+            "mode": "approximate",
+            "confidence": APPROX_CONFIDENCE,
+            "sample_rows": sample_size_used,
+        }
+
+    return {
+        "table_name": table_name,
+        "row_count": profile["row_count"],
+        "column_count": len(columns),
+        "columns": columns,
+        "column_stats": column_stats,
+        "sample_data": sample_rows(connection, table_name, sample_size),
+        "profile": profile_info,
+    }
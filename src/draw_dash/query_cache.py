@@ -0,0 +1,193 @@
+"""
+Query result cache for DrawDash
+Keeps Arrow results of repeated read queries, invalidated per table
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import pyarrow as pa
+
+# Statements whose results can be cached
+_READ_ONLY = re.compile(r"^\s*(\(\s*)*(SELECT|WITH|FROM|VALUES|TABLE|SUMMARIZE|DESCRIBE)\b", re.IGNORECASE)
+
+# Functions that return a different result on every call
+_VOLATILE = re.compile(
+    r"\b(random|uuid|gen_random_uuid|now|current_date|current_time|current_timestamp"
+    r"|get_current_time|today|nextval|setseed)\b",
+    re.IGNORECASE
+)
+
+# Identifiers, bare or double-quoted
+_IDENTIFIER = re.compile(r'"((?:[^"]|"")+)"|([A-Za-z_][A-Za-z0-9_]*)')
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Normalize a query for use as a cache key
+
+    Collapses whitespace and drops trailing semicolons. Case is kept, since
+    it is significant inside string literals.
+
+    Args:
+        query: SQL query string
+
+    Returns:
+        Normalized query
+    """
+    return " ".join(query.split()).rstrip("; ")
+
+
+def is_read_only(query: str) -> bool:
+    """Check whether a statement only reads data"""
+    return bool(_READ_ONLY.match(query))
+
+
+def is_cacheable(query: str) -> bool:
+    """Check whether a query is a deterministic read whose result can be reused"""
+    return is_read_only(query) and not _VOLATILE.search(query)
+
+
+class QueryResultCache:
+    """
+    Byte-bounded LRU of Arrow query results
+
+    Entries are keyed on the normalized SQL plus the version of every table
+    the query mentions. Bumping a table's version (on ingest, append or
+    drop) makes every entry that read it unreachable; stale entries then
+    age out of the LRU.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes: Upper bound on the summed Arrow size of cached results
+        """
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[Tuple, pa.Table]" = OrderedDict()
+        self._table_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def bump_table_version(self, table_name: str):
+        """
+        Invalidate every cached result that read a table
+
+        Args:
+            table_name: Table or view whose contents changed
+        """
+        with self._lock:
+            key = table_name.lower()
+            self._table_versions[key] = self._table_versions.get(key, 0) + 1
+
+    def table_version(self, table_name: str) -> int:
+        """Current version of a table; 0 if it was never bumped"""
+        with self._lock:
+            return self._table_versions.get(table_name.lower(), 0)
+
+    def clear(self):
+        """Drop every cached result, e.g. after arbitrary DDL"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def key(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Tuple]:
+        """
+        Build the cache key for a query
+
+        Args:
+            query: SQL query string
+            params: Values bound to the query's parameters; part of the key
+
+        Returns:
+            Key tuple, or None if the query must not be cached
+        """
+        if not is_cacheable(query):
+            return None
+
+        normalized = normalize_sql(query)
+        identifiers = {
+            (quoted.replace('""', '"') if quoted else bare).lower()
+            for quoted, bare in _IDENTIFIER.findall(normalized)
+        }
+        with self._lock:
+            versions = tuple(sorted(
+                (name, self._table_versions[name])
+                for name in identifiers
+                if name in self._table_versions
+            ))
+        if params:
+            # repr keeps 1, 1.0 and '1' apart
+            return normalized, versions, tuple(sorted((name, repr(value)) for name, value in params.items()))
+        return normalized, versions
+
+    def get(self, key: Tuple) -> Optional[pa.Table]:
+        """
+        Look up a cached result
+
+        Args:
+            key: Key from key()
+
+        Returns:
+            Cached Arrow table, or None on a miss
+        """
+        with self._lock:
+            table = self._entries.get(key)
+            if table is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return table
+
+    def put(self, key: Tuple, table: pa.Table):
+        """
+        Store a result, evicting least recently used entries to stay in budget
+
+        Args:
+            key: Key from key()
+            table: Arrow result of the query
+        """
+        size = table.nbytes
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+
+            self._entries[key] = table
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of cache usage
+
+        Returns:
+            Dictionary with entries, bytes, max_bytes, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
@@ -6,13 +6,17 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from draw_dash.agents.query_generator_agent.agent import root_agent as query_generator_agent
+from draw_dash.agents.query_validation_agent.agent import root_agent as query_validation_agent
 from draw_dash.agents.query_execution_agent.agent import root_agent as query_execution_agent
 
 
+# The validation stage fixes mechanical errors without a model call; only
+# queries it cannot repair cost another generator round trip
 query_retry_loop = LoopAgent(
     name="QueryRetryLoop", 
     sub_agents=[
         query_generator_agent,
+        query_validation_agent,
         query_execution_agent,
     ],
     max_iterations=5
@@ -0,0 +1,193 @@
+"""
+Query profiling for DrawDash
+Captures DuckDB's JSON query profile of executed queries into a ring buffer
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List
+
+# Record a profile for every query; off by default since profiling adds
+# a file write per query
+QUERY_PROFILING = os.environ.get("DRAWDASH_QUERY_PROFILING", "0") == "1"
+
+# Number of most recent query profiles kept
+QUERY_PROFILE_CAPACITY = int(os.environ.get("DRAWDASH_QUERY_PROFILES", "256"))
+
+# Where DuckDB writes each profile before it is read back
+PROFILE_DIRECTORY = os.path.join(tempfile.gettempdir(), "drawdash", "profiles")
+
+
+class _Capture:
+    """A query being profiled on one connection or cursor"""
+
+    def __init__(self, connection, query_id: str, output_path: str):
+        self.connection = connection
+        self.query_id = query_id
+        self.output_path = output_path
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+
+
+class QueryProfileStore:
+    """
+    Bounded ring buffer of query profiles
+
+    Profiling is switched on per connection or cursor for the duration of
+    one query with DuckDB's JSON profiler writing to a private file, which
+    is read back and stored under a query id. Once capacity is reached the
+    oldest profile is dropped.
+    """
+
+    def __init__(
+        self,
+        capacity: int = QUERY_PROFILE_CAPACITY,
+        enabled: bool = QUERY_PROFILING,
+        directory: str = PROFILE_DIRECTORY
+    ):
+        """
+        Initialize the store
+
+        Args:
+            capacity: Number of profiles kept
+            enabled: Capture profiles; can be changed at runtime
+            directory: Directory for DuckDB's profile output files
+        """
+        if capacity < 1:
+            raise ValueError("Profile capacity must be at least 1")
+
+        self.capacity = capacity
+        self.enabled = enabled
+        self.directory = directory
+
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, connection, query_id: Optional[str] = None) -> Optional[_Capture]:
+        """
+        Start profiling the next query run on a connection
+
+        Args:
+            connection: DuckDB connection or cursor the query will run on.
+                It must not be shared with other threads until end.
+            query_id: Id to store the profile under; generated if None
+
+        Returns:
+            Capture to pass to end, or None when profiling is disabled
+        """
+        if not self.enabled:
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        query_id = query_id or uuid.uuid4().hex
+        output_path = os.path.join(self.directory, f"{uuid.uuid4().hex}.json")
+        connection.execute("PRAGMA enable_profiling = 'json'")
+        connection.execute("SET profiling_output = '{}'".format(output_path.replace("'", "''")))
+        return _Capture(connection, query_id, output_path)
+
+    def end(
+        self,
+        capture: Optional[_Capture],
+        query: str,
+        source: str = "backend",
+        error: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Stop profiling and store the profile of the finished query
+
+        Call once the result is fully read: DuckDB writes the profile when
+        the query completes. A failed query is stored with its error and
+        whatever profile DuckDB produced.
+
+        Args:
+            capture: Value returned by begin
+            query: SQL query that ran
+            source: What ran the query, e.g. "backend" or a tool name
+            error: Error message if the query failed
+
+        Returns:
+            The query id, or None when profiling is disabled
+        """
+        if capture is None:
+            return None
+
+        latency = time.perf_counter() - capture.start
+        try:
+            capture.connection.execute("PRAGMA disable_profiling")
+        except Exception:
+            # An interrupted or closed connection still gets its entry
+            pass
+
+        profile = None
+        try:
+            with open(capture.output_path) as fp:
+                profile = json.load(fp)
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                os.unlink(capture.output_path)
+            except OSError:
+                pass
+
+        self.record(capture.query_id, {
+            "query_id": capture.query_id,
+            "query": query,
+            "source": source,
+            "started_at": capture.started_at,
+            "latency_ms": latency * 1000,
+            "rows_returned": (profile or {}).get("rows_returned"),
+            "rows_scanned": (profile or {}).get("cumulative_rows_scanned"),
+            "cpu_time_ms": (profile or {}).get("cpu_time", 0.0) * 1000 if profile else None,
+            "error": error,
+            "profile": profile,
+        })
+        return capture.query_id
+
+    def record(self, query_id: str, entry: Dict[str, Any]):
+        """Store a profile entry, dropping the oldest when full"""
+        with self._lock:
+            self._profiles[query_id] = entry
+            self._profiles.move_to_end(query_id)
+            while len(self._profiles) > self.capacity:
+                self._profiles.popitem(last=False)
+
+    def get(self, query_id: str) -> Optional[Dict[str, Any]]:
+        """Profile entry of a query, or None if unknown or already dropped"""
+        with self._lock:
+            return self._profiles.get(query_id)
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Most recent queries first, without their operator trees
+
+        Args:
+            limit: Maximum number of entries
+
+        Returns:
+            Summaries with query id, query, source, latency, rows and error
+        """
+        with self._lock:
+            entries = list(self._profiles.values())[-limit:] if limit > 0 else []
+        return [
+            {key: value for key, value in entry.items() if key != "profile"}
+            for entry in reversed(entries)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Whether profiling is on, and how many profiles are held"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "profiles": len(self._profiles),
+                "capacity": self.capacity,
+            }
+
+
+# Profiles of the queries run by the backend and the agent tools
+query_profiles = QueryProfileStore()
@@ -0,0 +1,286 @@
+"""
+Query deadlines for DrawDash
+Interrupts queries that run past their deadline or are cancelled, and caps
+the queries a session may run at once
+"""
+
+import heapq
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Iterator
+
+# Seconds a query may run before it is interrupted (0 = no deadline)
+QUERY_TIMEOUT = float(os.environ.get("DRAWDASH_QUERY_TIMEOUT", "30"))
+
+# Queries one session may have in flight at once (0 = no cap)
+SESSION_MAX_QUERIES = int(os.environ.get("DRAWDASH_SESSION_MAX_QUERIES", "2"))
+
+
+class QueryInterrupted(Exception):
+    """Raised when a running query was stopped by the watchdog"""
+
+    reason = "interrupted"
+
+    def __init__(self, message: str, query_id: str):
+        """
+        Args:
+            message: Error message
+            query_id: Id of the stopped query
+        """
+        super().__init__(message)
+        self.query_id = query_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Structured form for API error responses"""
+        return {"error": self.reason, "message": str(self), "query_id": self.query_id}
+
+
+class QueryTimeout(QueryInterrupted):
+    """Raised when a query ran past its deadline"""
+
+    reason = "timeout"
+
+
+class QueryCancelled(QueryInterrupted):
+    """Raised when a query was cancelled through QueryWatchdog.cancel"""
+
+    reason = "cancelled"
+
+
+class SessionQueryLimitExceeded(Exception):
+    """Raised when a session already has its maximum of queries in flight"""
+
+
+class _RunningQuery:
+    """A query registered with the watchdog"""
+
+    def __init__(self, connection, query: str, query_id: str, session_id: Optional[str], timeout: Optional[float]):
+        self.connection = connection
+        self.query = query
+        self.query_id = query_id
+        self.session_id = session_id
+        self.timeout = timeout
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout if timeout else None
+        self.reason: Optional[str] = None  # Set once the watchdog stops the query
+
+    def error(self) -> QueryInterrupted:
+        """Exception describing why the query was stopped"""
+        if self.reason == "timeout":
+            return QueryTimeout(
+                f"Query timeout: exceeded the {self.timeout:.1f}s deadline and was interrupted. "
+                f"Avoid cross joins, filter or aggregate earlier, or add a LIMIT.",
+                self.query_id
+            )
+        return QueryCancelled("Query cancelled: interrupted on request.", self.query_id)
+
+
+class QueryWatchdog:
+    """
+    Deadline enforcement for running DuckDB queries
+
+    Queries register the connection or cursor they run on. A single
+    background thread sleeps until the nearest deadline and calls
+    interrupt() on the cursor of any query that is still running; cancel
+    does the same on request. The interrupted call then raises
+    QueryTimeout or QueryCancelled instead of DuckDB's generic
+    InterruptException.
+
+    DuckDB's thread count is a database-wide setting, so a session's CPU
+    share is bounded by the number of queries it may run at once.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = QUERY_TIMEOUT,
+        session_max_queries: Optional[int] = SESSION_MAX_QUERIES
+    ):
+        """
+        Initialize the watchdog
+
+        Args:
+            timeout: Default per-query deadline in seconds. None or 0 disables.
+            session_max_queries: Queries a session may run at once. None or 0 disables.
+        """
+        self.timeout = timeout or None
+        self.session_max_queries = session_max_queries or None
+
+        self._running: Dict[str, _RunningQuery] = {}
+        self._deadlines: List[tuple] = []  # heap of (deadline, query_id)
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self._timeouts = 0
+        self._cancelled = 0
+        self._rejected = 0
+
+    def start(
+        self,
+        connection,
+        query: str,
+        query_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> _RunningQuery:
+        """
+        Register a query about to run
+
+        Args:
+            connection: Connection or cursor the query runs on; interrupting
+                it must not affect other queries
+            query: SQL query string
+            query_id: Id used to cancel the query; generated if None
+            session_id: Session charged with the query, for the per-session cap
+            timeout: Deadline in seconds; defaults to the watchdog timeout
+
+        Returns:
+            Handle to pass to finish
+
+        Raises:
+            SessionQueryLimitExceeded: If the session is at its cap
+        """
+        timeout = self.timeout if timeout is None else (timeout or None)
+        running = _RunningQuery(connection, query, query_id or uuid.uuid4().hex, session_id, timeout)
+
+        with self._condition:
+            if session_id is not None and self.session_max_queries is not None:
+                in_flight = sum(1 for other in self._running.values() if other.session_id == session_id)
+                if in_flight >= self.session_max_queries:
+                    self._rejected += 1
+                    raise SessionQueryLimitExceeded(
+                        f"Session {session_id} already runs {in_flight} queries "
+                        f"(limit {self.session_max_queries})"
+                    )
+
+            self._running[running.query_id] = running
+            if running.deadline is not None:
+                heapq.heappush(self._deadlines, (running.deadline, running.query_id))
+                self._ensure_thread()
+                self._condition.notify()
+        return running
+
+    def finish(self, running: _RunningQuery, error: Optional[BaseException] = None):
+        """
+        Unregister a query that returned or failed
+
+        Args:
+            running: Handle returned by start
+            error: Exception the query raised, if any
+
+        Raises:
+            QueryTimeout, QueryCancelled: If the query failed because the
+                watchdog stopped it; chained from error. A query that
+                finished before the interrupt landed keeps its result.
+        """
+        with self._condition:
+            if self._running.get(running.query_id) is running:
+                del self._running[running.query_id]
+        if error is not None and running.reason is not None:
+            raise running.error() from error
+
+    @contextmanager
+    def guard(
+        self,
+        connection,
+        query: str,
+        query_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[_RunningQuery]:
+        """
+        Run the enclosed query under a deadline, see start
+
+        Raises:
+            QueryTimeout, QueryCancelled: If the watchdog stopped the query
+        """
+        running = self.start(connection, query, query_id, session_id, timeout)
+        try:
+            yield running
+        except Exception as e:
+            self.finish(running, e)
+            raise
+        self.finish(running)
+
+    def cancel(self, query_id: str) -> bool:
+        """
+        Interrupt a running query
+
+        Args:
+            query_id: Id the query was started with
+
+        Returns:
+            True if the query was running
+        """
+        with self._condition:
+            running = self._running.get(query_id)
+            if running is None:
+                return False
+            self._interrupt(running, "cancelled")
+            self._cancelled += 1
+            return True
+
+    def _interrupt(self, running: _RunningQuery, reason: str):
+        """Stop a registered query. Caller holds the lock."""
+        if running.reason is None:
+            running.reason = reason
+            running.connection.interrupt()
+
+    def _ensure_thread(self):
+        """Start the deadline thread on first use. Caller holds the lock."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._watch, name="drawdash_watchdog", daemon=True)
+            self._thread.start()
+
+    def _watch(self):
+        """Interrupt queries whose deadline passed"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, query_id = heapq.heappop(self._deadlines)
+                    running = self._running.get(query_id)
+                    if running is not None and running.reason is None:
+                        self._interrupt(running, "timeout")
+                        self._timeouts += 1
+                wait = self._deadlines[0][0] - now if self._deadlines else None
+                self._condition.wait(wait)
+
+    def running(self) -> List[Dict[str, Any]]:
+        """
+        Queries in flight, longest running first
+
+        Returns:
+            Query id, session, query text, elapsed seconds and deadline per query
+        """
+        now = time.monotonic()
+        with self._condition:
+            queries = sorted(self._running.values(), key=lambda running: running.started)
+            return [
+                {
+                    "query_id": running.query_id,
+                    "session_id": running.session_id,
+                    "query": running.query,
+                    "elapsed_seconds": now - running.started,
+                    "timeout_seconds": running.timeout,
+                }
+                for running in queries
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Limits, queries in flight and timeout/cancel/reject counters"""
+        with self._condition:
+            return {
+                "timeout_seconds": self.timeout,
+                "session_max_queries": self.session_max_queries,
+                "running": len(self._running),
+                "timeouts": self._timeouts,
+                "cancelled": self._cancelled,
+                "rejected": self._rejected,
+            }
+
+
+# Deadlines of the queries run by the backend and the agent tools
+query_watchdog = QueryWatchdog()
@@ -0,0 +1,142 @@
+"""
+Result previews for DrawDash
+Runs a query with a row limit pushed into its plan and summarizes the full
+result per column, so tools hand agents a bounded result of any size
+"""
+
+from typing import Dict, Any, Optional
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from draw_dash.query_watchdog import QueryInterrupted
+from draw_dash.sql_repair import strip_sql_fences, split_statements, is_select, without_order_by
+
+# Rows a tool hands to an agent
+PREVIEW_ROWS = 50
+
+# Longest text value shown as a column's min or max
+SUMMARY_TEXT_LENGTH = 64
+
+
+def _summary_value(value: Any) -> Any:
+    """A min or max value, with long text cut short"""
+    if isinstance(value, (str, bytes)) and len(value) > SUMMARY_TEXT_LENGTH:
+        return value[:SUMMARY_TEXT_LENGTH] + ("..." if isinstance(value, str) else b"...")
+    return value
+
+
+def summarize_table(table: pa.Table) -> Dict[str, Dict[str, Any]]:
+    """
+    Null count, min and max of every column of an Arrow table
+
+    Min and max are None for nested columns and for types without an
+    order in Arrow.
+    """
+    summary = {}
+    for name, column in zip(table.column_names, table.columns):
+        low = high = None
+        if not pa.types.is_nested(column.type):
+            try:
+                bounds = pc.min_max(column)
+                low, high = bounds["min"].as_py(), bounds["max"].as_py()
+            except (pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                pass
+        summary[name] = {
+            "min": _summary_value(low),
+            "max": _summary_value(high),
+            "null_count": column.null_count,
+        }
+    return summary
+
+
+def _summary_query(statement: str, schema: pa.Schema) -> str:
+    """
+    One aggregate over a query: its row count and each column's min, max and nulls
+
+    The query's columns are renamed positionally, so duplicate or quoted
+    names need no escaping. Nested columns, whose bounds are costly to
+    compare and say little, only have their nulls counted. The query's
+    ORDER BY is dropped, as it does not change an aggregate. The closing
+    parenthesis goes on its own line so a trailing -- comment cannot
+    swallow it.
+    """
+    aliases = [f"c{idx}" for idx in range(len(schema))]
+    aggregates = ["count(*)"]
+    for alias, field in zip(aliases, schema):
+        bounds = "NULL, NULL" if pa.types.is_nested(field.type) else f"min({alias}), max({alias})"
+        aggregates.append(f"{bounds}, count(*) - count({alias})")
+    return f"SELECT {', '.join(aggregates)} FROM ({without_order_by(statement)}\n) AS result({', '.join(aliases)})"
+
+
+def preview_query(catalog, query: str, limit: int = PREVIEW_ROWS) -> Dict[str, Any]:
+    """
+    Run a query for its first rows and a summary of its whole result
+
+    A single SELECT is wrapped in a LIMIT, which DuckDB pushes into the plan
+    (an ORDER BY becomes a top-N), so at most limit + 1 rows are produced
+    and transferred. Only when the result is longer than limit does a second
+    query aggregate the row count and column bounds inside DuckDB; shorter
+    results are summarized from the rows already fetched. Scripts and
+    statements other than SELECT run as written and are cut afterwards.
+    Errors are reported against the query as written.
+
+    Args:
+        catalog: Catalog to run the query on, see draw_dash.catalog
+        query: SQL query, optionally in a markdown fence
+        limit: Rows to return
+
+    Returns:
+        Dictionary with the first rows as an Arrow table, the total row
+        count, whether rows were cut, and per-column min, max and null count
+
+    Raises:
+        Exception: If the query fails, as catalog.execute_arrow
+    """
+    try:
+        statements = split_statements(strip_sql_fences(query))
+    except duckdb.Error:
+        statements = []
+    if len(statements) != 1 or not is_select(statements[0]):
+        result = catalog.execute_arrow(query)
+        return {
+            "rows": result.slice(0, limit),
+            "row_count": result.num_rows,
+            "truncated": result.num_rows > limit,
+            "summary": summarize_table(result),
+        }
+
+    statement = statements[0]
+    try:
+        # One row past the limit tells whether the result is longer; the
+        # newline ends any trailing -- comment before the wrapper closes
+        rows = catalog.execute_arrow(f"SELECT * FROM ({statement}\n) LIMIT {int(limit) + 1}")
+    except QueryInterrupted:
+        raise
+    except Exception:
+        # Report errors against the query as written, not the wrapper
+        error = catalog.validate(statement)
+        if error is None:
+            raise
+        raise Exception(f"Query execution failed: {error}")
+    if rows.num_rows <= limit:
+        return {"rows": rows, "row_count": rows.num_rows, "truncated": False, "summary": summarize_table(rows)}
+
+    aggregate = catalog.execute_arrow(_summary_query(statement, rows.schema))
+    values = [column[0].as_py() for column in aggregate.columns]
+    summary = {}
+    for idx, name in enumerate(rows.column_names):
+        low, high, nulls = values[1 + 3 * idx: 4 + 3 * idx]
+        summary[name] = {"min": _summary_value(low), "max": _summary_value(high), "null_count": nulls}
+    return {"rows": rows.slice(0, limit), "row_count": values[0], "truncated": True, "summary": summary}
+
+
+def format_summary(preview: Dict[str, Any]) -> Optional[str]:
+    """Markdown table of a preview's column summary, or None without columns"""
+    if not preview["summary"]:
+        return None
+    lines = ["| column | min | max | nulls |", "|---|---|---|---|"]
+    for name, column in preview["summary"].items():
+        lines.append(f"| {name} | {column['min']} | {column['max']} | {column['null_count']} |")
+    return "\n".join(lines)
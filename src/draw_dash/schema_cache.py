@@ -0,0 +1,124 @@
+"""
+Schema snapshots for DrawDash
+Column lists of the catalog's tables, cached until DDL changes them
+"""
+
+import threading
+from typing import Dict, Any, Optional, List, Callable
+
+
+class SchemaCache:
+    """
+    Column lists per table, versioned with the catalog
+
+    The catalog version is bumped on every DDL the manager runs: ingest,
+    append, drop, or an arbitrary statement that may have changed any
+    table. A table's columns are read with DESCRIBE once and served from
+    memory until that table, or the whole catalog, is invalidated, so a
+    snapshot costs one dictionary lookup per table in scope however many
+    tables the catalog holds.
+    """
+
+    def __init__(self):
+        self._version = 0
+        self._columns: Dict[str, List[Dict[str, Any]]] = {}
+        self._tables: Optional[List[str]] = None  # Visible tables, None until listed
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def version(self) -> int:
+        """Current catalog version"""
+        with self._lock:
+            return self._version
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """
+        Record a DDL change
+
+        Args:
+            table_name: Table or view whose schema may have changed; None
+                when any table may have changed
+        """
+        with self._lock:
+            self._version += 1
+            self._tables = None
+            if table_name is None:
+                self._columns.clear()
+            else:
+                self._columns.pop(table_name.lower(), None)
+
+    def tables(self, list_tables: Callable[[], List[str]]) -> List[str]:
+        """
+        Names of the visible tables
+
+        Args:
+            list_tables: Reads the table list from DuckDB on a miss
+        """
+        with self._lock:
+            if self._tables is not None:
+                return list(self._tables)
+            version = self._version
+
+        tables = list_tables()
+        with self._lock:
+            # A DDL that raced the read leaves the list uncached
+            if self._version == version:
+                self._tables = tables
+        return list(tables)
+
+    def snapshot(
+        self,
+        table_names: List[str],
+        describe: Callable[[str], List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Columns of the given tables
+
+        Args:
+            table_names: Tables in scope, e.g. those a session owns
+            describe: Reads a table's columns from DuckDB on a miss; tables
+                it fails on, e.g. dropped ones, are left out
+
+        Returns:
+            Dictionary with the catalog version and the columns per table
+        """
+        columns: Dict[str, List[Dict[str, Any]]] = {}
+        missing = []
+        with self._lock:
+            version = self._version
+            for table_name in table_names:
+                cached = self._columns.get(table_name.lower())
+                if cached is None:
+                    missing.append(table_name)
+                else:
+                    columns[table_name] = cached
+            self._hits += len(columns)
+            self._misses += len(missing)
+
+        for table_name in missing:
+            try:
+                described = describe(table_name)
+            except Exception:
+                continue
+            columns[table_name] = described
+            with self._lock:
+                if self._version == version:
+                    self._columns[table_name.lower()] = described
+
+        return {
+            "version": version,
+            "tables": {name: columns[name] for name in table_names if name in columns},
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Catalog version, tables cached and hit/miss counters"""
+        with self._lock:
+            return {
+                "version": self._version,
+                "tables": len(self._columns),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
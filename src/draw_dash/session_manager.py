@@ -0,0 +1,313 @@
+"""
+Session lifecycle for DrawDash
+Expires idle sessions and reclaims their DuckDB tables, memory and temp files
+"""
+
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+# Seconds a session may stay idle before the sweeper removes it
+SESSION_TTL = float(os.environ.get("DRAWDASH_SESSION_TTL", "3600"))
+
+# Seconds between sweeps
+SWEEP_INTERVAL = float(os.environ.get("DRAWDASH_SWEEP_INTERVAL", "60"))
+
+# Sweeps evict least recently used sessions while the memory budget is
+# fuller than this fraction
+MEMORY_PRESSURE = float(os.environ.get("DRAWDASH_MEMORY_PRESSURE", "0.9"))
+
+# Sessions used more recently than this are never evicted for memory
+EVICTION_MIN_IDLE = 60.0
+
+
+def _directory_bytes(path: Path) -> int:
+    """Total size of the files under a directory"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class SessionManager:
+    """
+    Store of live sessions with idle expiry and LRU eviction
+
+    Behaves like the plain dict it replaces in app.state.sessions: reading
+    a session through [] or get marks it as used. Removing a session drops
+    its DuckDB tables, releases its memory budget and deletes its temp dir.
+
+    With a persistent database, sessions are written through to its
+    catalog index and brought back by restore after a restart.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        memory_budget,
+        ttl: float = SESSION_TTL,
+        memory_pressure: float = MEMORY_PRESSURE
+    ):
+        """
+        Initialize the manager
+
+        Args:
+            db_manager: DuckDBManager holding the session tables
+            memory_budget: MemoryBudget the sessions are charged to
+            ttl: Idle seconds after which a session expires
+            memory_pressure: Budget fraction above which sweeps evict sessions
+        """
+        self.db_manager = db_manager
+        self.memory_budget = memory_budget
+        self.ttl = ttl
+        self.memory_pressure = memory_pressure
+
+        # session_id -> session, least recently used first
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+        self._expired = 0
+        self._evicted = 0
+        self._deleted = 0
+        self._reclaimed_bytes = 0
+        self._reclaimed_disk_bytes = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            session = self._sessions[session_id]
+            self._touch(session_id)
+            return session
+
+    def __setitem__(self, session_id: str, session: Dict[str, Any]):
+        with self._lock:
+            self._sessions[session_id] = session
+            self._touch(session_id)
+            self.save(session_id)
+
+    def get(self, session_id: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get a session and mark it as used, or default if it does not exist"""
+        with self._lock:
+            if session_id not in self._sessions:
+                return default
+            return self[session_id]
+
+    def save(self, session_id: str):
+        """
+        Persist a session after its record was changed in place
+
+        No-op for in-memory databases and unknown sessions.
+        """
+        catalog = self.db_manager.catalog
+        if catalog is None:
+            return
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                catalog.save_session(session_id, session)
+
+    def restore(self) -> List[str]:
+        """
+        Re-attach the sessions of a persistent database after a restart
+
+        Sessions come back with the tables that are still in the table
+        cache and are charged to the memory budget again. Their idle time
+        starts over.
+
+        Returns:
+            Restored session ids
+        """
+        catalog = self.db_manager.catalog
+        if catalog is None:
+            return []
+
+        restored = []
+        for session_id, session in catalog.load_sessions().items():
+            session["tables"] = [
+                table for table in session.get("tables", [])
+                if self.db_manager.table_cache.is_view(table["table_name"])
+            ]
+            if not session["tables"]:
+                catalog.remove_session(session_id)
+                continue
+
+            self.memory_budget.commit(
+                session_id,
+                0,
+                {
+                    table["table_name"]: self.memory_budget.estimate(table.get("file_size") or 0)
+                    for table in session["tables"]
+                },
+                {
+                    table["table_name"]: self.db_manager.dataset_key(table["table_name"])
+                    for table in session["tables"]
+                }
+            )
+            with self._lock:
+                self._sessions[session_id] = session
+                self._touch(session_id)
+            restored.append(session_id)
+        return restored
+
+    def _touch(self, session_id: str):
+        """Mark a session as used. Caller holds the lock."""
+        self._sessions.move_to_end(session_id)
+        self._last_access[session_id] = time.monotonic()
+
+    def _pop(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Unregister a session. Caller holds the lock."""
+        self._last_access.pop(session_id, None)
+        if self.db_manager.catalog is not None:
+            self.db_manager.catalog.remove_session(session_id)
+        return self._sessions.pop(session_id, None)
+
+    def _reclaim(self, session_id: str, session: Dict[str, Any]) -> int:
+        """
+        Drop a removed session's tables and temp files
+
+        Returns:
+            Accounted memory bytes released
+        """
+        for table in session.get("tables", []):
+            try:
+                self.db_manager.drop_table(table["table_name"])
+            except Exception:
+                # A table that is already gone needs no reclaiming
+                pass
+        self.db_manager.prepared.drop_session(session_id)
+        released = self.memory_budget.release_session(session_id)
+
+        disk_bytes = 0
+        temp_dir = session.get("temp_dir")
+        if temp_dir and Path(temp_dir).exists():
+            disk_bytes = _directory_bytes(Path(temp_dir))
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        with self._lock:
+            self._reclaimed_bytes += released
+            self._reclaimed_disk_bytes += disk_bytes
+        return released
+
+    def delete(self, session_id: str) -> Optional[int]:
+        """
+        Remove a session now
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Accounted memory bytes released, or None if the session does not exist
+        """
+        with self._lock:
+            session = self._pop(session_id)
+            if session is None:
+                return None
+            self._deleted += 1
+        return self._reclaim(session_id, session)
+
+    def _over_pressure(self, incoming_bytes: int = 0, fraction: Optional[float] = None) -> bool:
+        """Check whether the memory budget is fuller than the given fraction"""
+        stats = self.memory_budget.stats()
+        if stats["limit_bytes"] is None:
+            return False
+        fraction = self.memory_pressure if fraction is None else fraction
+        return stats["bytes"] + incoming_bytes > stats["limit_bytes"] * fraction
+
+    def _evict_lru(self, incoming_bytes: int = 0, fraction: Optional[float] = None) -> List[str]:
+        """
+        Evict least recently used sessions while the budget is over the fraction
+
+        Returns:
+            Evicted session ids
+        """
+        evicted = []
+        while self._over_pressure(incoming_bytes, fraction):
+            with self._lock:
+                now = time.monotonic()
+                candidate = next(
+                    (
+                        session_id for session_id in self._sessions
+                        if now - self._last_access[session_id] >= EVICTION_MIN_IDLE
+                    ),
+                    None
+                )
+                if candidate is None:
+                    break
+                session = self._pop(candidate)
+                self._evicted += 1
+            self._reclaim(candidate, session)
+            evicted.append(candidate)
+        return evicted
+
+    def make_room(self, incoming_bytes: int) -> List[str]:
+        """
+        Evict idle sessions until an upload fits the global memory budget
+
+        Args:
+            incoming_bytes: Estimated in-memory bytes of the upload
+
+        Returns:
+            Evicted session ids
+        """
+        return self._evict_lru(incoming_bytes, fraction=1.0)
+
+    def sweep(self) -> Dict[str, List[str]]:
+        """
+        Expire idle sessions, then evict LRU sessions under memory pressure
+
+        Returns:
+            Dictionary with the expired and evicted session ids
+        """
+        with self._lock:
+            cutoff = time.monotonic() - self.ttl
+            expired = [
+                (session_id, self._pop(session_id))
+                for session_id, last_access in list(self._last_access.items())
+                if last_access < cutoff
+            ]
+            self._expired += len(expired)
+
+        for session_id, session in expired:
+            self._reclaim(session_id, session)
+
+        return {
+            "expired": [session_id for session_id, _ in expired],
+            "evicted": self._evict_lru(),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Gauges and counters of the session lifecycle
+
+        Returns:
+            Dictionary with live sessions, resident bytes, reclaimed memory
+            and disk bytes, and expired/evicted/deleted counts
+        """
+        resident_bytes = self.memory_budget.stats()["bytes"]
+        with self._lock:
+            return {
+                "live_sessions": len(self._sessions),
+                "resident_bytes": resident_bytes,
+                "reclaimed_bytes": self._reclaimed_bytes,
+                "reclaimed_disk_bytes": self._reclaimed_disk_bytes,
+                "expired": self._expired,
+                "evicted": self._evicted,
+                "deleted": self._deleted,
+                "ttl_seconds": self.ttl,
+            }
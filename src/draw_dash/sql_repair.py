@@ -0,0 +1,361 @@
+"""
+SQL repair for DrawDash
+Binds generated queries without running them and applies deterministic
+fixes for mechanical errors
+"""
+
+import json
+import re
+import threading
+from typing import Dict, Any, Optional, List, Set, Callable
+
+import duckdb
+
+from draw_dash.identifier_index import normalize_identifier, edit_distance, similarity
+
+# Fixes applied to one statement before giving up
+MAX_REPAIRS = 5
+
+# Shortest normalized name a one-character typo is corrected in
+TYPO_MIN_LENGTH = 5
+
+# Similarity (see identifier_index.similarity) a misspelled name needs to
+# its match to be rewritten without asking; closer calls such as
+# PAYMENT -> PAYMENTS are reported as suggestions and left to the model
+AUTO_FIX_SIMILARITY = 0.85
+
+_COLUMN_NOT_FOUND = re.compile(r'Referenced column "((?:[^"]|"")+)" not found', re.IGNORECASE)
+_TABLE_NOT_FOUND = re.compile(
+    r'Table with name ((?:[^!"]|"")+?) does not exist|No files found that match the pattern "((?:[^"]|"")+)"',
+    re.IGNORECASE
+)
+_MISSING_GROUP_BY = re.compile(r'column "((?:[^"]|"")+)" must appear in the GROUP BY clause', re.IGNORECASE)
+_SQL_FENCE = re.compile(r"^\s*```(?:sql)?\s*(.*?)\s*```\s*$", re.IGNORECASE | re.DOTALL)
+_FILE_SUFFIX = re.compile(r"\.(csv|json|parquet)(\.gz|\.gzip|\.zst)?$", re.IGNORECASE)
+
+# Parsing and rendering need no tables; one private connection serves all callers
+_parser = duckdb.connect()
+_parser_lock = threading.Lock()
+_aggregates: Optional[Set[str]] = None
+
+
+def strip_sql_fences(text: str) -> str:
+    """Remove a markdown code fence around generated SQL"""
+    match = _SQL_FENCE.match(text)
+    return match.group(1) if match else text.strip()
+
+
+def split_statements(query: str) -> List[str]:
+    """Split a script into its statements, without trailing semicolons"""
+    with _parser_lock:
+        statements = _parser.extract_statements(query)
+    return [statement.query.strip().rstrip(";").strip() for statement in statements]
+
+
+def _serialize(query: str) -> Dict[str, Any]:
+    """Parse a statement into DuckDB's JSON syntax tree; only SELECTs serialize"""
+    with _parser_lock:
+        return json.loads(_parser.execute("SELECT json_serialize_sql(?)", [query]).fetchone()[0])
+
+
+def is_select(query: str) -> bool:
+    """Whether a statement is a query, which can be bound ahead of running it"""
+    return _serialize(query).get("error_type") != "not implemented"
+
+
+def _deserialize(serialized: Dict[str, Any]) -> str:
+    """Render a syntax tree back into SQL"""
+    with _parser_lock:
+        return _parser.execute("SELECT json_deserialize_sql(?)", [json.dumps(serialized)]).fetchone()[0]
+
+
+def without_order_by(query: str) -> str:
+    """
+    A SELECT without its outermost ORDER BY, for aggregating over its result
+
+    Statements whose ORDER BY decides the rows a LIMIT or OFFSET keeps,
+    and statements that do not serialize, are returned as written.
+    """
+    serialized = _serialize(query)
+    if serialized.get("error") or len(serialized["statements"]) != 1:
+        return query
+    node = serialized["statements"][0]["node"]
+    while node["type"] == "CTE_NODE":
+        node = node["child"]
+    kinds = {modifier["type"] for modifier in node["modifiers"]}
+    if kinds != {"ORDER_MODIFIER"}:
+        return query
+    node["modifiers"] = []
+    return _deserialize(serialized)
+
+
+def _nodes(node: Any, kind: str, key: str = "type") -> List[Dict[str, Any]]:
+    """Every dict in a syntax tree whose key equals kind"""
+    found = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if current.get(key) == kind:
+                found.append(current)
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return found
+
+
+def _aggregate_functions() -> Set[str]:
+    """Names of DuckDB's aggregate functions"""
+    global _aggregates
+    with _parser_lock:
+        if _aggregates is None:
+            _aggregates = {
+                row[0].lower() for row in _parser.execute(
+                    "SELECT DISTINCT function_name FROM duckdb_functions() WHERE function_type = 'aggregate'"
+                ).fetchall()
+            }
+        return _aggregates
+
+
+def _unique_match(name: str, candidates: List[str]) -> Optional[str]:
+    """
+    The one candidate spelled like name, ignoring case and separators
+
+    Failing that, the one candidate a single typo away; names shorter
+    than TYPO_MIN_LENGTH are too short to tell a typo from another name.
+    """
+    normalized = normalize_identifier(name)
+    matches = {candidate for candidate in candidates if normalize_identifier(candidate) == normalized}
+    if not matches and len(normalized) >= TYPO_MIN_LENGTH:
+        matches = {
+            candidate for candidate in candidates
+            if edit_distance(normalize_identifier(candidate), normalized) == 1
+        }
+    return matches.pop() if len(matches) == 1 else None
+
+
+def _rewrite(kind: str, original: str, replacement: str, scored: Optional[str] = None) -> Dict[str, Any]:
+    """A name the query misspells and the identifier in scope it resolves to"""
+    return {
+        "kind": kind,
+        "original": original,
+        "replacement": replacement,
+        "similarity": round(similarity(scored or original, replacement), 3),
+    }
+
+
+def _references(tree: Dict[str, Any], kind: str, name: str) -> List[Dict[str, Any]]:
+    """Syntax tree nodes referring to a table or column by name, ignoring case"""
+    if kind == "table":
+        return [node for node in _nodes(tree, "BASE_TABLE") if node["table_name"].lower() == name.lower()]
+    return [
+        node for node in _nodes(tree, "COLUMN_REF", "class")
+        if node["column_names"][-1].lower() == name.lower()
+    ]
+
+
+def _column_rewrite(
+    tree: Dict[str, Any],
+    missing: str,
+    schema: Dict[str, List[Dict[str, Any]]]
+) -> Optional[Dict[str, Any]]:
+    """The schema's spelling of a misspelled column, see _rewrite"""
+    tables = {node["table_name"].lower() for node in _nodes(tree, "BASE_TABLE")}
+    candidates = [
+        column["name"]
+        for table, columns in schema.items()
+        if table.lower() in tables
+        for column in columns
+    ]
+    resolved = _unique_match(missing, candidates)
+    if resolved is None or resolved == missing or not _references(tree, "column", missing):
+        return None
+    return _rewrite("column", missing, resolved)
+
+
+def _table_rewrite(
+    tree: Dict[str, Any],
+    missing: str,
+    schema: Dict[str, List[Dict[str, Any]]]
+) -> Optional[Dict[str, Any]]:
+    """The table in scope a misspelled table, or its file name, refers to"""
+    name = _FILE_SUFFIX.sub("", missing)
+    resolved = _unique_match(name, list(schema))
+    if resolved is None or not _references(tree, "table", missing):
+        return None
+    return _rewrite("table", missing, resolved, scored=name)
+
+
+def _apply_rewrite(tree: Dict[str, Any], rewrite: Dict[str, Any]) -> str:
+    """Point every reference to the misspelled name at its replacement"""
+    for node in _references(tree, rewrite["kind"], rewrite["original"]):
+        if rewrite["kind"] == "table":
+            node["table_name"] = rewrite["replacement"]
+        else:
+            node["column_names"][-1] = rewrite["replacement"]
+    return f'{rewrite["kind"]} "{rewrite["original"]}" -> "{rewrite["replacement"]}"'
+
+
+def _fix_group_by(tree: Dict[str, Any], column: str) -> Optional[str]:
+    """Group by a column an aggregate query selects without grouping"""
+    aggregates = _aggregate_functions()
+    for node in _nodes(tree, "SELECT_NODE"):
+        aggregating = any(
+            function["function_name"].lower() in aggregates
+            for function in _nodes(node.get("select_list"), "FUNCTION", "class")
+        )
+        if not aggregating:
+            # An outer query selecting the same name is not the one that failed
+            continue
+        selected = [
+            reference for reference in _nodes(node.get("select_list"), "COLUMN_REF", "class")
+            if reference["column_names"][-1].lower() == column.lower()
+        ]
+        if not selected or node.get("aggregate_handling") != "STANDARD_HANDLING":
+            continue
+
+        if not node["group_expressions"]:
+            # No GROUP BY at all: group by every non-aggregate column
+            node["aggregate_handling"] = "FORCE_AGGREGATES"
+            return "added GROUP BY ALL"
+
+        if len(node["group_sets"]) != 1:
+            # GROUPING SETS, CUBE and ROLLUP are left to the model
+            return None
+        # Group by the reference as selected, keeping its table qualifier
+        node["group_expressions"].append({**selected[0], "alias": "", "column_names": list(selected[0]["column_names"])})
+        node["group_sets"][0].append(len(node["group_expressions"]) - 1)
+        return f'added "{column}" to GROUP BY'
+    return None
+
+
+def repair_statement(
+    query: str,
+    validate: Callable[[str], Optional[str]],
+    schema: Dict[str, List[Dict[str, Any]]],
+    max_repairs: int = MAX_REPAIRS
+) -> Dict[str, Any]:
+    """
+    Bind a statement and fix mechanical errors until it binds
+
+    Each round binds the statement; on a binder or catalog error one fix
+    is applied to its syntax tree and the rendered SQL is bound again.
+    Fixes only ever resolve a name to the single identifier in scope it
+    could have meant, or group by a column the query already selects,
+    so a repaired query asks for the same result as the original. A name
+    is only rewritten when it is at least AUTO_FIX_SIMILARITY alike its
+    match; otherwise the match is returned as a suggestion and the error
+    is left to the caller.
+
+    Args:
+        query: A single SQL statement
+        validate: Binds a query without running it; returns the error
+            message, or None if it binds
+        schema: Columns per table in scope, see DuckDBManager.schema_snapshot
+        max_repairs: Fixes to try before giving up
+
+    Returns:
+        Dictionary with the (repaired) query, whether it binds, the last
+        error, a description of each fix applied, the names rewritten
+        (kind, original, replacement and similarity) and the matches
+        not close enough to rewrite, in the same form
+    """
+    fixes: List[str] = []
+    rewrites: List[Dict[str, Any]] = []
+    suggestions: List[Dict[str, Any]] = []
+    if not is_select(query):
+        # DDL and DML are left to run as written
+        return {
+            "query": query,
+            "valid": True,
+            "error": None,
+            "fixes": fixes,
+            "rewrites": rewrites,
+            "suggestions": suggestions,
+        }
+
+    error = validate(query)
+    while error is not None and len(fixes) < max_repairs:
+        serialized = _serialize(query)
+        if serialized.get("error") or len(serialized["statements"]) != 1:
+            break
+        tree = serialized["statements"][0]
+
+        fix = None
+        rewrite = None
+        match = _COLUMN_NOT_FOUND.search(error)
+        if match:
+            rewrite = _column_rewrite(tree, match.group(1).replace('""', '"'), schema)
+        match = _TABLE_NOT_FOUND.search(error)
+        if rewrite is None and match:
+            missing = match.group(1) or match.group(2)
+            rewrite = _table_rewrite(tree, missing.strip('"').replace('""', '"'), schema)
+        if rewrite is not None:
+            if rewrite["similarity"] < AUTO_FIX_SIMILARITY:
+                suggestions.append(rewrite)
+                break
+            fix = _apply_rewrite(tree, rewrite)
+            rewrites.append(rewrite)
+        match = _MISSING_GROUP_BY.search(error)
+        if fix is None and match:
+            fix = _fix_group_by(tree, match.group(1).replace('""', '"'))
+        if fix is None:
+            break
+
+        query = _deserialize(serialized)
+        fixes.append(fix)
+        error = validate(query)
+
+    return {
+        "query": query,
+        "valid": error is None,
+        "error": error,
+        "fixes": fixes,
+        "rewrites": rewrites,
+        "suggestions": suggestions,
+    }
+
+
+def repair_query(
+    query: str,
+    validate: Callable[[str], Optional[str]],
+    schema: Dict[str, List[Dict[str, Any]]],
+    max_repairs: int = MAX_REPAIRS
+) -> Dict[str, Any]:
+    """
+    Bind every statement of a script and repair the ones that fail
+
+    Args:
+        query: One or more SQL statements, optionally in a markdown fence
+        validate: Binds a query without running it, see repair_statement
+        schema: Columns per table in scope
+        max_repairs: Fixes to try per statement
+
+    Returns:
+        Dictionary with the script, whether every statement binds, the
+        first remaining error, the fixes applied, and the rewritten and
+        suggested names, see repair_statement
+    """
+    try:
+        statements = split_statements(strip_sql_fences(query))
+    except duckdb.Error as e:
+        return {
+            "query": query,
+            "valid": False,
+            "error": str(e),
+            "fixes": [],
+            "rewrites": [],
+            "suggestions": [],
+        }
+
+    results = [repair_statement(statement, validate, schema, max_repairs) for statement in statements]
+    errors = [result["error"] for result in results if not result["valid"]]
+    fixes = [fix for result in results for fix in result["fixes"]]
+    return {
+        "query": ";\n".join(result["query"] for result in results) if fixes else query,
+        "valid": not errors,
+        "error": errors[0] if errors else None,
+        "fixes": fixes,
+        "rewrites": [rewrite for result in results for rewrite in result["rewrites"]],
+        "suggestions": [suggestion for result in results for suggestion in result["suggestions"]],
+    }
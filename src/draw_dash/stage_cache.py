@@ -0,0 +1,143 @@
+"""
+Stage output cache for DrawDash
+Content-addressed store of what each pipeline stage wrote to session state,
+so a re-run skips the stages whose inputs did not change
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Directory stage outputs are written to, one JSON file per key, so they
+# survive a restart. Unset keeps them in memory only.
+STAGE_CACHE_DIR = os.environ.get("DRAWDASH_STAGE_CACHE_DIR") or None
+
+# Stage outputs kept in memory
+STAGE_CACHE_ENTRIES = int(os.environ.get("DRAWDASH_STAGE_CACHE_ENTRIES", "256"))
+
+
+def hash_bytes(data: bytes) -> str:
+    """Hex digest of raw bytes, e.g. an uploaded image"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """Hex digest of a text, e.g. an agent instruction"""
+    return hash_bytes(text.encode())
+
+
+def stage_key(inputs: Dict[str, Any]) -> str:
+    """
+    Content address of a stage run
+
+    Args:
+        inputs: Everything the stage output depends on; must serialize to
+            JSON, values that do not are keyed by their str()
+
+    Returns:
+        Hex digest of the canonical JSON of the inputs
+    """
+    return hash_text(json.dumps(inputs, sort_keys=True, default=str))
+
+
+class StageCache:
+    """
+    LRU of stage outputs keyed on stage_key, optionally backed by a directory
+
+    An entry is what the stage wrote to session state plus its final text
+    response. Entries are never invalidated: a changed input is a
+    different key.
+    """
+
+    def __init__(self, directory: Optional[str] = STAGE_CACHE_DIR, max_entries: int = STAGE_CACHE_ENTRIES):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Directory to persist entries in; None keeps them in memory only
+            max_entries: Entries kept in memory
+        """
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The stored output for a key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+
+        if self.directory is not None and self._path(key).exists():
+            try:
+                entry = json.loads(self._path(key).read_text())
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None:
+                self._remember(key, entry)
+                with self._lock:
+                    self._hits += 1
+                return entry
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        """Store a stage output"""
+        self._remember(key, entry)
+        if self.directory is not None:
+            # Write then rename, so a concurrent reader never sees half a file
+            tmp = self._path(key).with_suffix(".tmp")
+            tmp.write_text(json.dumps(entry, default=str))
+            tmp.replace(self._path(key))
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache counters
+
+        Returns:
+            Dictionary with entries (in memory), hits, misses and directory
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "directory": str(self.directory) if self.directory is not None else None,
+            }
+
+
+_stage_cache: Optional[StageCache] = None
+_stage_cache_lock = threading.Lock()
+
+
+def get_stage_cache() -> StageCache:
+    """The process-wide stage cache"""
+    global _stage_cache
+    with _stage_cache_lock:
+        if _stage_cache is None:
+            _stage_cache = StageCache()
+        return _stage_cache
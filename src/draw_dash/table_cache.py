@@ -0,0 +1,242 @@
+"""
+Content-addressed table cache for DrawDash
+Lets identical uploads share one physical DuckDB table
+"""
+
+import copy
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+# Bytes read per step when hashing a file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def new_content_hasher():
+    """Create the hash object used to fingerprint dataset bytes"""
+    return hashlib.sha256()
+
+
+def hash_file(file_path: Path) -> str:
+    """
+    Hash the bytes of a file
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest of the file contents
+    """
+    hasher = new_content_hasher()
+    with open(file_path, "rb") as fp:
+        while True:
+            chunk = fp.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class TableCache:
+    """
+    Index from dataset contents to a shared physical table
+
+    Each entry maps a content key (hash of the file bytes plus the reader
+    that parsed them) to one physical table, its metadata and the session
+    views that point at it. The physical table is dropped once the last
+    view is released.
+
+    Not thread-safe: DuckDBManager serializes access together with the DDL
+    that creates and drops the tables.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}  # content_key -> entry
+        self._views: Dict[str, str] = {}  # view name -> content_key
+
+    @staticmethod
+    def content_key(digest: str, reader: str) -> str:
+        """
+        Build the cache key for a dataset
+
+        Args:
+            digest: Hex digest of the dataset bytes
+            reader: DuckDB reader (and options) used to parse the bytes
+
+        Returns:
+            Cache key
+        """
+        return hashlib.sha256(f"{reader}\0{digest}".encode()).hexdigest()
+
+    @staticmethod
+    def physical_table_name(content_key: str) -> str:
+        """Name of the physical table holding a dataset"""
+        return f"ds_{content_key[:32]}"
+
+    def __contains__(self, content_key: str) -> bool:
+        return content_key in self._entries
+
+    def load(self, entries: Dict[str, Dict[str, Any]]):
+        """
+        Restore entries saved by a previous process
+
+        Args:
+            entries: content_key -> entry with table_name, metadata,
+                sketches and views
+        """
+        for content_key, entry in entries.items():
+            self._entries[content_key] = entry
+            for view_name in entry["views"]:
+                self._views[view_name] = content_key
+
+    def physical_tables(self) -> List[str]:
+        """Names of all physical tables held by the cache"""
+        return [entry["table_name"] for entry in self._entries.values()]
+
+    def add(
+        self,
+        content_key: str,
+        table_name: str,
+        metadata: Dict[str, Any],
+        sketches: Optional[Dict[str, List[int]]] = None
+    ):
+        """
+        Register a newly ingested physical table
+
+        Args:
+            content_key: Cache key of the dataset
+            table_name: Physical table name
+            metadata: Profiled metadata of the table
+            sketches: Distinct-count sketches per column, kept for appends
+        """
+        self._entries[content_key] = {
+            "table_name": table_name,
+            "metadata": metadata,
+            "sketches": sketches,
+            "views": set(),
+        }
+
+    def rekey(
+        self,
+        content_key: str,
+        new_key: str,
+        table_name: str,
+        metadata: Dict[str, Any],
+        sketches: Optional[Dict[str, List[int]]] = None
+    ):
+        """
+        Move a dataset that changed in place (an append) to its new key
+
+        Args:
+            content_key: Current cache key of the dataset
+            new_key: Cache key of the changed contents
+            table_name: Physical table name under the new key
+            metadata: Metadata of the changed table
+            sketches: Distinct-count sketches of the changed table
+        """
+        entry = self._entries.pop(content_key)
+        entry.update(table_name=table_name, metadata=metadata, sketches=sketches)
+        self._entries[new_key] = entry
+        for view_name in entry["views"]:
+            self._views[view_name] = new_key
+
+    def acquire(self, content_key: str, view_name: str) -> Dict[str, Any]:
+        """
+        Add a view reference to a cached dataset
+
+        Args:
+            content_key: Cache key of the dataset
+            view_name: Session-visible name pointing at the dataset
+
+        Returns:
+            The cache entry
+        """
+        entry = self._entries[content_key]
+        entry["views"].add(view_name)
+        self._views[view_name] = content_key
+        return entry
+
+    def release(self, view_name: str) -> Optional[str]:
+        """
+        Drop a view reference
+
+        Args:
+            view_name: Session-visible name pointing at the dataset
+
+        Returns:
+            Physical table name if this was the last reference, else None
+        """
+        content_key = self._views.pop(view_name, None)
+        if content_key is None:
+            return None
+
+        entry = self._entries[content_key]
+        entry["views"].discard(view_name)
+        if entry["views"]:
+            return None
+
+        del self._entries[content_key]
+        return entry["table_name"]
+
+    def entry(self, content_key: str) -> Dict[str, Any]:
+        """Cache entry of a dataset: table_name, metadata, sketches and views"""
+        return self._entries[content_key]
+
+    def view_key(self, view_name: str) -> Optional[str]:
+        """Content key a view points at, or None"""
+        return self._views.get(view_name)
+
+    def is_view(self, view_name: str) -> bool:
+        """Check whether a name is a view onto a cached dataset"""
+        return view_name in self._views
+
+    def metadata(self, view_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached metadata for a view
+
+        Args:
+            view_name: Session-visible name pointing at the dataset
+
+        Returns:
+            Copy of the metadata with table_name set to the view, or None
+        """
+        content_key = self._views.get(view_name)
+        if content_key is None:
+            return None
+
+        metadata = copy.deepcopy(self._entries[content_key]["metadata"])
+        metadata["table_name"] = view_name
+        return metadata
+
+    def update_metadata(
+        self,
+        view_name: str,
+        metadata: Dict[str, Any],
+        sketches: Optional[Dict[str, List[int]]] = None
+    ):
+        """
+        Replace the cached metadata of the dataset behind a view
+
+        Args:
+            view_name: Session-visible name pointing at the dataset
+            metadata: New metadata, e.g. once column stats are computed
+            sketches: Distinct-count sketches taken with the new stats;
+                None keeps the current ones
+        """
+        content_key = self._views.get(view_name)
+        if content_key is None:
+            return
+
+        entry = self._entries[content_key]
+        metadata = copy.deepcopy(metadata)
+        metadata["table_name"] = entry["table_name"]
+        entry["metadata"] = metadata
+        if sketches is not None:
+            entry["sketches"] = sketches
+
+    def stats(self) -> Dict[str, int]:
+        """Number of distinct datasets and of views referencing them"""
+        return {
+            "datasets": len(self._entries),
+            "views": len(self._views),
+        }
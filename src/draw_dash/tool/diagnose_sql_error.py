@@ -1,15 +1,45 @@
-import duckdb
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List
 
+from draw_dash.catalog import get_catalog
 
-def diagnose_sql_error(query: str, error_message: str) -> Dict[str, Any]:
+# Names DuckDB reports as missing, for errors without structured details
+_MISSING_NAME_PATTERNS = [
+    re.compile(r'Referenced column "((?:[^"]|"")+)" not found', re.IGNORECASE),
+    re.compile(r'does not have a column named "((?:[^"]|"")+)"', re.IGNORECASE),
+    re.compile(r'Table with name ((?:[^!"]|"")+?) does not exist', re.IGNORECASE),
+    re.compile(r'Referenced table "((?:[^"]|"")+)" not found', re.IGNORECASE),
+]
+
+
+def _missing_name(error_message: str, details: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The table or column name an error says was not found"""
+    if details and details.get("name"):
+        return details["name"]
+    for pattern in _MISSING_NAME_PATTERNS:
+        match = pattern.search(error_message)
+        if match:
+            return match.group(1).strip('"').replace('""', '"')
+    return None
+
+
+def _ranked_hint(missing: str, candidates: List[Dict[str, Any]]) -> str:
+    """Hint naming the closest identifiers, best first"""
+    ranked = ", ".join(f"{c['name']} ({c['table']}, {c['score']:.2f})" for c in candidates)
+    return f"Closest matches for '{missing}': {ranked}"
+
+
+def diagnose_sql_error(query: str, error_message: str, tables: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Diagnoses SQL execution errors and provides detailed analysis for query correction.
+    Schema information comes from the catalog's cached schema snapshot, so no catalog
+    queries run unless a table changed since the last diagnosis.
     
     Args:
         query (str): The failed SQL query
         error_message (str): The error message from the database
+        tables (list, optional): Tables in scope, e.g. those the session ingested.
+            Defaults to every table in the catalog.
         
     Returns:
         Dict containing error analysis and suggestions for fixing the query
@@ -19,39 +49,66 @@ def diagnose_sql_error(query: str, error_message: str) -> Dict[str, Any]:
         "error_details": error_message,
         "suggestions": [],
         "schema_info": {},
-        "corrected_query_hints": []
+        "corrected_query_hints": [],
+        "candidates": []
     }
     
     # Get current database schema information
+    available_tables = []
     try:
-        # Get all tables
-        tables_result = duckdb.sql("SHOW TABLES").fetchall()
-        available_tables = [table[0] for table in tables_result]
+        # Get the tables in scope
+        snapshot = get_catalog().schema_snapshot(tables or None)
+        available_tables = list(snapshot["tables"])
         diagnosis["schema_info"]["available_tables"] = available_tables
         
         # Get column information for each table
-        for table in available_tables:
-            try:
-                columns_result = duckdb.sql(f"DESCRIBE {table}").fetchall()
-                diagnosis["schema_info"][table] = {
-                    "columns": [{"name": col[0], "type": col[1]} for col in columns_result]
-                }
-            except Exception:
-                continue
+        for table, columns in snapshot["tables"].items():
+            diagnosis["schema_info"][table] = {
+                "columns": [{"name": col["name"], "type": col["type"]} for col in columns]
+            }
                 
     except Exception as e:
         diagnosis["schema_info"]["error"] = f"Could not retrieve schema: {str(e)}"
     
     # Analyze error types and provide specific suggestions
     error_lower = error_message.lower()
+
+    # Binder and catalog errors are re-bound for DuckDB's structured details
+    details = None
+    if "binder error" in error_lower or "catalog error" in error_lower:
+        try:
+            details = get_catalog().bind_error(query)
+        except Exception:
+            details = None
+    subtype = (details or {}).get("subtype")
     
+    # Queries stopped by the watchdog
+    if "query timeout" in error_lower:
+        diagnosis["error_type"] = "timeout"
+        diagnosis["suggestions"].extend([
+            "Query exceeded its time limit and was interrupted",
+            "Remove cross joins and make sure every JOIN has an ON condition",
+            "Filter and aggregate before joining instead of after",
+            "Add a LIMIT when only a preview of the rows is needed"
+        ])
+        if re.search(r'\bCROSS\s+JOIN\b', query, re.IGNORECASE) or re.search(r'\bFROM\s+\w+\s*,\s*\w+', query, re.IGNORECASE):
+            diagnosis["corrected_query_hints"].append(
+                "The query contains a cross join; replace it with a JOIN ... ON on a key column"
+            )
+
+    elif "query cancelled" in error_lower:
+        diagnosis["error_type"] = "cancelled"
+        diagnosis["suggestions"].extend([
+            "Query was cancelled on request",
+            "Do not retry the same query unchanged"
+        ])
+
     # Table/Column not found errors
-    if "table" in error_lower and ("not found" in error_lower or "does not exist" in error_lower):
+    elif (subtype == "MISSING_ENTRY" and details.get("entry_type") == "Table") or (
+        subtype is None and "table" in error_lower and ("not found" in error_lower or "does not exist" in error_lower)
+    ):
         diagnosis["error_type"] = "table_not_found"
-        
-        # Extract table name from query
-        table_matches = re.findall(r'\bFROM\s+(\w+)', query, re.IGNORECASE)
-        table_matches.extend(re.findall(r'\bJOIN\s+(\w+)', query, re.IGNORECASE))
+        missing_table = _missing_name(error_message, details)
         
         diagnosis["suggestions"].extend([
             f"Table not found. Available tables: {', '.join(available_tables)}",
@@ -59,36 +116,41 @@ def diagnose_sql_error(query: str, error_message: str) -> Dict[str, Any]:
             "Ensure the table exists in the current database"
         ])
         
-        if table_matches:
-            diagnosis["corrected_query_hints"].append(
-                f"Replace table name '{table_matches[0]}' with one of: {', '.join(available_tables)}"
-            )
+        if missing_table:
+            try:
+                diagnosis["candidates"] = get_catalog().resolve(missing_table, "table", tables or None)
+            except Exception:
+                diagnosis["candidates"] = []
+            if diagnosis["candidates"]:
+                diagnosis["corrected_query_hints"].append(
+                    f"Replace table name '{missing_table}' with '{diagnosis['candidates'][0]['name']}'"
+                )
+                diagnosis["corrected_query_hints"].append(_ranked_hint(missing_table, diagnosis["candidates"]))
     
-    elif "column" in error_lower and ("not found" in error_lower or "does not exist" in error_lower):
+    elif subtype == "COLUMN_NOT_FOUND" or (
+        "column" in error_lower and ("not found" in error_lower or "does not exist" in error_lower or "does not have a column" in error_lower)
+    ):
         diagnosis["error_type"] = "column_not_found"
+        missing_column = _missing_name(error_message, details)
         
-        # Extract column references from error message
-        column_match = re.search(r"column['\"]?\s*([^'\"]*)['\"]?", error_message, re.IGNORECASE)
-        if column_match:
-            missing_column = column_match.group(1).strip()
+        if missing_column:
             diagnosis["suggestions"].extend([
                 f"Column '{missing_column}' not found",
                 "Check column name spelling and case sensitivity",
                 "Verify the column exists in the specified table"
             ])
             
-            # Suggest similar column names
-            for table, info in diagnosis["schema_info"].items():
-                if isinstance(info, dict) and "columns" in info:
-                    similar_columns = [
-                        col["name"] for col in info["columns"] 
-                        if missing_column.lower() in col["name"].lower() or 
-                           col["name"].lower() in missing_column.lower()
-                    ]
-                    if similar_columns:
-                        diagnosis["corrected_query_hints"].append(
-                            f"In table '{table}', similar columns: {', '.join(similar_columns)}"
-                        )
+            # Rank columns of the tables in scope by similarity
+            try:
+                diagnosis["candidates"] = get_catalog().resolve(missing_column, "column", tables or None)
+            except Exception:
+                diagnosis["candidates"] = []
+            if diagnosis["candidates"]:
+                best = diagnosis["candidates"][0]
+                diagnosis["corrected_query_hints"].append(
+                    f"Replace column '{missing_column}' with '{best['name']}' from table '{best['table']}'"
+                )
+                diagnosis["corrected_query_hints"].append(_ranked_hint(missing_column, diagnosis["candidates"]))
     
     # Syntax errors
     elif "syntax error" in error_lower or "parser error" in error_lower:
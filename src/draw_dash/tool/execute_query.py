@@ -1,29 +1,45 @@
-import duckdb
+import json
+from typing import Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+from draw_dash.catalog import get_catalog
+from draw_dash.result_preview import preview_query
+from .read_data import SESSION_TABLES_KEY
 from .diagnose_sql_error import diagnose_sql_error, format_diagnosis_for_agent
 
 
-def execute_query(query: str):
+def execute_query(query: str, tool_context: Optional[ToolContext] = None):
     """
-    Executes a query against the database with enhanced error handling and diagnosis.
+    Executes a query against the shared catalog with enhanced error handling and diagnosis.
+    Queries running past the watchdog deadline are interrupted and diagnosed as timeouts.
+    Diagnosis covers the tables this session ingested, or every table if it ingested none.
+    Only the first PREVIEW_ROWS rows are produced, with a summary of the whole result.
 
     Args:
         query (str): The query to execute.
         
     Returns:
-        pandas.DataFrame or str: Query results as dataframe or detailed error diagnosis
+        str: JSON object with the total row_count, whether rows were truncated,
+        the first rows as records and per-column min, max and null_count,
+        or a detailed error diagnosis
     """
     try:
-        result = duckdb.sql(query)
-    except duckdb.Error as error:
+        preview = preview_query(get_catalog(), query)
+    except Exception as error:
         # Generate detailed diagnosis for the error
-        diagnosis = diagnose_sql_error(query, str(error))
+        tables = tool_context.state.get(SESSION_TABLES_KEY) if tool_context is not None else None
+        diagnosis = diagnose_sql_error(query, str(error), tables)
         formatted_diagnosis = format_diagnosis_for_agent(diagnosis)
         
         return f"QUERY EXECUTION FAILED:\n{formatted_diagnosis}"
 
-    if result is None:
+    if preview["rows"].num_columns == 0:
         return "Query executed successfully with no results."
 
-    # Convert dataframe to JSON string for serialization
-    df = result.df()
-    return df.to_json(orient='records')
\ No newline at end of file
+    return json.dumps({
+        "row_count": preview["row_count"],
+        "truncated": preview["truncated"],
+        "rows": preview["rows"].to_pylist(),
+        "summary": preview["summary"],
+    }, default=str)
@@ -1,15 +1,17 @@
 import os
 
-import duckdb
-import pandas as pd
-from pathlib import Path
 from typing import Dict, Any, Optional
 import json
 
+from google.adk.tools.tool_context import ToolContext
+
+from draw_dash.catalog import get_catalog
 from draw_dash.db import PATH_DATA
+from draw_dash.result_preview import preview_query, format_summary
+
+# Session state key listing the tables this agent session ingested
+SESSION_TABLES_KEY = "session_tables"
 
-# Global database connection
-_connection: Optional[duckdb.DuckDBPyConnection] = None
 
 def read_data_files():
     return [
@@ -18,31 +20,17 @@ def read_data_files():
     ]
 
 
-def connect_to_db(db_path: Optional[str] = None) -> None:
-    """
-    Initialize the DuckDB connection.
-
-    Args:
-        db_path: Path to the DuckDB database file. If None, uses an in-memory database.
+def ingest_file(
+    file_path: str,
+    table_name: str = "dataset",
+    tool_context: Optional[ToolContext] = None
+) -> Dict[str, Any]:
     """
-    global _connection
-    if _connection:
-        _connection.close()  # Close existing connection if any
-    _connection = duckdb.connect(db_path or ":memory:")
+    Ingest a file into the shared DuckDB catalog.
 
-connect_to_db()
-
-def close_db_connection() -> None:
-    """Close the database connection."""
-    global _connection
-    if _connection:
-        _connection.close()
-        _connection = None
-
-
-def ingest_file(file_path: str, table_name: str = "dataset") -> Dict[str, Any]:
-    """
-    Ingest a file into DuckDB.
+    Files the backend or another agent already ingested are attached without
+    being read again. The table is recorded in the session state, which
+    scopes SQL error diagnosis to the session's own tables.
 
     Args:
         file_path: Path to the file (CSV, JSON, or Parquet).
@@ -51,28 +39,17 @@ def ingest_file(file_path: str, table_name: str = "dataset") -> Dict[str, Any]:
     Returns:
         Metadata dictionary with schema, row count, etc.
     """
-    if not _connection:
-        raise ConnectionError("Database connection is not initialized. Call connect_to_db() first.")
-
-    file_path_obj = Path(file_path)
-    if not file_path_obj.exists():
-        raise FileNotFoundError(f"File not found: {file_path_obj}")
-
-    suffix = file_path_obj.suffix.lower()
     try:
-        if suffix == ".csv":
-            _connection.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_csv_auto('{file_path}')")
-        elif suffix == ".json":
-            _connection.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_json_auto('{file_path}')")
-        elif suffix == ".parquet":
-            _connection.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_parquet('{file_path}')")
-        else:
-            raise ValueError(f"Unsupported file type: {suffix}")
-
-        return get_table_metadata(table_name)
+        metadata = get_catalog().ingest_file(file_path, table_name)
     except Exception as e:
         raise Exception(f"Failed to ingest file: {e}")
 
+    if tool_context is not None:
+        tables = list(tool_context.state.get(SESSION_TABLES_KEY) or [])
+        if table_name not in tables:
+            tool_context.state[SESSION_TABLES_KEY] = tables + [table_name]
+    return metadata
+
 
 def get_table_metadata(table_name: str = "dataset") -> Dict[str, Any]:
     """
@@ -84,69 +61,41 @@ def get_table_metadata(table_name: str = "dataset") -> Dict[str, Any]:
     Returns:
         Dictionary with metadata.
     """
-    if not _connection:
-        raise ConnectionError("Database connection is not initialized. Call connect_to_db() first.")
-
     try:
-        row_count = _connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
-        schema_info = _connection.execute(f"DESCRIBE {table_name}").fetchall()
-
-        columns = [{"name": col[0], "type": col[1], "null": col[2] if len(col) > 2 else "YES"} for col in schema_info]
-
-        column_stats = {}
-        for col in columns:
-            col_name, col_type = col["name"], col["type"].upper()
-
-            try:
-                if any(t in col_type for t in ["INT", "FLOAT", "DOUBLE", "DECIMAL", "NUMERIC"]):
-                    stats = _connection.execute(
-                        f"SELECT MIN({col_name}), MAX({col_name}), AVG({col_name}), COUNT(DISTINCT {col_name}) FROM {table_name}").fetchone()
-                    column_stats[col_name] = {
-                        "min": float(stats[0]) if stats[0] is not None else None,
-                        "max": float(stats[1]) if stats[1] is not None else None,
-                        "avg": float(stats[2]) if stats[2] is not None else None,
-                        "distinct_count": int(stats[3]) if stats[3] is not None else None
-                    }
-                elif "VARCHAR" in col_type or "TEXT" in col_type:
-                    distinct_count = \
-                    _connection.execute(f"SELECT COUNT(DISTINCT {col_name}) FROM {table_name}").fetchone()[0]
-                    column_stats[col_name] = {"distinct_count": int(distinct_count)}
-            except Exception:
-                pass  # Skip if stats extraction fails
-
-        sample_data = _connection.execute(f"SELECT * FROM {table_name} LIMIT 5").fetchdf().to_dict('records')
-        import json
-
-        return json.dumps({
-            "table_name": table_name,
-            "row_count": row_count,
-            "column_count": len(columns),
-            "columns": columns,
-            "column_stats": column_stats,
-            "sample_data": sample_data,
-        })
+        return json.dumps(get_catalog().table_metadata(table_name), default=str)
     except Exception as e:
         raise Exception(f"Failed to extract metadata: {e}")
 
 
-def execute_query(query: str) -> pd.DataFrame:
+def execute_query(query: str) -> str:
     """
-    Execute a SQL query and return results as a DataFrame.
+    Execute a SQL query and return its first rows with a summary of the result.
+
+    The row limit is pushed into the query plan, so only PREVIEW_ROWS rows
+    are produced however large the result is.
 
     Args:
         query: SQL query string.
 
     Returns:
-        Pandas DataFrame with results.
+        Markdown table of the first rows, the total row count, and the
+        min, max and null count of every column.
     """
-    if not _connection:
-        raise ConnectionError("Database connection is not initialized. Call connect_to_db() first.")
-
     try:
-        return _connection.execute(query).fetchdf().head(50).to_markdown()
+        preview = preview_query(get_catalog(), query)
     except Exception as e:
         raise Exception(f"Query execution failed: {e}")
 
+    shown = preview["rows"].num_rows
+    parts = [
+        preview["rows"].to_pandas().to_markdown(),
+        f"Rows: {preview['row_count']}" + (f" (showing first {shown})" if preview["truncated"] else ""),
+    ]
+    summary = format_summary(preview)
+    if summary is not None:
+        parts.append(summary)
+    return "\n\n".join(parts)
+
 
 def get_table_list() -> list:
     """
@@ -155,11 +104,7 @@ def get_table_list() -> list:
     Returns:
         List of table names.
     """
-    if not _connection:
-        raise ConnectionError("Database connection is not initialized. Call connect_to_db() first.")
-
-    tables = _connection.execute("SHOW TABLES").fetchall()
-    return [table[0] for table in tables]
+    return get_catalog().table_list()
 
 
 def drop_table(table_name: str) -> None:
@@ -169,10 +114,7 @@ def drop_table(table_name: str) -> None:
     Args:
         table_name: Name of the table to drop.
     """
-    if not _connection:
-        raise ConnectionError("Database connection is not initialized. Call connect_to_db() first.")
-
     try:
-        _connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+        get_catalog().drop_table(table_name)
     except Exception as e:
         raise Exception(f"Failed to drop table: {e}")
@@ -0,0 +1,43 @@
+from typing import Dict, Any, Optional, List
+
+from google.adk.tools.tool_context import ToolContext
+
+from draw_dash.catalog import get_catalog
+from draw_dash.sql_repair import repair_query
+from .read_data import SESSION_TABLES_KEY
+
+
+def validate_query(query: str, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Checks a query against the database without running it and fixes mechanical errors.
+    Misspelled table or column names that match exactly one name in the schema, ignoring
+    case, spaces and underscores, are corrected, and selected columns missing from
+    GROUP BY are added to it. A typo is only corrected when the name is close enough to
+    its match; otherwise the match is returned in suggestions and the query is left as is.
+
+    Args:
+        query (str): The SQL query to check.
+
+    Returns:
+        dict: The (repaired) query, whether it is valid, the remaining error if any,
+            the fixes applied, the names rewritten (original and replacement) and the
+            names suggested but not applied
+    """
+    tables = tool_context.state.get(SESSION_TABLES_KEY) if tool_context is not None else None
+    return check_query(query, tables)
+
+
+def check_query(query: str, tables: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Bind a query and repair it against the schema of the tables in scope
+
+    Args:
+        query: SQL query, optionally in a markdown fence
+        tables: Tables the session owns; every table if None
+
+    Returns:
+        See sql_repair.repair_query
+    """
+    catalog = get_catalog()
+    schema = catalog.schema_snapshot(tables or None)["tables"]
+    return repair_query(query, catalog.validate, schema)
@@ -0,0 +1,298 @@
+"""
+Chunked uploads for DrawDash
+Receives large datasets in independently retried, checksummed parts
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+from draw_dash.memory_budget import env_megabytes
+
+# Default and maximum bytes per part
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Largest file accepted through chunked upload
+MAX_UPLOAD_SIZE = env_megabytes("DRAWDASH_MAX_UPLOAD_MB", 32 * 1024)
+
+# Seconds an unfinished or unclaimed upload is kept before it is discarded
+UPLOAD_TTL = float(os.environ.get("DRAWDASH_UPLOAD_TTL", str(24 * 3600)))
+
+# Where parts are written
+UPLOAD_DIRECTORY = Path(tempfile.gettempdir()) / "drawdash" / "uploads"
+
+
+class UploadManager:
+    """
+    Tracks chunked uploads and writes their parts in place
+
+    init preallocates the destination file, and each part is written at
+    its own offset, so parts can arrive in any order and in parallel and
+    no part is ever copied again. A part whose checksum does not match is
+    rejected and can simply be re-sent. status lists the parts still
+    missing, which is all a client needs to resume after a dropped
+    connection. Once complete, the file is handed to ingest as is.
+    """
+
+    def __init__(self, directory: Path = UPLOAD_DIRECTORY, ttl: float = UPLOAD_TTL):
+        """
+        Initialize the manager
+
+        Args:
+            directory: Directory holding one subdirectory per upload
+            ttl: Idle seconds after which an upload is discarded
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+
+        self._uploads: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, filename: str, size: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Start an upload
+
+        Args:
+            filename: Original file name, kept for the file type
+            size: Total bytes of the file
+            chunk_size: Bytes per part; every part but the last has this size
+
+        Returns:
+            Upload status, see status
+        """
+        if size <= 0:
+            raise ValueError("Upload size must be positive")
+        if MAX_UPLOAD_SIZE is not None and size > MAX_UPLOAD_SIZE:
+            raise ValueError(
+                f"{filename} exceeds the {MAX_UPLOAD_SIZE / (1024 * 1024):.0f} MB upload limit"
+            )
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE} bytes")
+
+        upload_id = uuid.uuid4().hex
+        upload_dir = self.directory / upload_id
+        upload_dir.mkdir(parents=True, exist_ok=True)
+
+        # Keep only the final name component; the suffix selects the reader
+        path = upload_dir / Path(filename).name
+        with path.open("wb") as fp:
+            fp.truncate(size)
+
+        with self._lock:
+            self._uploads[upload_id] = {
+                "filename": Path(filename).name,
+                "path": path,
+                "size": size,
+                "chunk_size": chunk_size,
+                "part_count": -(-size // chunk_size),
+                "received": set(),
+                "complete": False,
+                "touched": time.monotonic(),
+            }
+        return self.status(upload_id)
+
+    def _get(self, upload_id: str) -> Dict[str, Any]:
+        """Look up an upload. Caller holds the lock."""
+        upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise KeyError(f"Upload {upload_id} not found")
+        upload["touched"] = time.monotonic()
+        return upload
+
+    def write_part(
+        self,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+        checksum: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Store one part
+
+        Writing the same part twice is harmless, so clients retry freely.
+
+        Args:
+            upload_id: Upload identifier
+            part_number: Zero-based index of the part
+            data: Bytes of the part
+            checksum: Expected SHA-256 hex digest of data
+
+        Returns:
+            Upload status, see status
+        """
+        with self._lock:
+            upload = self._get(upload_id)
+            if upload["complete"]:
+                raise ValueError("Upload is already complete")
+            if not 0 <= part_number < upload["part_count"]:
+                raise ValueError(f"Part number must be between 0 and {upload['part_count'] - 1}")
+            offset = part_number * upload["chunk_size"]
+            expected = min(upload["chunk_size"], upload["size"] - offset)
+            path = upload["path"]
+
+        if len(data) != expected:
+            raise ValueError(f"Part {part_number} must be {expected} bytes, got {len(data)}")
+        if checksum is not None and hashlib.sha256(data).hexdigest() != checksum.lower():
+            raise ValueError(f"Checksum mismatch for part {part_number}")
+
+        fd = os.open(path, os.O_WRONLY)
+        try:
+            os.pwrite(fd, data, offset)
+        finally:
+            os.close(fd)
+
+        with self._lock:
+            self._get(upload_id)["received"].add(part_number)
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """
+        Progress of an upload
+
+        Returns:
+            Dictionary with upload_id, filename, size, chunk_size,
+            part_count, received and missing part numbers, and complete
+        """
+        with self._lock:
+            upload = self._get(upload_id)
+            received = sorted(upload["received"])
+            return {
+                "upload_id": upload_id,
+                "filename": upload["filename"],
+                "size": upload["size"],
+                "chunk_size": upload["chunk_size"],
+                "part_count": upload["part_count"],
+                "received": received,
+                "missing": sorted(set(range(upload["part_count"])) - upload["received"]),
+                "complete": upload["complete"],
+            }
+
+    def complete(self, upload_id: str, sha256: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Finish an upload once every part is in
+
+        Args:
+            upload_id: Upload identifier
+            sha256: Optional SHA-256 hex digest of the whole file to verify
+
+        Returns:
+            Upload status, see status
+        """
+        with self._lock:
+            upload = self._get(upload_id)
+            missing = upload["part_count"] - len(upload["received"])
+            path = upload["path"]
+
+        if missing:
+            raise ValueError(f"{missing} part(s) still missing")
+
+        if sha256 is not None:
+            hasher = hashlib.sha256()
+            with open(path, "rb") as fp:
+                for chunk in iter(lambda: fp.read(UPLOAD_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+            if hasher.hexdigest() != sha256.lower():
+                raise ValueError("Checksum mismatch for the assembled file")
+
+        with self._lock:
+            self._get(upload_id)["complete"] = True
+        return self.status(upload_id)
+
+    def claim(self, upload_id: str, destination: Path) -> Dict[str, Any]:
+        """
+        Hand a completed upload over to an ingest
+
+        The file is moved, not copied, and the upload is forgotten. Its
+        name is prefixed with the upload id, so uploads sharing a file name
+        never overwrite each other in one destination.
+
+        Args:
+            upload_id: Upload identifier
+            destination: Directory to move the file into
+
+        Returns:
+            Dictionary with upload_id, filename, size, chunk_size and path
+            of the moved file; pass it to unclaim to give the upload back
+        """
+        with self._lock:
+            upload = self._get(upload_id)
+            if not upload["complete"]:
+                raise ValueError(f"Upload {upload_id} is not complete")
+            del self._uploads[upload_id]
+
+        path = Path(destination) / f"{upload_id}_{upload['filename']}"
+        os.replace(upload["path"], path)
+        shutil.rmtree(upload["path"].parent, ignore_errors=True)
+        return {
+            "upload_id": upload_id,
+            "filename": upload["filename"],
+            "size": upload["size"],
+            "chunk_size": upload["chunk_size"],
+            "path": str(path),
+        }
+
+    def unclaim(self, claimed: Dict[str, Any]):
+        """
+        Give a claimed upload back after its ingest failed
+
+        The file is moved back and the upload is complete again, so the
+        client can retry the ingest without uploading it a second time.
+
+        Args:
+            claimed: Dictionary returned by claim
+        """
+        upload_id = claimed["upload_id"]
+        upload_dir = self.directory / upload_id
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        path = upload_dir / claimed["filename"]
+        os.replace(claimed["path"], path)
+
+        part_count = -(-claimed["size"] // claimed["chunk_size"])
+        with self._lock:
+            self._uploads[upload_id] = {
+                "filename": claimed["filename"],
+                "path": path,
+                "size": claimed["size"],
+                "chunk_size": claimed["chunk_size"],
+                "part_count": part_count,
+                "received": set(range(part_count)),
+                "complete": True,
+                "touched": time.monotonic(),
+            }
+
+    def discard(self, upload_id: str) -> bool:
+        """
+        Abort an upload and delete its parts
+
+        Returns:
+            True if the upload existed
+        """
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is None:
+            return False
+        shutil.rmtree(upload["path"].parent, ignore_errors=True)
+        return True
+
+    def sweep(self) -> List[str]:
+        """
+        Discard uploads idle for longer than the TTL
+
+        Returns:
+            Discarded upload ids
+        """
+        cutoff = time.monotonic() - self.ttl
+        with self._lock:
+            stale = [upload_id for upload_id, upload in self._uploads.items() if upload["touched"] < cutoff]
+        return [upload_id for upload_id in stale if self.discard(upload_id)]
+
+
+# Global chunked upload manager
+upload_manager = UploadManager()
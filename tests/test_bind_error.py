@@ -0,0 +1,25 @@
+"""
+Tests for binding queries without running them
+"""
+
+from draw_dash.duckdb_manager import DuckDBManager
+
+
+def test_trailing_statements_are_not_run():
+    manager = DuckDBManager(query_cache_bytes=0)
+    manager.connection.execute("CREATE TABLE t AS SELECT 1 AS x")
+
+    for query in ["EXPLAIN SELECT * FROM t; DROP TABLE t", "SELECT * FROM t; DROP TABLE t", "DROP TABLE t"]:
+        assert manager.bind_error(query) is not None
+
+    assert manager.connection.execute("SELECT count(*) FROM t").fetchone() == (1,)
+
+
+def test_binds_a_single_select():
+    manager = DuckDBManager(query_cache_bytes=0)
+    manager.connection.execute("CREATE TABLE t AS SELECT 1 AS x")
+
+    assert manager.bind_error("SELECT x FROM t -- the answer") is None
+    error = manager.bind_error("  SELECT y FROM t;")
+    assert error["subtype"] == "COLUMN_NOT_FOUND"
+    assert error["position"] == 9
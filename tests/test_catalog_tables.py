@@ -0,0 +1,138 @@
+"""
+Tests for the shared catalog endpoints under /api/tables
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from draw_dash.backend import app
+from draw_dash.catalog import LocalCatalog
+from draw_dash.duckdb_manager import DuckDBManager
+
+SCREENSHOT = ("sketch.png", b"\x89PNG\r\n\x1a\n", "image/png")
+CSV = b"id,value\n1,a\n2,b\n"
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def session_table(client):
+    """A table ingested by a session, not through /api/tables"""
+    response = client.post(
+        "/api/ingest",
+        files={"screenshot": SCREENSHOT, "datasets": ("owned.csv", CSV, "text/csv")},
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    yield body["tables"][0]["table_name"]
+    client.delete(f"/api/session/{body['session_id']}")
+
+
+def test_lists_only_catalog_tables(client, session_table):
+    assert client.post("/api/tables", files={"dataset": ("c.csv", CSV, "text/csv")}, data={"table_name": "shared"}).status_code == 200
+
+    tables = client.get("/api/tables").json()["tables"]
+
+    assert tables == ["shared"]
+    assert client.get(f"/api/tables/{session_table}/metadata").status_code == 404
+    assert client.delete("/api/tables/shared").status_code == 200
+
+
+def test_cannot_drop_session_views_or_cache_tables(client, session_table):
+    tables = client.post("/api/query", json={"query": "SHOW TABLES", "format": "json"}).json()
+    physical = [row["name"] for row in tables if row["name"].startswith("ds_")]
+    assert physical
+
+    assert client.delete(f"/api/tables/{session_table}").status_code == 404
+    assert client.delete(f"/api/tables/{physical[0]}").status_code == 404
+    rows = client.post("/api/query", json={"query": f"SELECT count(*) AS n FROM {session_table}", "format": "json"})
+    assert rows.json() == [{"n": 2}]
+
+
+def test_cannot_replace_a_session_view(client, session_table):
+    response = client.post("/api/tables", files={"dataset": ("c.csv", CSV, "text/csv")}, data={"table_name": session_table})
+
+    assert response.status_code == 409
+
+
+def test_profiles_tables_whose_names_need_quoting(client):
+    response = client.post("/api/tables", files={"dataset": ("c.csv", CSV, "text/csv")}, data={"table_name": "Q4 Sales"})
+    assert response.status_code == 200, response.text
+
+    metadata = client.get("/api/tables/Q4 Sales/metadata")
+    columns = client.get("/api/tables/Q4 Sales/columns")
+
+    assert metadata.status_code == 200, metadata.text
+    assert metadata.json()["row_count"] == 2
+    assert [column["name"] for column in columns.json()["columns"]] == ["id", "value"]
+    assert client.delete("/api/tables/Q4 Sales").status_code == 200
+
+
+def test_catalog_tables_survive_a_restart(tmp_path):
+    db_path = str(tmp_path / "catalog.duckdb")
+    dataset = tmp_path / "c.csv"
+    dataset.write_bytes(CSV)
+    manager = DuckDBManager(db_path=db_path, query_cache_bytes=0)
+    manager.ingest_file(str(dataset), "session_view")
+    LocalCatalog(manager).ingest_file(str(dataset), "shared")
+    manager.close()
+
+    restarted = DuckDBManager(db_path=db_path, query_cache_bytes=0)
+    catalog = LocalCatalog(restarted)
+
+    assert restarted.catalog_tables() == {"shared": {"file_size": len(CSV)}}
+    assert catalog.table_list() == ["shared"]
+    with pytest.raises(KeyError):
+        catalog.drop_table("session_view")
+    catalog.drop_table("shared")
+    assert catalog.table_list() == []
+    restarted.close()
+
+    assert DuckDBManager(db_path=db_path, query_cache_bytes=0).catalog_tables() == {}
+
+
+RESTART = textwrap.dedent("""
+    import json, sys
+    from fastapi.testclient import TestClient
+    from draw_dash.backend import app, CATALOG_SESSION
+    from draw_dash.memory_budget import memory_budget
+
+    with TestClient(app) as client:
+        if sys.argv[1] == "ingest":
+            response = client.post("/api/tables", files={"dataset": ("c.csv", b"id\\n1\\n", "text/csv")}, data={"table_name": "shared"})
+            assert response.status_code == 200, response.text
+        else:
+            print(json.dumps({
+                "tables": client.get("/api/tables").json()["tables"],
+                "charged": memory_budget.usage(CATALOG_SESSION)["bytes"],
+                "drop": client.delete("/api/tables/shared").status_code,
+            }))
+""")
+
+
+def test_backend_keeps_catalog_tables_across_restarts(tmp_path):
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    env = {**os.environ, "PYTHONPATH": src, "DRAWDASH_DB_PATH": str(tmp_path / "catalog.duckdb")}
+
+    def run(step):
+        result = subprocess.run([sys.executable, "-c", RESTART, step], env=env, capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+
+    run("ingest")
+    after = json.loads(run("check").strip().splitlines()[-1])
+
+    assert after["tables"] == ["shared"]
+    assert after["charged"] > 0
+    assert after["drop"] == 200
@@ -0,0 +1,37 @@
+"""
+Tests for catalog calls made from many threads at once
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+SCRIPT = textwrap.dedent("""
+    from concurrent.futures import ThreadPoolExecutor
+    from draw_dash.duckdb_manager import DuckDBManager
+
+    manager = DuckDBManager(query_cache_bytes=0)
+    for idx in range(32):
+        manager.connection.execute(f"CREATE TABLE t{idx} AS SELECT 1 AS x")
+
+    def work(worker):
+        for idx in range(100):
+            manager.get_table_list()
+            manager.memory_usage()
+        manager.drop_table(f"t{worker}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(8)))
+    assert len(manager.get_table_list()) == 24
+""")
+
+
+def test_table_list_memory_usage_and_drops_from_many_threads():
+    # Run apart from pytest: the failure this guards against is a crash
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [src, os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run([sys.executable, "-c", SCRIPT], env=env, capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,57 @@
+"""
+Tests for appends merged into profiled tables
+"""
+
+import pytest
+
+from draw_dash import duckdb_manager
+from draw_dash.duckdb_manager import DuckDBManager
+from draw_dash.incremental_stats import column_sketches
+
+
+def write_csv(path, start: int, count: int):
+    path.write_text("id,label\n" + "".join(f"{idx},l{idx % 50}\n" for idx in range(start, start + count)))
+    return str(path)
+
+
+@pytest.fixture
+def sketched(monkeypatch):
+    """Tables column_sketches is run on"""
+    tables = []
+
+    def record(connection, table_name, columns):
+        tables.append(table_name)
+        return column_sketches(connection, table_name, columns)
+
+    monkeypatch.setattr(duckdb_manager, "column_sketches", record)
+    return tables
+
+
+def test_first_append_reuses_sketches_from_profiling(tmp_path, sketched):
+    manager = DuckDBManager(query_cache_bytes=0)
+    manager.ingest_file(write_csv(tmp_path / "base.csv", 0, 1000), "events")
+    entry = manager.table_cache.entry(manager.table_cache.view_key("events"))
+    assert set(entry["sketches"]) == {"id", "label"}
+    base_table = entry["table_name"]
+
+    metadata = manager.append_file("events", write_csv(tmp_path / "delta.csv", 1000, 500))
+
+    assert base_table not in sketched
+    assert metadata["row_count"] == 1500
+    assert metadata["column_stats"]["id"]["distinct_count"] == pytest.approx(1500, rel=0.1)
+    assert metadata["column_stats"]["label"]["distinct_count"] == pytest.approx(50, rel=0.1)
+
+
+def test_deferred_profile_keeps_its_sketches(tmp_path, sketched):
+    db_path = str(tmp_path / "catalog.duckdb")
+    manager = DuckDBManager(db_path=db_path, query_cache_bytes=0)
+    manager.ingest_file(write_csv(tmp_path / "base.csv", 0, 1000), "events", profile=False)
+    manager.get_table_metadata("events")
+    manager.connection.close()
+
+    restarted = DuckDBManager(db_path=db_path, query_cache_bytes=0)
+    sketched.clear()
+    metadata = restarted.append_file("events", write_csv(tmp_path / "delta.csv", 1000, 500))
+
+    assert len(sketched) == 1  # the delta only
+    assert metadata["column_stats"]["id"]["distinct_count"] == pytest.approx(1500, rel=0.1)
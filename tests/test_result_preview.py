@@ -0,0 +1,20 @@
+"""
+Tests for previews of query results
+"""
+
+from draw_dash.catalog import LocalCatalog
+from draw_dash.duckdb_manager import DuckDBManager
+from draw_dash.result_preview import preview_query
+
+
+def test_trailing_comment_does_not_break_the_wrappers():
+    catalog = LocalCatalog(DuckDBManager(query_cache_bytes=0))
+
+    preview = preview_query(catalog, "SELECT 42 AS answer -- the answer")
+    assert preview["rows"].to_pylist() == [{"answer": 42}]
+
+    # Longer than the limit, so the summary query wraps the statement too
+    preview = preview_query(catalog, "SELECT range AS x FROM range(10) -- ten rows", limit=3)
+    assert preview["rows"].num_rows == 3
+    assert preview["row_count"] == 10
+    assert preview["summary"]["x"]["max"] == 9
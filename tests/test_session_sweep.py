@@ -0,0 +1,32 @@
+"""
+Tests for the background sweep of idle sessions and uploads
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from draw_dash import backend
+
+
+def test_failed_sweep_is_logged_and_retried(monkeypatch, caplog):
+    passes = []
+
+    def sweep():
+        passes.append(len(passes))
+        raise RuntimeError("catalog unavailable")
+
+    monkeypatch.setattr(backend, "SWEEP_INTERVAL", 0)
+    monkeypatch.setattr(backend.app.state, "sessions", SimpleNamespace(sweep=sweep), raising=False)
+
+    async def scenario():
+        task = asyncio.create_task(backend.sweep_sessions())
+        while len(passes) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    with caplog.at_level(logging.ERROR, logger=backend.__name__):
+        asyncio.run(scenario())
+
+    failures = [record for record in caplog.records if record.getMessage() == "Session sweep failed"]
+    assert failures and failures[0].exc_info[0] is RuntimeError
@@ -0,0 +1,54 @@
+"""
+Tests for the local repair of generated SQL
+"""
+
+import duckdb
+import pytest
+
+from draw_dash.sql_repair import AUTO_FIX_SIMILARITY, repair_query
+
+SCHEMA = {
+    "PAYMENTS": [{"name": "id"}, {"name": "amount"}],
+    "orders": [{"name": "id"}, {"name": "total_sales"}, {"name": "customer_id"}],
+}
+
+
+@pytest.fixture
+def validate():
+    connection = duckdb.connect()
+    connection.execute("CREATE TABLE PAYMENTS (id INTEGER, amount DOUBLE)")
+    connection.execute("CREATE TABLE orders (id INTEGER, total_sales DOUBLE, customer_id INTEGER)")
+
+    def bind(query):
+        try:
+            connection.execute(f"EXPLAIN {query}")
+        except duckdb.Error as e:
+            return str(e)
+        return None
+
+    yield bind
+    connection.close()
+
+
+def test_close_match_is_suggested_not_applied(validate):
+    result = repair_query("SELECT amount FROM PAYMENT", validate, SCHEMA)
+
+    assert not result["valid"]
+    assert result["query"] == "SELECT amount FROM PAYMENT"
+    assert result["rewrites"] == []
+    [suggestion] = result["suggestions"]
+    assert (suggestion["kind"], suggestion["original"], suggestion["replacement"]) == ("table", "PAYMENT", "PAYMENTS")
+    assert suggestion["similarity"] < AUTO_FIX_SIMILARITY
+
+
+def test_applied_rewrites_are_recorded(validate):
+    result = repair_query('SELECT "Customer ID", total_sale FROM orders', validate, SCHEMA)
+
+    assert result["valid"]
+    assert result["query"] == "SELECT customer_id, total_sales FROM orders"
+    assert [(rewrite["original"], rewrite["replacement"]) for rewrite in result["rewrites"]] == [
+        ("Customer ID", "customer_id"),
+        ("total_sale", "total_sales"),
+    ]
+    assert all(rewrite["similarity"] >= AUTO_FIX_SIMILARITY for rewrite in result["rewrites"])
+    assert result["suggestions"] == []
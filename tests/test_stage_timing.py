@@ -0,0 +1,74 @@
+"""
+Tests for the stage timing callbacks of the sequential pipeline
+"""
+
+import asyncio
+
+import pytest
+from google.adk.agents import BaseAgent, ParallelAgent, SequentialAgent
+from google.adk.events import Event
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from draw_dash.agents.sequential_agent.timing import STAGE_TIMING_PREFIX, start_stage_timer, stop_stage_timer
+
+TIMED = {"before_agent_callback": start_stage_timer, "after_agent_callback": stop_stage_timer}
+
+
+class Stage(BaseAgent):
+    """Sleeps, then answers or raises"""
+
+    seconds: float = 0.01
+    fail: bool = False
+
+    async def _run_async_impl(self, ctx):
+        await asyncio.sleep(self.seconds)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        yield Event(author=self.name, invocation_id=ctx.invocation_id, branch=ctx.branch)
+
+
+def pipeline(fail: bool = False) -> SequentialAgent:
+    return SequentialAgent(
+        name="pipeline",
+        sub_agents=[
+            ParallelAgent(
+                name="both",
+                sub_agents=[Stage(name="left", **TIMED), Stage(name="right", fail=fail, **TIMED)],
+                **TIMED,
+            ),
+            Stage(name="join", **TIMED),
+        ],
+        **TIMED,
+    )
+
+
+async def run(runner: InMemoryRunner, session_id: str):
+    message = types.Content(role="user", parts=[types.Part(text="go")])
+    async for _ in runner.run_async(user_id="test", session_id=session_id, new_message=message):
+        pass
+    session = await runner.session_service.get_session(app_name="timing", user_id="test", session_id=session_id)
+    return session.state
+
+
+def test_failed_stage_leaves_no_timers_behind():
+    async def scenario():
+        runner = InMemoryRunner(agent=pipeline(fail=True), app_name="timing")
+        session = await runner.session_service.create_session(app_name="timing", user_id="test")
+        with pytest.raises(ExceptionGroup):
+            await run(runner, session.id)
+        failed = await runner.session_service.get_session(app_name="timing", user_id="test", session_id=session.id)
+
+        runner.agent = pipeline()
+        return failed.state, await run(runner, session.id)
+
+    failed, state = asyncio.run(scenario())
+
+    assert not [key for key in failed if key.startswith("temp:")]
+    assert not [key for key in state if key.startswith("temp:")]
+    timings = {key[len(STAGE_TIMING_PREFIX):]: value for key, value in state.items() if key.startswith(STAGE_TIMING_PREFIX)}
+    assert set(timings) == {"pipeline", "both", "left", "right", "join"}
+    assert timings["pipeline"]["started"] == 0
+    # The retry is timed from its own start, not from the failed run's
+    assert timings["join"]["started"] < 1
+    assert timings["join"]["started"] >= timings["right"]["started"] + timings["right"]["seconds"] - 0.001
@@ -0,0 +1,130 @@
+"""
+Tests for chunked uploads ingested through /api/ingest
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from draw_dash.backend import app
+from draw_dash.memory_budget import memory_budget
+
+SCREENSHOT = ("sketch.png", b"\x89PNG\r\n\x1a\n", "image/png")
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def upload(client: TestClient, filename: str, data: bytes) -> str:
+    """Send a file through the chunked upload API and return its upload id"""
+    status = client.post("/api/uploads", json={"filename": filename, "size": len(data), "chunk_size": 4096}).json()
+    upload_id = status["upload_id"]
+    for part in range(status["part_count"]):
+        response = client.put(f"/api/uploads/{upload_id}/parts/{part}", content=data[part * 4096:(part + 1) * 4096])
+        assert response.status_code == 200
+    assert client.post(f"/api/uploads/{upload_id}/complete", json={}).status_code == 200
+    return upload_id
+
+
+def csv_rows(count: int, value: str) -> bytes:
+    return ("id,value\n" + "".join(f"{idx},{value}\n" for idx in range(count))).encode()
+
+
+def test_upload_larger_than_session_budget_over_expansion(client, monkeypatch):
+    monkeypatch.setattr(memory_budget, "session_limit", 64 * 1024)
+    monkeypatch.setattr(memory_budget, "spilled_ingest", 16 * 1024)
+    data = csv_rows(20_000, "x" * 10)
+    assert memory_budget.estimate(len(data)) > memory_budget.session_limit
+
+    response = client.post(
+        "/api/ingest",
+        files={"screenshot": SCREENSHOT},
+        data={"upload_ids": [upload(client, "big.csv", data)]},
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["tables"][0]["row_count"] == 20_000
+    usage = client.get(f"/api/session/{body['session_id']}/memory").json()
+    assert usage["bytes"] <= memory_budget.session_limit
+    client.delete(f"/api/session/{body['session_id']}")
+
+
+def test_uploads_sharing_a_filename_keep_their_own_contents(client):
+    first = upload(client, "data.csv", csv_rows(3, "first"))
+    second = upload(client, "data.csv", csv_rows(5, "second"))
+
+    response = client.post(
+        "/api/ingest",
+        files={"screenshot": SCREENSHOT},
+        data={"upload_ids": [first, second]},
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    contents = set()
+    for table in body["tables"]:
+        rows = client.post(
+            "/api/query",
+            json={"query": f"SELECT count(*) AS n, min(value) AS value FROM {table['table_name']}", "format": "json"},
+        ).json()
+        contents.add((rows[0]["n"], rows[0]["value"]))
+    assert contents == {(3, "first"), (5, "second")}
+    client.delete(f"/api/session/{body['session_id']}")
+
+
+def test_dataset_shared_by_sessions_is_charged_once(client):
+    data = csv_rows(2_000, "shared")
+    charge = memory_budget.estimate(len(data))
+    before = memory_budget.stats()["bytes"]
+
+    session_ids = []
+    for _ in range(3):
+        response = client.post(
+            "/api/ingest",
+            files={"screenshot": SCREENSHOT, "datasets": ("shared.csv", data, "text/csv")},
+        )
+        assert response.status_code == 200, response.text
+        session_ids.append(response.json()["session_id"])
+
+    assert memory_budget.stats()["bytes"] == before + charge
+    usage = [client.get(f"/api/session/{session_id}/memory").json()["bytes"] for session_id in session_ids]
+    assert usage == [charge, 0, 0]
+
+    # The charge moves to a session still holding the dataset
+    client.delete(f"/api/session/{session_ids[0]}")
+    assert memory_budget.stats()["bytes"] == before + charge
+    assert client.get(f"/api/session/{session_ids[1]}/memory").json()["bytes"] == charge
+
+    for session_id in session_ids[1:]:
+        client.delete(f"/api/session/{session_id}")
+    assert memory_budget.stats()["bytes"] == before
+
+
+def test_duplicate_upload_ids_are_rejected_before_claiming(client):
+    upload_id = upload(client, "data.csv", csv_rows(3, "first"))
+
+    response = client.post(
+        "/api/ingest",
+        files={"screenshot": SCREENSHOT},
+        data={"upload_ids": [upload_id, upload_id]},
+    )
+
+    assert response.status_code == 400, response.text
+    assert client.get(f"/api/uploads/{upload_id}").json()["complete"]
+    response = client.post("/api/ingest", files={"screenshot": SCREENSHOT}, data={"upload_ids": [upload_id]})
+    assert response.status_code == 200, response.text
+    client.delete(f"/api/session/{response.json()['session_id']}")
+
+
+def test_upload_that_fails_to_ingest_is_given_back(client):
+    upload_id = upload(client, "broken.parquet", b"not a parquet file")
+
+    response = client.post("/api/ingest", files={"screenshot": SCREENSHOT}, data={"upload_ids": [upload_id]})
+
+    assert response.status_code == 500
+    status = client.get(f"/api/uploads/{upload_id}").json()
+    assert status["complete"] and status["missing"] == []
+    client.delete(f"/api/uploads/{upload_id}")